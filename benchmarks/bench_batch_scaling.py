@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+مقیاس‌پذیری پردازش دسته‌ای با تعداد کارگرهای مختلف
+
+یک دسته PDF با 1، 2، 4، ... کارگر BatchProcessor پردازش می‌شود و زمان کل،
+صفحه در ثانیه و speedup نسبت به یک کارگر گزارش می‌شود. threadهای هر
+کارگر (BLAS/OpenMP و torch) برابر cpu_count // workers است تا هسته‌ها بیش
+از حد اشغال نشوند. با موتور stub (پیش‌فرض) فقط رندر، استخراج و ذخیره
+اندازه‌گیری می‌شود؛ برای OCR واقعی --backend easyocr.
+
+اجرا:
+    python benchmarks/bench_batch_scaling.py --files 8 --pages 2
+    python benchmarks/bench_batch_scaling.py --backend easyocr --workers 1 2 4 --dpi 300
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+
+def default_worker_counts():
+    """1، 2، 4، ... تا تعداد هسته‌ها"""
+    cpu_count = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpu_count:
+        counts.append(counts[-1] * 2)
+    return counts
+
+
+def write_stub_recordings(path: Path):
+    """ضبط stub با چند کلمه فرم که برای هر صفحه بازپخش می‌شود"""
+    words = ["اظهارنامه", "کوتاژ", "34384317", "کد", "کالا", "84713010"]
+    results = [[[[10, 10 + 20 * index], [120, 10 + 20 * index], [120, 28 + 20 * index], [10, 28 + 20 * index]],
+                word, 0.9] for index, word in enumerate(words)]
+    path.write_text(json.dumps({"version": 1, "by_key": {"page": results}, "sequence": ["page"]},
+                               ensure_ascii=False), encoding="utf-8")
+
+
+def run(pdf_paths, config, workers: int, output_dir: Path) -> dict:
+    """پردازش دسته با تعداد کارگر مشخص"""
+    from core.batch import BatchProcessor
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    processor = BatchProcessor(config, max_workers=workers, torch_threads=threads)
+
+    start = time.perf_counter()
+    results = processor.process_all([str(path) for path in pdf_paths], str(output_dir))
+    seconds = time.perf_counter() - start
+
+    return {
+        "workers": workers,
+        "threads": threads,
+        "seconds": seconds,
+        "pages": sum(len(result["results"]) for result in results),
+        "errors": sum(1 for result in results if result["error"])
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="مقیاس‌پذیری BatchProcessor با تعداد کارگرها")
+    parser.add_argument("--pdf", nargs="*", help="PDFهای ورودی (پیش‌فرض: PDFهای مصنوعی)")
+    parser.add_argument("--files", type=int, default=8, help="تعداد PDF مصنوعی")
+    parser.add_argument("--pages", type=int, default=2, help="صفحات هر PDF مصنوعی")
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--workers", nargs="*", type=int, default=default_worker_counts())
+    parser.add_argument("--backend", default="stub", choices=["stub", "easyocr", "tesseract"])
+    args = parser.parse_args()
+
+    from core.batch import ConfigSnapshot
+
+    with tempfile.TemporaryDirectory() as tmp:
+        recordings = Path(tmp) / "stub.json"
+        write_stub_recordings(recordings)
+        config = ConfigSnapshot({
+            "ocr": {"backend": args.backend, "stub": {"recordings": str(recordings)},
+                    "cache": {"enabled": False}, "easyocr": {"gpu": False}},
+            "processing": {"default_dpi": args.dpi, "min_dpi": args.dpi, "max_dpi": args.dpi,
+                           "isolate_ocr": False, "text_layer": {"enabled": False}}
+        })
+
+        pdf_paths = [Path(path) for path in args.pdf or []]
+        if not pdf_paths:
+            from bench_render_memory import make_synthetic_pdf
+            for index in range(args.files):
+                pdf_paths.append(Path(tmp) / f"synthetic_{index:02d}.pdf")
+                make_synthetic_pdf(pdf_paths[-1], args.pages)
+
+        print(f"فایل‌ها: {len(pdf_paths)}  DPI: {args.dpi}  موتور: {args.backend}  هسته‌ها: {os.cpu_count()}")
+        print(f"{'workers':<9}{'threads':>9}{'seconds':>10}{'pages/s':>10}{'speedup':>10}{'errors':>8}")
+
+        baseline = None
+        for workers in args.workers:
+            result = run(pdf_paths, config, workers, Path(tmp) / f"out_{workers}")
+            rate = result["pages"] / result["seconds"] if result["seconds"] else 0
+            baseline = baseline or result["seconds"]
+            print(f"{result['workers']:<9}{result['threads']:>9}{result['seconds']:>10.2f}"
+                  f"{rate:>10.2f}{baseline / result['seconds']:>9.2f}x{result['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+مقایسه حالت‌های اجرای EasyOCR روی CPU (fp32 / int8 / onnx)
+
+صفحات PDFهای موجود در data/ (یا PDFهای داده شده) یک بار رندر می‌شوند و
+برای هر حالت زمان بارگذاری مدل، زمان OCR هر صفحه و میزان تطابق متن
+اندازه‌گیری می‌شود. مرجع سرعت و تطابق، Reader پیش‌فرض EasyOCR روی CPU
+است (easyocr.Reader(..., quantize=True) که خود کوانتیزه int8 است) تا
+حالت‌ها با همان چیزی مقایسه شوند که بدون این تنظیمات اجرا می‌شد.
+
+اجرا:
+    python benchmarks/bench_cpu_inference.py --dpi 300
+    python benchmarks/bench_cpu_inference.py --modes fp32 onnx --threads 4
+"""
+
+import argparse
+import difflib
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+
+def find_pdfs(paths):
+    """PDFهای ورودی یا همه PDFهای data/"""
+    if paths:
+        return [Path(path) for path in paths]
+    return sorted((PROJECT_ROOT / "data").rglob("*.pdf"))
+
+
+def text_agreement(reference: str, text: str) -> float:
+    """نسبت تطابق کلمات دو متن (SequenceMatcher روی توکن‌ها)"""
+    return difflib.SequenceMatcher(None, reference.split(), text.split(), autojunk=False).ratio()
+
+
+def measure(readtext, pages) -> tuple:
+    """اجرای readtext روی صفحات پس از یک اجرای گرم کردن
+
+    Returns:
+        (متن هر صفحه، تعداد کادرها، زمان میانگین هر صفحه به ثانیه)
+    """
+    readtext(pages[0])
+
+    texts = []
+    boxes = 0
+    start = time.perf_counter()
+    for image in pages:
+        results = readtext(image)
+        boxes += len(results)
+        texts.append(' '.join(text for _, text, _ in results))
+    return texts, boxes, (time.perf_counter() - start) / len(pages)
+
+
+def print_row(name: str, load_time: float, page_time: float, reference_time: float, boxes: int,
+              agreement: float):
+    print(f"{name:<8}{load_time:>10.1f}{page_time * 1000:>10.0f}{reference_time / page_time:>10.2f}x"
+          f"{boxes:>9}{agreement:>12.1%}")
+
+
+def main():
+    from core.cpu_inference import CPU_MODES
+
+    parser = argparse.ArgumentParser(description="مقایسه حالت‌های اجرای EasyOCR روی CPU")
+    parser.add_argument("--pdf", nargs="*", help="PDFهای ورودی (پیش‌فرض: data/**/*.pdf)")
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--max-pages", type=int, default=5)
+    parser.add_argument("--modes", nargs="*", choices=CPU_MODES, default=list(CPU_MODES),
+                        help="حالت‌ها؛ مرجع همیشه Reader پیش‌فرض EasyOCR (quantize=True) است")
+    parser.add_argument("--threads", type=int, default=0, help="threadهای torch/ONNX Runtime (0 = پیش‌فرض)")
+    parser.add_argument("--onnx-dir", default="", help="پوشه مدل‌های ONNX")
+    args = parser.parse_args()
+
+    from core.batch import ConfigSnapshot
+    from core.pdf_processor import PDFProcessor
+    from core.ocr_backends import EasyOCRBackend
+
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    config = ConfigSnapshot({
+        "processing": {"text_layer": {"enabled": False}, "embedded_image_fast_path": False,
+                       "isolate_ocr": False}
+    })
+    processor = PDFProcessor(config)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_paths = find_pdfs(args.pdf)
+        if not pdf_paths:
+            from bench_render_memory import make_synthetic_pdf
+            synthetic = Path(tmp) / "synthetic.pdf"
+            make_synthetic_pdf(synthetic, 3)
+            pdf_paths = [synthetic]
+            print("⚠️ PDF نمونه‌ای در data/ یافت نشد، از PDF مصنوعی استفاده می‌شود")
+
+        pages = []
+        for pdf_path in pdf_paths:
+            for page in processor.iter_page_images(str(pdf_path), dpi=args.dpi, prefetch=0):
+                pages.append(page["image"].copy())
+                if len(pages) >= args.max_pages:
+                    break
+            if len(pages) >= args.max_pages:
+                break
+
+    print(f"صفحات: {len(pages)}  DPI: {args.dpi}  حالت‌ها: {', '.join(args.modes)}")
+    print(f"{'mode':<8}{'load s':>10}{'ms/page':>10}{'speedup':>10}{'boxes':>10}{'agreement':>12}")
+
+    # مرجع: Reader پیش‌فرض EasyOCR روی CPU (بدون تنظیمات این پروژه)
+    import easyocr
+
+    start = time.perf_counter()
+    stock = easyocr.Reader(['fa', 'en'], gpu=False, quantize=True)
+    load_time = time.perf_counter() - start
+    reference_texts, boxes, reference_time = measure(stock.readtext, pages)
+    print_row("stock", load_time, reference_time, reference_time, boxes, 1.0)
+    del stock
+
+    for mode in args.modes:
+        backend = EasyOCRBackend(['fa', 'en'], gpu=False,
+                                 cpu_options={"mode": mode, "onnx_dir": args.onnx_dir, "threads": args.threads})
+
+        start = time.perf_counter()
+        backend.load()
+        load_time = time.perf_counter() - start
+
+        texts, boxes, page_time = measure(backend.readtext, pages)
+        agreement = sum(text_agreement(reference, text)
+                        for reference, text in zip(reference_texts, texts)) / len(texts)
+        print_row(mode, load_time, page_time, reference_time, boxes, agreement)
+
+
+if __name__ == "__main__":
+    main()
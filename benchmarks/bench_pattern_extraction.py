@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+مقایسه استخراج فیلدها با نمایه لنگرها و حلقه قبلی (همه الگوها روی کل متن)
+
+متن صفحات از JSONهای ذخیره شده (text_extraction.raw_text یا raw_text) در
+data/ خوانده می‌شود و برای هر روش زمان استخراج هر صفحه و تعداد فیلدهایی
+که مقدار آن‌ها با حلقه قبلی یکسان است گزارش می‌شود. حلقه قبلی با الگوهای
+همان زمان (baseline_patterns.json، بسته 1.0.0 پیش از شکل استاندارد) روی متن
+خام اجرا و مقادیر آن پیش از مقایسه استاندارد می‌شوند.
+
+اجرا:
+    python benchmarks/bench_pattern_extraction.py
+    python benchmarks/bench_pattern_extraction.py --json page.json --repeat 500
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+BASELINE_PATTERNS = Path(__file__).resolve().parent / "baseline_patterns.json"
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+
+def load_page_texts(paths):
+    """متن صفحات از JSONهای خروجی (فایل‌های summary نادیده گرفته می‌شوند)"""
+    paths = [Path(path) for path in paths] if paths else sorted((PROJECT_ROOT / "data").rglob("*.json"))
+    texts = []
+    for path in paths:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if not isinstance(data, dict):
+            continue
+        text = (data.get("text_extraction") or {}).get("raw_text") or data.get("raw_text")
+        if text:
+            texts.append((path.name, text))
+    return texts
+
+
+# --- کپی بدون تغییر حلقه قبلی pattern_extractor (پیش از نمایه لنگرها و
+# نرمال‌سازی) تا زمان پایه به تغییرات فعلی _extract_field وابسته نباشد ---
+
+def _persian_to_english(text: str) -> str:
+    """تبدیل اعداد فارسی به انگلیسی"""
+    persian_digits = '۰۱۲۳۴۵۶۷۸۹'
+    english_digits = '0123456789'
+    translation_table = str.maketrans(persian_digits, english_digits)
+    return text.translate(translation_table)
+
+
+def _convert_value(value: str, field_config: Dict[str, Any]) -> Any:
+    """تبدیل مقدار به نوع مناسب"""
+    if value is None:
+        return None
+
+    field_type = field_config.get("type", "string")
+
+    try:
+        # تبدیل اعداد فارسی به انگلیسی
+        if isinstance(value, str):
+            value = _persian_to_english(value)
+
+        if field_type == "int":
+            cleaned = re.sub(r'\D', '', value)
+            return int(cleaned) if cleaned else None
+        elif field_type == "float":
+            cleaned = re.sub(r'[^\d.,]', '', value)
+            cleaned = cleaned.replace(',', '.')
+            return float(cleaned) if cleaned else None
+        else:
+            return str(value).strip()
+    except (ValueError, TypeError):
+        return value
+
+
+def _extract_persian_text(text: str) -> List[str]:
+    """استخراج persian_text مطابق نمونه JSON"""
+    persian_pattern = r'[\u0600-\u06FF\u200C\u200D\u06F0-\u06F9\u0660-\u0669]+'
+    words = re.findall(persian_pattern, text)
+    return [word.strip() for word in words if word.strip()]
+
+
+def _extract_field(patterns_config: Dict[str, Any], text: str, field_name: str) -> Dict[str, Any]:
+    """استخراج یک فیلد خاص - مطابق کد تست"""
+    if field_name not in patterns_config:
+        return {"value": None, "matched_pattern": None, "confidence": 0, "raw_value": None}
+
+    field_config = patterns_config[field_name]
+    patterns = field_config["patterns"]
+
+    best_match = None
+    matched_pattern = None
+    confidence = 0
+
+    for pattern in patterns:
+        try:
+            matches = re.finditer(pattern, text, re.IGNORECASE)
+            for match in matches:
+                if match.groups():
+                    groups = match.groups()
+                    if not best_match:
+                        best_match = groups[0]
+                        matched_pattern = pattern
+                        confidence = 0.6  # اعتماد پایه
+                else:
+                    if not best_match:
+                        best_match = match.group(0)
+                        matched_pattern = pattern
+                        confidence = 0.5
+        except Exception as e:
+            print(f"خطا در الگو {pattern}: {e}")
+            continue
+
+    # تبدیل مقدار
+    converted_value = _convert_value(best_match, field_config)
+
+    return {
+        "value": converted_value,
+        "confidence": confidence,
+        "matched_pattern": matched_pattern,
+        "raw_value": best_match
+    }
+
+
+def legacy_loop(patterns, text):
+    """حلقه قبلی create_structured_json: همه الگوهای همه فیلدها روی کل متن"""
+    persian_words = _extract_persian_text(text)
+    search_text = '"' + '", "'.join(persian_words) + '"'
+    return {field_name: _extract_field(patterns, search_text, field_name) for field_name in patterns}
+
+
+def indexed(extractor, text):
+    """نرمال‌سازی یک‌باره، نمایه لنگرها و بازه‌های اطراف آن‌ها"""
+    page_index = extractor.index_page(text)
+    return {field_name: extractor._extract_field_indexed(page_index, field_name)
+            for field_name in extractor.patterns}
+
+
+def measure(function, target, texts, repeat):
+    """میانگین زمان هر صفحه (میلی‌ثانیه) و نتایج"""
+    results = [function(target, text) for _, text in texts]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, text in texts:
+            function(target, text)
+    return (time.perf_counter() - start) * 1000 / (repeat * len(texts)), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="مقایسه استخراج فیلدها با نمایه لنگرها")
+    parser.add_argument("--json", nargs="*", help="JSONهای صفحه (پیش‌فرض: data/**/*.json)")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    from core.pattern_extractor import CustomsPatternExtractor
+    from core.text_normalizer import normalize_text
+
+    def canonical(value):
+        return normalize_text(value) if isinstance(value, str) else value
+
+    texts = load_page_texts(args.json)
+    if not texts:
+        print("❌ متن صفحه‌ای در JSONها یافت نشد")
+        return
+
+    extractor = CustomsPatternExtractor()
+
+    baseline_patterns = json.loads(BASELINE_PATTERNS.read_text(encoding="utf-8"))["fields"]
+
+    legacy_time, legacy_results = measure(legacy_loop, baseline_patterns, texts, args.repeat)
+    indexed_time, indexed_results = measure(indexed, extractor, texts, args.repeat)
+
+    fields = len(extractor.patterns) * len(texts)
+    same = sum(canonical(legacy[name]["value"]) == current[name]["value"]
+               for legacy, current in zip(legacy_results, indexed_results) for name in legacy)
+    found_legacy = sum(result["raw_value"] is not None for page in legacy_results for result in page.values())
+    found_indexed = sum(result["raw_value"] is not None for page in indexed_results for result in page.values())
+
+    print(f"صفحات: {len(texts)}  تکرار: {args.repeat}")
+    print(f"{'method':<10}{'ms/page':>10}{'speedup':>10}{'found':>8}")
+    print(f"{'legacy':<10}{legacy_time:>10.3f}{1:>9.2f}x{found_legacy:>8}")
+    print(f"{'indexed':<10}{indexed_time:>10.3f}{legacy_time / indexed_time:>9.2f}x{found_indexed:>8}")
+    print(f"مقادیر یکسان با حلقه قبلی: {same}/{fields}")
+
+    for (name, _), legacy, current in zip(texts, legacy_results, indexed_results):
+        for field_name in legacy:
+            if canonical(legacy[field_name]["value"]) != current[field_name]["value"]:
+                print(f"  {name} {field_name}: {legacy[field_name]['value']} -> {current[field_name]['value']}")
+
+
+if __name__ == "__main__":
+    main()
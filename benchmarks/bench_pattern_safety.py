@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+بررسی الگوهای استخراج و زمان بدترین حالت آن‌ها روی ورودی مصنوعی
+
+برای هر الگو موتور اجرا (re2 / regex / re)، کمیت‌سنج‌های پرخطر و زمان
+جستجوی ناموفق روی ورودی‌های مصنوعی با طول رو به افزایش گزارش می‌شود.
+ستون exponent شیب رشد زمان موتور عقبگرد است (1 = خطی).
+
+اجرا:
+    python benchmarks/bench_pattern_safety.py
+    python benchmarks/bench_pattern_safety.py --engine regex --budget 0.5 --flagged
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+
+def format_timings(timings):
+    """طول ورودی: زمان (ms)؛ > برای عبور از مهلت"""
+    return "  ".join(f"{length}:{elapsed * 1000:.2f}" if elapsed is not None else f"{length}:>"
+                     for length, elapsed in timings.items())
+
+
+def main():
+    from core.safe_regex import ENGINES, lint_patterns
+
+    parser = argparse.ArgumentParser(description="بررسی الگوهای استخراج و زمان بدترین حالت")
+    parser.add_argument("--engine", choices=ENGINES, default="auto")
+    parser.add_argument("--sizes", nargs="*", type=int, default=[8, 16, 32, 64],
+                        help="تعداد تکرار رشته‌های ثابت در ورودی مصنوعی")
+    parser.add_argument("--budget", type=float, default=1.0, help="حداکثر زمان هر جستجو (ثانیه)")
+    parser.add_argument("--flagged", action="store_true", help="فقط الگوهای علامت خورده")
+    args = parser.parse_args()
+
+    from core.pattern_extractor import CustomsPatternExtractor
+
+    extractor = CustomsPatternExtractor()
+    reports = lint_patterns(extractor.patterns, args.engine, measure=True,
+                            sizes=tuple(args.sizes), budget=args.budget)
+
+    for report in reports:
+        if args.flagged and not report["issues"]:
+            continue
+        exponent = report.get("exponent")
+        print(f"\n{report['field']}  [{report['engine']}]  exponent: "
+              f"{f'{exponent:.1f}' if exponent is not None else '-'}")
+        print(f"  {report['pattern']}")
+        for issue in report["issues"]:
+            print(f"  ⚠️ {issue}")
+        for name, timings in report.get("timings", {}).items():
+            print(f"  {name:<13}{format_timings(timings)}")
+
+    flagged = sum(1 for report in reports if report["issues"])
+    print(f"\nالگوها: {len(reports)}  علامت خورده: {flagged}  "
+          f"re2: {sum(report['engine'] == 're2' for report in reports)}")
+
+
+if __name__ == "__main__":
+    main()
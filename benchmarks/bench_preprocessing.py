@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+اثر پیش‌پردازش تصویر بر زمان OCR و نرخ یافتن فیلدها
+
+صفحات PDFهای موجود در data/ (یا PDFهای داده شده) یک بار رندر می‌شوند و
+سپس برای هر ترکیب مراحل پیش‌پردازش، زمان هر مرحله، زمان OCR و تعداد
+فیلدهای استخراج شده اندازه‌گیری می‌شود.
+
+اجرا:
+    python benchmarks/bench_preprocessing.py --dpi 300
+    python benchmarks/bench_preprocessing.py --pdf sample.pdf --backend tesseract
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+# ترکیب‌های مقایسه شده (کلیدهای processing.image_preprocessing)
+ALL_OFF = {"crop_borders": False, "denoise": False, "enhance_contrast": False,
+           "sharpen": False, "threshold": False}
+VARIANTS = {
+    "none": {"enabled": False},
+    "grayscale": dict(ALL_OFF, enabled=True),
+    "crop_borders": dict(ALL_OFF, enabled=True, crop_borders=True),
+    "denoise": dict(ALL_OFF, enabled=True, denoise=True),
+    "enhance_contrast": dict(ALL_OFF, enabled=True, enhance_contrast=True),
+    "sharpen": dict(ALL_OFF, enabled=True, sharpen=True),
+    "threshold": dict(ALL_OFF, enabled=True, threshold=True),
+    "default": {"enabled": True},
+    "default+downscale": {"enabled": True, "downscale_max_side": 2500},
+}
+
+
+def find_pdfs(paths):
+    """PDFهای ورودی یا همه PDFهای data/"""
+    if paths:
+        return [Path(path) for path in paths]
+    return sorted((PROJECT_ROOT / "data").rglob("*.pdf"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="اثر پیش‌پردازش بر زمان OCR و نرخ یافتن فیلدها")
+    parser.add_argument("--pdf", nargs="*", help="PDFهای ورودی (پیش‌فرض: data/**/*.pdf)")
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--max-pages", type=int, default=10)
+    parser.add_argument("--backend", default="easyocr", help="easyocr / tesseract / stub")
+    parser.add_argument("--recordings", default="", help="فایل ضبط برای موتور stub")
+    parser.add_argument("--variants", nargs="*", choices=list(VARIANTS), default=list(VARIANTS))
+    args = parser.parse_args()
+
+    from core.batch import ConfigSnapshot
+    from core.pdf_processor import PDFProcessor
+    from core.preprocessing import ImagePreprocessor, apply_to_result
+
+    config = ConfigSnapshot({
+        "ocr": {"backend": args.backend, "easyocr": {"gpu": True}, "cache": {"enabled": False},
+                "stub": {"recordings": args.recordings}},
+        # OCR در همین پردازه تا زمان‌سنجی شامل انتقال تصویر به کارگر نباشد
+        "processing": {"text_layer": {"enabled": False}, "embedded_image_fast_path": False,
+                       "isolate_ocr": False}
+    })
+    processor = PDFProcessor(config)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_paths = find_pdfs(args.pdf)
+        if not pdf_paths:
+            from bench_render_memory import make_synthetic_pdf
+            synthetic = Path(tmp) / "synthetic.pdf"
+            make_synthetic_pdf(synthetic, 3)
+            pdf_paths = [synthetic]
+            print("⚠️ PDF نمونه‌ای در data/ یافت نشد، از PDF مصنوعی استفاده می‌شود")
+
+        pages = []
+        for pdf_path in pdf_paths:
+            for page in processor.iter_page_images(str(pdf_path), dpi=args.dpi, prefetch=0):
+                pages.append(page["image"].copy())
+                if len(pages) >= args.max_pages:
+                    break
+            if len(pages) >= args.max_pages:
+                break
+
+    print(f"صفحات: {len(pages)}  DPI: {args.dpi}  موتور: {args.backend}")
+
+    # بارگذاری مدل پیش از اندازه‌گیری
+    processor.ocr_engine.extract_text(pages[0])
+
+    print(f"{'variant':<20}{'prep ms':>10}{'ocr ms':>10}{'total ms':>10}{'fields':>10}{'hit rate':>10}")
+    for name in args.variants:
+        preprocessor = ImagePreprocessor(VARIANTS[name])
+        prep_time = ocr_time = 0.0
+        extracted = total = 0
+
+        for page_num, image in enumerate(pages):
+            start = time.perf_counter()
+            prepared, info = preprocessor.process(image)
+            prep_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            ocr_result = apply_to_result(processor.ocr_engine.extract_text(prepared), info)
+            ocr_time += time.perf_counter() - start
+
+            stats = processor.pattern_extractor.create_structured_json(
+                ocr_result.get('text', ''), page_num + 1)["extraction_stats"]
+            extracted += stats["extracted_fields"]
+            total += stats["total_fields"]
+
+        count = len(pages)
+        print(f"{name:<20}{prep_time / count * 1000:>10.1f}{ocr_time / count * 1000:>10.1f}"
+              f"{(prep_time + ocr_time) / count * 1000:>10.1f}{extracted:>10}"
+              f"{(extracted / total if total else 0):>10.0%}")
+
+        step_stats = preprocessor.stats()
+        if step_stats:
+            print("    " + ", ".join(f"{step} {seconds * 1000:.1f}ms" for step, seconds in step_stats.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+مقایسه حداکثر حافظه (peak RSS) مسیر قدیم و جدید تبدیل PDF به تصویر
+
+مسیر قدیم: pix.tobytes("ppm") -> PIL -> np.array (سه کپی کامل)
+مسیر جدید: view مستقیم روی pix.samples با حالت‌های rgb / gray / binary
+
+هر حالت در یک پردازه جداگانه اجرا می‌شود تا peak RSS مستقل اندازه‌گیری شود.
+
+اجرا:
+    python benchmarks/bench_render_memory.py --pages 5 --dpi 600
+"""
+
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+MODES = ["old", "rgb", "gray", "binary"]
+
+
+def peak_rss_mb() -> float:
+    """حداکثر حافظه مقیم پردازه جاری به مگابایت"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # لینوکس: کیلوبایت، macOS: بایت
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        import psutil  # ویندوز
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+
+
+def make_synthetic_pdf(path: Path, pages: int):
+    """ساخت PDF چندصفحه‌ای مصنوعی شبیه فرم اظهارنامه"""
+    import fitz
+
+    doc = fitz.open()
+    for page_index in range(pages):
+        page = doc.new_page(width=595, height=842)  # A4
+        for row in range(40):
+            y = 40 + row * 19
+            page.draw_rect(fitz.Rect(30, y, 565, y + 17), width=0.5)
+            page.insert_text((36, y + 12), f"field {row:02d} page {page_index + 1} 34384317 1,250,000", fontsize=9)
+    doc.save(str(path))
+    doc.close()
+
+
+def make_processor(mode: str, dpi: int):
+    """PDFProcessor کامل با موتور stub؛ فقط متدهای رندر استفاده می‌شوند"""
+    from core.batch import ConfigSnapshot
+    from core.pdf_processor import PDFProcessor
+
+    return PDFProcessor(ConfigSnapshot({
+        "ocr": {"backend": "stub", "cache": {"enabled": False}},
+        "processing": {"default_dpi": dpi, "prefetch_pages": 0, "render_colorspace": mode,
+                       "binary_threshold": 160, "embedded_image_fast_path": False,
+                       "text_layer": {"enabled": False}}
+    }))
+
+
+def run_mode(pdf_path: str, mode: str, dpi: int) -> dict:
+    """اجرای یک حالت و بازگرداندن زمان و حافظه"""
+    import fitz
+    import numpy as np
+
+    start = time.perf_counter()
+    checksum = 0
+
+    if mode == "old":
+        from PIL import Image
+
+        doc = fitz.open(pdf_path)
+        for page_num in range(len(doc)):
+            page = doc.load_page(page_num)
+            zoom = dpi / 72.0
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            img = Image.open(io.BytesIO(pix.tobytes("ppm")))
+            image = np.array(img)
+            checksum += int(image[::97, ::97].sum())
+            del pix, img, image
+        doc.close()
+    else:
+        processor = make_processor(mode, dpi)
+        for page in processor.iter_page_images(pdf_path, dpi=dpi):
+            image = page["image"]
+            checksum += int(image[::97, ::97].sum())
+            del image, page
+
+    return {
+        "mode": mode,
+        "seconds": round(time.perf_counter() - start, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "checksum": checksum
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="مقایسه peak RSS مسیرهای تبدیل PDF")
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--dpi", type=int, default=600)
+    parser.add_argument("--pdf", help="PDF ورودی (پیش‌فرض: PDF مصنوعی)")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.pdf, args.mode, args.dpi)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = args.pdf
+        if not pdf_path:
+            pdf_path = str(Path(tmp) / "synthetic.pdf")
+            make_synthetic_pdf(Path(pdf_path), args.pages)
+
+        print(f"PDF: {pdf_path}  DPI: {args.dpi}")
+        print(f"{'mode':<8}{'seconds':>10}{'peak RSS (MB)':>16}")
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, __file__, "--pdf", pdf_path, "--dpi", str(args.dpi), "--mode", mode],
+                check=True, capture_output=True, text=True, env=dict(os.environ)
+            ).stdout.strip().splitlines()[-1]
+            result = json.loads(output)
+            print(f"{result['mode']:<8}{result['seconds']:>10}{result['peak_rss_mb']:>16}")
+
+
+if __name__ == "__main__":
+    main()
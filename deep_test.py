@@ -5,8 +5,15 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import json
 import re
+import sys
+from pathlib import Path
 from typing import Dict, Any, List
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from core.pattern_registry import load_patterns
+from core.text_normalizer import normalize_text, to_latin_digits
+
 
 class CustomsPatternTester:
     def __init__(self, root):
@@ -62,145 +69,8 @@ class CustomsPatternTester:
         self.result_text.pack(fill=tk.BOTH, expand=True)
 
     def setup_patterns(self):
-        """تنظیم الگوهای استخراج بهبود یافته"""
-        self.patterns = {
-            "کد_کالا": {
-                "patterns": [
-                    r'"ك٧٧"[^"]*"(\d{8})"',
-                    r'"(\d{8})"[^"]*"٠٣٢"',
-                    r'ك٧٧.*?"(\d{8})"'
-                ],
-                "type": "string",
-                "description": "کد 8 رقمی کالا که معمولاً قبل از '٠٣٢' یا بعد از 'ك٧٧' قرار دارد"
-            },
-            "کد_ثبت_سفارش": {
-                "patterns": [
-                    r'"سفارشس"[^"]*"(\d{8})"',
-                    r'سفارشس.*?"(\d{8})"',
-                    r'ثبت.*?سفارش.*?"(\d{8})"'
-                ],
-                "type": "string",
-                "description": "کد 8 رقمی ثبت سفارش که معمولاً بعد از 'سفارشس' قرار دارد"
-            },
-            "وزن_ناخالص": {
-                "patterns": [
-                    r'"(\d+)"[^"]*"س"[^"]*"(\d+)"[^"]*"٣٨"',
-                    r'وزن.*?"(\d+)"',
-                    r'"(\d+)"\s*"٣٨"'
-                ],
-                "type": "float",
-                "description": "وزن ناخالص کالا که معمولاً قبل از '٣٨' قرار دارد"
-            },
-            "نوع_بسته": {
-                "patterns": [
-                    r'"نوع"\s*"بسته"\s*"(\w+)"',
-                    r'بسته.*?"(نگله|رول|گونی|کارتن|عدد|جعبه|سایر|پالت|نکله)"',
-                    r'نوع.*?بسته.*?"(\w+)"'
-                ],
-                "type": "string",
-                "valid_values": ["نگله", "رول", "گونی", "کارتن", "عدد", "جعبه", "سایر", "پالت", "نکله"],
-                "description": "نوع بسته بندی کالا از مقادیر مشخص شده"
-            },
-            "نرخ_ارز": {
-                "patterns": [
-                    r'"(\d{6}\.0)"',
-                    r'نرخ.*?ارز.*?"(\d{6}\.0)"',
-                    r'ارز.*?"(\d{6}\.0)"'
-                ],
-                "type": "float",
-                "description": "نرخ ارز به صورت عدد 6 رقمی با .0 در انتها"
-            },
-            "نوع_معامله": {
-                "patterns": [
-                    r'"(حواله\s*ارزی|حواله)"[^"]*"ادزی"',
-                    r'نوع.*?معامله.*?"(پیله\s*وری|حواله\s*ارزی|برات)"',
-                    r'معامله.*?"(\w+\s*\w+)"'
-                ],
-                "type": "string",
-                "mapping": {"حواله": "حواله ارزی"},
-                "description": "نوع معامله که می‌تواند پیله وری، حواله ارزی یا برات باشد"
-            },
-            "نوع_ارز": {
-                "patterns": [
-                    r'"(يورو|EUR|USD|GBP)"',
-                    r'ارز.*?"(\w+)"',
-                    r'"(يورو)"[^"]*"بانکی"'
-                ],
-                "type": "string",
-                "description": "نوع ارز مورد استفاده در معامله"
-            },
-            "مبلغ_کل_فاکتور": {
-                "patterns": [
-                    r'"انبار"[^"]*"(\d+,\d+)"[^"]*"(\d+)"[^"]*"بىكيرى"',
-                    r'فاكتور.*?"(\d+(?:,\d+)*)"',
-                    r'مبلغ.*?كل.*?"(\d+(?:,\d+)*)"'
-                ],
-                "type": "float",
-                "description": "مبلغ کل فاکتور که معمولاً به صورت عدد با ممیز است"
-            },
-            "تعداد_واحد_کالا": {
-                "patterns": [
-                    r'"(\d+)"[^"]*"بىكيرى"',
-                    r'تعداد.*?واحد.*?"(\d+)"',
-                    r'واحد.*?كالا.*?"(\d+)"'
-                ],
-                "type": "int",
-                "description": "تعداد واحدهای کالا"
-            },
-            "شرح_کالا": {
-                "patterns": [
-                    r'"شرح"\s*"کالا"\s*"([^"]+)"\s*"([^"]+)"\s*"([^"]+)"[^"]*"باقی"',
-                    r'کالا.*?"([^"]+)"\s*"([^"]+)"\s*"([^"]+)".*?باقی'
-                ],
-                "type": "string",
-                "description": "شرح کامل کالا که معمولاً بین 'کالا' و 'باقی' قرار دارد"
-            },
-            "بیمه": {
-                "patterns": [
-                    r'بیمه.*?"(\d+)"',
-                    r'نرخ.*?تعديل.*?نرخ.*?"(\d+)"',
-                    r'"(\d+)"[^"]*"بیمه"'
-                ],
-                "type": "float",
-                "description": "مبلغ بیمه کالا"
-            },
-            "ارزش_گمرکی_قلم_کالا": {
-                "patterns": [
-                    r'"(\d+,\d+)"[^"]*"اسناد"',
-                    r'ارزش.*?گمركى.*?"(\d+(?:,\d+)*)"',
-                    r'قلم.*?كالا.*?"(\d+(?:,\d+)*)"'
-                ],
-                "type": "float",
-                "description": "ارزش گمرکی قلم کالا"
-            },
-            "جمع_حقوق_و_عوارض": {
-                "patterns": [
-                    r'مدسه.*?"(\d+)"',
-                    r'جمع.*?حقوق.*?"(\d+)"',
-                    r'"(\d+)"[^"]*"مدسه"'
-                ],
-                "type": "int",
-                "description": "جمع حقوق و عوارض گمرکی"
-            },
-            "مبلغ_مالیات_بر_ارزش_افزوده": {
-                "patterns": [
-                    r'رسید.*?"(\d+)"',
-                    r'مالیات.*?ارزش.*?"(\d+(?:,\d+)*)"',
-                    r'"(\d+)"[^"]*"رسید"'
-                ],
-                "type": "int",
-                "description": "مبلغ مالیات بر ارزش افزوده"
-            },
-            "مبلغ_حقوق_ورودی": {
-                "patterns": [
-                    r'تضمین.*?"(\d+)"',
-                    r'حقوق.*?ورودی.*?"(\d+(?:,\d+)*)"',
-                    r'"(\d+)"[^"]*"تضمین"'
-                ],
-                "type": "int",
-                "description": "مبلغ حقوق ورودی"
-            }
-        }
+        """بارگذاری الگوهای استخراج از همان بسته JSON مورد استفاده برنامه"""
+        self.patterns = load_patterns()
 
         # پر کردن Combobox با نام فیلدها
         self.field_combo['values'] = list(self.patterns.keys())
@@ -259,8 +129,8 @@ class CustomsPatternTester:
                 messagebox.showerror("خطا", "فایل JSON حاوی بخش persian_text نیست")
                 return
 
-            # تبدیل به متن قابل جستجو
-            search_text = '"' + '", "'.join(persian_text) + '"'
+            # تبدیل به متن قابل جستجو (الگوها روی متن نرمال شده نوشته شده‌اند)
+            search_text = normalize_text('"' + '", "'.join(persian_text) + '"')
 
             # استخراج فیلد مورد نظر
             result = self._extract_field(search_text, field_name)
@@ -294,8 +164,8 @@ class CustomsPatternTester:
                 messagebox.showerror("خطا", "فایل JSON حاوی بخش persian_text نیست")
                 return
 
-            # تبدیل به متن قابل جستجو
-            search_text = '"' + '", "'.join(persian_text) + '"'
+            # تبدیل به متن قابل جستجو (الگوها روی متن نرمال شده نوشته شده‌اند)
+            search_text = normalize_text('"' + '", "'.join(persian_text) + '"')
 
             # استخراج تمام فیلدها
             results = {}
@@ -396,9 +266,9 @@ class CustomsPatternTester:
         field_type = field_config.get("type", "string")
 
         try:
-            # تبدیل اعداد فارسی به انگلیسی
+            # شکل استاندارد حروف و تبدیل اعداد فارسی و عربی به انگلیسی
             if isinstance(value, str):
-                value = self._persian_to_english(value)
+                value = normalize_text(value)
 
             if field_type == "int":
                 # حذف تمام کاراکترهای غیرعددی
@@ -416,11 +286,8 @@ class CustomsPatternTester:
             return value
 
     def _persian_to_english(self, text: str) -> str:
-        """تبدیل اعداد فارسی به انگلیسی"""
-        persian_digits = '۰۱۲۳۴۵۶۷۸۹'
-        english_digits = '0123456789'
-        translation_table = str.maketrans(persian_digits, english_digits)
-        return text.translate(translation_table)
+        """تبدیل اعداد فارسی و عربی به انگلیسی"""
+        return to_latin_digits(text)
 
 
 if __name__ == "__main__":
@@ -9,5 +9,9 @@ from .ocr_engine import OCREngine
 from .pdf_processor import PDFProcessor
 
 from .pattern_extractor import CustomsPatternExtractor
+from .form_template import FormTemplate
+from .batch import BatchProcessor
+from .ocr_backends import OCRBackend, EasyOCRBackend, TesseractBackend, StubBackend
 
-__all__ = ['OCREngine', 'PDFProcessor',  'CustomsPatternExtractor']
\ No newline at end of file
+__all__ = ['OCREngine', 'PDFProcessor',  'CustomsPatternExtractor', 'FormTemplate', 'BatchProcessor',
+           'OCRBackend', 'EasyOCRBackend', 'TesseractBackend', 'StubBackend']
\ No newline at end of file
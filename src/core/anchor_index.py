@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+موتور استخراج تک‌گذره فیلدها - نمایه لنگرها با Aho-Corasick
+"""
+
+import re
+import logging
+from functools import lru_cache
+from itertools import accumulate
+from operator import add
+from typing import Dict, Any, List, Optional, Tuple
+
+from .safe_regex import compile_pattern, PATTERN_TIMEOUT
+from .text_normalizer import NormalizedText, tokenize
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # پایتون 3.10 و قدیمی‌تر
+    import sre_parse
+
+logger = logging.getLogger(__name__)
+
+# حداکثر توکن‌های متمایز نگه داشته شده در cache خودکاره
+TOKEN_CACHE_SIZE = 50000
+
+
+# حروف جداکننده توکن‌ها در متن جستجو ("توکن", "توکن")
+SEPARATOR_CHARS = '", '
+
+
+def _flatten(items):
+    """اجزای سطح بالای الگو؛ محتوای گروه‌های سطح بالا هم الزامی است"""
+    for op, value in items:
+        if op == sre_parse.SUBPATTERN:
+            yield from _flatten(value[-1])
+        else:
+            yield op, value
+
+
+def literal_bounds(pattern: str, flags: int = 0) -> List[Tuple[str, Optional[int], Optional[int]]]:
+    """رشته‌های ثابتی که هر تطابق الگو حتماً شامل آن‌هاست
+
+    فقط حروف ثابت سطح بالای الگو و گروه‌های آن (خارج از تکرار و انشعاب)
+    در نظر گرفته می‌شوند. "، فاصله و , جداکننده توکن‌ها هستند و حروفی که
+    با IGNORECASE شکل دیگری دارند کنار گذاشته می‌شوند، پس هر رشته حاصل
+    زیررشته یک توکن است.
+
+    Returns:
+        (رشته ثابت، حداکثر طول تطابق پیش از آن، حداکثر طول پس از آن)؛
+        طول نامحدود (مثل .*?) با None مشخص می‌شود
+    """
+    parsed = sre_parse.parse(pattern, flags)
+    items = list(_flatten(parsed))
+    widths = [sre_parse.SubPattern(parsed.state, [item]).getwidth()[1] for item in items]
+
+    def max_width(part):
+        return None if any(width >= sre_parse.MAXREPEAT for width in part) else sum(part)
+
+    literals = []
+    start = None
+    for index, (op, value) in enumerate(items + [(None, None)]):
+        char = chr(value) if op == sre_parse.LITERAL else None
+        is_literal = char is not None and char not in SEPARATOR_CHARS and \
+            not (flags & re.IGNORECASE and char.lower() != char.upper())
+        if is_literal and start is None:
+            start = index
+        elif not is_literal and start is not None:
+            literal = ''.join(chr(value) for _, value in items[start:index])
+            literals.append((literal, max_width(widths[:start]), max_width(widths[index:])))
+            start = None
+    return literals
+
+
+def required_literals(pattern: str, flags: int = 0) -> List[str]:
+    """رشته‌های ثابتی که هر تطابق الگو حتماً شامل آن‌هاست"""
+    return [literal for literal, _, _ in literal_bounds(pattern, flags)]
+
+
+def choose_anchor(bounds: List[Tuple[str, Optional[int], Optional[int]]]):
+    """لنگر الگو: رشته ثابتی که بازه جستجوی اطراف آن کوچک‌تر است
+
+    رشته‌ای که طول تطابق در هر دو طرف آن محدود است بر رشته‌ای با یک طرف
+    نامحدود ترجیح دارد؛ در صورت تساوی طولانی‌ترین رشته انتخاب می‌شود.
+    """
+    if not bounds:
+        return None, None, None
+    return min(bounds, key=lambda bound: ((bound[1] is None) + (bound[2] is None), -len(bound[0])))
+
+
+class AhoCorasick:
+    """خودکاره Aho-Corasick برای یافتن هم‌زمان همه لنگرها در یک گذر"""
+
+    def __init__(self, words):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for word in dict.fromkeys(words):
+            state = 0
+            for char in word:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append(word)
+
+        # پیوندهای شکست به ترتیب سطح (BFS)
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+        # تابع انتقال کامل (پیوندهای شکست از پیش دنبال شده): هر حرف یک جستجوی dict
+        # است (به ترتیب BFS تا انتقال‌های حالت شکست پیش‌تر ساخته شده باشند)
+        self.delta = [dict(self.goto[0])] + [None] * len(queue)
+        for state in queue:
+            self.delta[state] = dict(self.delta[self.fail[state]], **self.goto[state])
+        # برچسب‌های فرم در همه صفحات تکرار می‌شوند؛ نتیجه هر توکن در یک LRU
+        # محدود (برای هر خودکاره جداگانه) نگه داشته می‌شود
+        self.words_in = lru_cache(maxsize=TOKEN_CACHE_SIZE)(self._scan)
+
+    def _scan(self, token: str) -> tuple:
+        """لنگرهای موجود در یک توکن"""
+        delta, output = self.delta, self.output
+        found = []
+        state = 0
+        for char in token:
+            state = delta[state].get(char, 0)
+            found.extend(output[state])
+        return tuple(dict.fromkeys(found))
+
+    def find_in_tokens(self, tokens: List[str]) -> Dict[str, List[int]]:
+        """اندیس توکن‌های شامل هر لنگر (هر توکن جداگانه از ریشه پیمایش می‌شود)"""
+        hits = {}
+        words_in = self.words_in
+        for index, token in enumerate(tokens):
+            for word in words_in(token):
+                hits.setdefault(word, []).append(index)
+        return hits
+
+
+class PageIndex:
+    """متن جستجوی صفحه ("توکن", "توکن", ...) به همراه محل توکن‌ها و لنگرها
+
+    اگر source (متن جستجوی ساخته شده از توکن‌های اصلی و نرمال شده) داده
+    شود، بازه‌های تطابق به شکل اصلی متن برگردانده می‌شوند.
+    """
+
+    def __init__(self, tokens: List[str], automaton: AhoCorasick,
+                 source: Optional[NormalizedText] = None):
+        self.tokens = tokens
+        self.source = source
+        self.search_text = source.text if source is not None else '"' + '", "'.join(tokens) + '"'
+        self.hits = automaton.find_in_tokens(tokens)
+
+        # شروع هر توکن در search_text (با احتساب " و جداکننده ", ")
+        self.starts = list(map(add, accumulate(map(len, tokens), initial=0), range(0, 4 * len(tokens), 4)))
+
+    def span(self, first: int, last: int) -> Tuple[int, int]:
+        """بازه متنی توکن‌های first تا last"""
+        first = max(first, 0)
+        last = min(last, len(self.tokens) - 1)
+        return self.starts[first], self.starts[last] + len(self.tokens[last]) + 2
+
+    def original(self, start: int, end: int) -> Optional[str]:
+        """شکل اصلی (پیش از نرمال‌سازی) بازه start تا end از search_text"""
+        if self.source is None:
+            return None
+        return self.source.original_slice(start, end)
+
+
+class AnchorIndexedExtractor:
+    """ارزیابی الگوهای هر فیلد فقط در بازه‌های اطراف لنگرهای آن
+
+    لنگر هر الگو یکی از رشته‌های ثابت الزامی آن است (مثل ک77، بیکیری،
+    مدسه؛ choose_anchor). همه لنگرها با یک گذر Aho-Corasick روی توکن‌ها
+    یافت می‌شوند؛ الگویی که لنگرش در صفحه نیست اجرا نمی‌شود و بقیه فقط در
+    بازه‌ای جستجو می‌شوند که هر تطابق شامل لنگر در آن قرار دارد (حداکثر
+    طول تطابق پیش و پس از لنگر؛ برای .*? تا ابتدا یا انتهای متن). پس نتیجه
+    با اجرای الگو روی کل متن یکسان است. الگوهای بدون رشته ثابت روی کل متن
+    اجرا می‌شوند. جستجو با اولین تطابق پذیرفته شده متوقف می‌شود. الگوها با
+    compile_pattern (RE2 یا regex با مهلت) اجرا می‌شوند.
+    """
+
+    def __init__(self, patterns: Dict[str, Dict[str, Any]], engine: str = "auto",
+                 timeout: float = PATTERN_TIMEOUT):
+        self.fields = {}
+        anchors = []
+
+        for field_name, field_config in patterns.items():
+            compiled = []
+            for pattern in field_config.get("patterns", []):
+                try:
+                    regex = compile_pattern(pattern, re.IGNORECASE, engine, timeout)
+                    anchor, before, after = choose_anchor(literal_bounds(pattern, re.IGNORECASE))
+                except Exception as e:
+                    logger.error(f"خطا در الگو {pattern}: {e}")
+                    continue
+                if anchor:
+                    anchors.append(anchor)
+                compiled.append((pattern, regex, anchor, before, after))
+            self.fields[field_name] = compiled
+
+        self.automaton = AhoCorasick(anchors)
+
+    def index(self, tokens: List[str]) -> PageIndex:
+        """نمایه لنگرهای یک صفحه (یک بار برای همه فیلدها)"""
+        return PageIndex(tokens, self.automaton)
+
+    def index_text(self, text: str) -> PageIndex:
+        """نرمال‌سازی و نمایه متن صفحه
+
+        توکن‌ها از متن اصلی جدا می‌شوند و متن جستجوی حاصل یک بار نرمال
+        می‌شود؛ موقعیت‌های آن با نگاشت NormalizedText به شکل اصلی برمی‌گردند.
+        """
+        source = NormalizedText('"' + '", "'.join(tokenize(text)) + '"')
+        tokens = source.text[1:-1].split('", "') if len(source.text) > 2 else []
+        return PageIndex(tokens, self.automaton, source)
+
+    def extract(self, page: PageIndex,
+                field_name: str) -> Tuple[Optional[str], Optional[str], float, Optional[Tuple[int, int]]]:
+        """اولین تطابق پذیرفته شده فیلد
+
+        Returns:
+            (مقدار خام، الگوی تطابق یافته، اعتماد، بازه مقدار در search_text)
+        """
+        for pattern, regex, anchor, before, after in self.fields.get(field_name, []):
+            if anchor is None:
+                spans = [(0, len(page.search_text))]
+            elif anchor in page.hits:
+                spans = self._regions(page, page.hits[anchor], before, after)
+            else:
+                continue
+
+            for start, end in spans:
+                offset = start if regex.relative_positions else 0
+                for match in regex.finditer(page.search_text, start, end):
+                    group = 1 if regex.groups else 0
+                    if match.group(group):
+                        value_start, value_end = match.span(group)
+                        # اعتماد پایه: 0.6 برای گروه و 0.5 برای کل تطابق
+                        return (match.group(group), pattern, 0.6 if group else 0.5,
+                                (value_start + offset, value_end + offset))
+
+        return None, None, 0, None
+
+    @staticmethod
+    def _regions(page: PageIndex, positions: List[int], before: Optional[int],
+                 after: Optional[int]) -> List[Tuple[int, int]]:
+        """بازه‌های متنی شامل هر تطابق ممکن اطراف رخدادهای لنگر
+
+        تطابق حداکثر before حرف پیش از توکن لنگر شروع و حداکثر after حرف
+        پس از آن تمام می‌شود (None = تا ابتدا یا انتهای متن). بازه‌های
+        هم‌پوشان ادغام می‌شوند.
+        """
+        text_length = len(page.search_text)
+        spans = []
+        for position in positions:
+            start, end = page.span(position, position)
+            start = max(0, start - before) if before is not None else 0
+            end = min(text_length, end + after) if after is not None else text_length
+            if spans and start <= spans[-1][1]:
+                spans[-1] = (spans[-1][0], max(end, spans[-1][1]))
+            else:
+                spans.append((start, end))
+        return spans
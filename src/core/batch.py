@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+موتور پردازش دسته‌ای چندپردازه‌ای - توزیع فایل‌های PDF بین پردازه‌ها
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Iterator, Iterable
+
+logger = logging.getLogger(__name__)
+
+# PDFProcessor مخصوص هر پردازه کارگر (یک بار در initializer ساخته می‌شود)
+_worker_processor = None
+# نشانه لغو مشترک با پردازه اصلی (CancellationToken.for_processes)
+_worker_cancel_token = None
+
+# متغیرهای محیطی تعداد thread کتابخانه‌های BLAS/OpenMP
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+_thread_env_lock = threading.Lock()
+
+
+class ConfigSnapshot:
+    """نسخه فقط‌خواندنی تنظیمات برای ارسال به پردازه‌های کارگر
+
+    ConfigManager به صورت singleton فایل تنظیمات را می‌خواند و می‌نویسد؛
+    کارگرها فقط یک کپی از دیکشنری تنظیمات با همان رابط get دریافت می‌کنند.
+    """
+
+    def __init__(self, config_dict: Dict[str, Any]):
+        self.config = config_dict or {}
+
+    @classmethod
+    def from_config(cls, config) -> "ConfigSnapshot":
+        """ساخت snapshot از ConfigManager یا snapshot دیگر"""
+        if config is None:
+            return cls({})
+        if isinstance(config, cls):
+            return config
+        return cls(config.get_all())
+
+    def get(self, key_path: str, default: Any = None) -> Any:
+        """دریافت مقدار با مسیر نقطه‌دار مثل processing.max_workers"""
+        result = self.config
+        try:
+            for key in key_path.split('.'):
+                result = result[key]
+            return result
+        except (KeyError, TypeError):
+            return default
+
+    def get_all(self) -> Dict:
+        """دریافت کل تنظیمات"""
+        return self.config.copy()
+
+
+@contextmanager
+def thread_env(threads: Optional[int]):
+    """تنظیم موقت متغیرهای THREAD_ENV_VARS در پردازه جاری
+
+    BLAS/OpenMP تعداد thread را هنگام بارگذاری numpy/torch از محیط می‌خوانند
+    و پردازه spawn شده پیش از اجرای initializer (هنگام unpickle آرگومان‌ها)
+    بسته core و در نتیجه numpy را import می‌کند؛ پس محدودیت کارگرها باید در
+    محیطی باشد که پردازه با آن شروع می‌شود. پردازه‌هایی که داخل این بلوک
+    شروع شوند محیط را به ارث می‌برند و محیط پردازه جاری پس از آن بازگردانده
+    می‌شود.
+    """
+    if not threads:
+        yield
+        return
+
+    with _thread_env_lock:
+        previous = {var: os.environ.get(var) for var in THREAD_ENV_VARS}
+        os.environ.update({var: str(threads) for var in THREAD_ENV_VARS})
+        try:
+            yield
+        finally:
+            for var, value in previous.items():
+                if value is None:
+                    os.environ.pop(var, None)
+                else:
+                    os.environ[var] = value
+
+
+def limit_threads(threads: int):
+    """محدودسازی threadهای torch پردازه جاری
+
+    متغیرهای THREAD_ENV_VARS هم تنظیم می‌شوند، اما فقط روی کتابخانه‌هایی اثر
+    دارند که بعد از این فراخوانی بارگذاری شوند؛ در پردازه‌های کارگر محدودیت
+    BLAS/OpenMP با شروع پردازه در thread_env اعمال می‌شود.
+    """
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+
+    try:
+        import torch
+        torch.set_num_threads(threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass  # در صورت شروع قبلی کار موازی قابل تغییر نیست
+    except ImportError:
+        pass
+
+
+def _init_worker(config_snapshot: ConfigSnapshot, torch_threads: int, cancel_token=None,
+                 profile: Optional[str] = None):
+    """راه‌اندازی پردازه کارگر: محدودسازی threadها و ساخت یک OCREngine"""
+    global _worker_processor, _worker_cancel_token
+
+    # BLAS/OpenMP با thread_env هنگام شروع پردازه محدود شده است؛ اینجا torch
+    limit_threads(torch_threads)
+
+    from .pdf_processor import PDFProcessor
+    # کارگر OCR جداگانه (processing.isolate_ocr) هم همین محدودیت را می‌گیرد
+    _worker_processor = PDFProcessor(config_snapshot, profile=profile, ocr_threads=torch_threads)
+    _worker_cancel_token = cancel_token
+    logger.info(f"👷 کارگر {os.getpid()} آماده است ({torch_threads} thread)")
+
+
+def _process_pdf(pdf_path: str, output_dir: Optional[str]) -> Dict[str, Any]:
+    """پردازش یک PDF در پردازه کارگر"""
+    start_time = time.time()
+    try:
+        results = _worker_processor.process_pdf_pages_individually(pdf_path, output_dir,
+                                                                   cancel_token=_worker_cancel_token)
+        error = None
+    except Exception as e:
+        results = []
+        error = str(e)
+
+    return {
+        "pdf_path": pdf_path,
+        "results": results,
+        "error": error,
+        "processing_time": time.time() - start_time,
+        "worker_pid": os.getpid()
+    }
+
+
+class BatchProcessor:
+    """پردازش موازی دسته فایل‌های PDF با ProcessPoolExecutor
+
+    هر کارگر یک بار PDFProcessor (و در نتیجه OCREngine) خود را می‌سازد و
+    نتایج به ترتیب اتمام (نه ترتیب ورودی) به فراخواننده برگردانده می‌شوند.
+    """
+
+    def __init__(self, config=None, max_workers: int = None, torch_threads: int = None,
+                 profile: str = None):
+        self.config = ConfigSnapshot.from_config(config)
+        self.profile = profile
+
+        cpu_count = os.cpu_count() or 1
+        self.max_workers = max(1, int(max_workers or self.config.get('processing.max_workers', 2)))
+        self.torch_threads = max(1, int(torch_threads or cpu_count // self.max_workers))
+
+        logger.info(f"⚙️ Batch Processor: {self.max_workers} کارگر × {self.torch_threads} thread")
+
+    def iter_results(self, pdf_paths: Iterable[str], output_dir: str = None,
+                     should_stop=None, cancel_token=None) -> Iterator[Dict[str, Any]]:
+        """پردازش فایل‌ها و بازگرداندن نتیجه هر فایل به محض اتمام
+
+        Args:
+            pdf_paths: مسیر فایل‌های PDF
+            output_dir: پوشه خروجی JSON صفحات
+            should_stop: تابع بدون آرگومان؛ در صورت True کارهای شروع نشده لغو می‌شوند
+            cancel_token: CancellationToken.for_processes؛ لغو آن فایل‌های در حال
+                پردازش را هم در کارگرها (حداکثر پس از یک صفحه) متوقف می‌کند
+
+        Yields:
+            دیکشنری شامل pdf_path، results، error، processing_time و worker_pid
+        """
+        pdf_paths = [str(path) for path in pdf_paths]
+        if not pdf_paths:
+            return
+
+        workers = min(self.max_workers, len(pdf_paths))
+        # spawn: جلوگیری از fork پس از راه‌اندازی threadهای torch
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.config, self.torch_threads, cancel_token, self.profile)
+        )
+
+        try:
+            # پردازه‌های کارگر هنگام submit شروع می‌شوند و محیط را به ارث می‌برند
+            with thread_env(self.torch_threads):
+                futures = {
+                    executor.submit(_process_pdf, path, str(output_dir) if output_dir else None): path
+                    for path in pdf_paths
+                }
+
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {
+                        "pdf_path": futures[future],
+                        "results": [],
+                        "error": str(e),
+                        "processing_time": 0,
+                        "worker_pid": None
+                    }
+
+                if result["error"]:
+                    logger.error(f"❌ خطا در {Path(result['pdf_path']).name}: {result['error']}")
+                yield result
+
+                if (should_stop is not None and should_stop()) or (cancel_token is not None and cancel_token.cancelled):
+                    logger.info("⏹️ پردازش دسته‌ای متوقف شد")
+                    break
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def process_all(self, pdf_paths: Iterable[str], output_dir: str = None) -> List[Dict[str, Any]]:
+        """پردازش همه فایل‌ها و بازگرداندن لیست نتایج (به ترتیب اتمام)"""
+        return list(self.iter_results(pdf_paths, output_dir))
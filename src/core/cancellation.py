@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+لغو همکارانه پردازش و مهلت زمانی صفحات
+"""
+
+import threading
+from multiprocessing import get_context
+
+
+class ProcessingCancelled(Exception):
+    """پردازش توسط کاربر متوقف شد"""
+
+
+class PageTimeout(Exception):
+    """OCR صفحه از مهلت زمانی تجاوز کرد"""
+
+    def __init__(self, timeout: float):
+        super().__init__(f"OCR صفحه بیش از {timeout:.0f} ثانیه طول کشید")
+        self.timeout = timeout
+
+
+class CancellationToken:
+    """نشانه لغو مشترک بین GUI، PDFProcessor و کارگر OCR
+
+    بر پایه Event؛ نسخه for_processes از Event چندپردازه‌ای استفاده می‌کند
+    تا به پردازه‌های کارگر batch هم منتقل شود.
+    """
+
+    def __init__(self, event=None):
+        self._event = event if event is not None else threading.Event()
+
+    @classmethod
+    def for_processes(cls) -> "CancellationToken":
+        """نشانه قابل ارسال به پردازه‌های spawn"""
+        return cls(get_context("spawn").Event())
+
+    def cancel(self):
+        """درخواست توقف"""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        """در صورت درخواست توقف ProcessingCancelled ایجاد می‌کند"""
+        if self._event.is_set():
+            raise ProcessingCancelled()
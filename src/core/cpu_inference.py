@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+پروفایل استنتاج CPU برای EasyOCR - مدل‌های ONNX با ONNX Runtime
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+try:
+    import onnxruntime
+except ImportError:  # وابستگی اختیاری؛ در نبود آن مدل PyTorch استفاده می‌شود
+    onnxruntime = None
+
+logger = logging.getLogger(__name__)
+
+# حالت‌های اجرای EasyOCR روی CPU (ocr.easyocr.cpu.mode):
+#   fp32: مدل PyTorch بدون تغییر
+#   int8: کوانتیزه‌سازی پویای LSTM/Linear در PyTorch (پیش‌فرض خود EasyOCR)
+#   onnx: detector و recognizer صادر شده به ONNX و اجرا با ONNX Runtime
+CPU_MODES = ("fp32", "int8", "onnx")
+
+ONNX_OPSET = 13
+
+# ارتفاع ثابت تصویر خطوط در recognizer مدل‌های EasyOCR
+RECOGNIZER_IMAGE_HEIGHT = 64
+
+
+class OnnxModule:
+    """جایگزین nn.Module در Reader که forward را با ONNX Runtime اجرا می‌کند
+
+    EasyOCR مدل‌ها را با model.eval() و model(*inputs) فراخوانی و خروجی را
+    به صورت tensor انتظار دارد؛ ورودی‌ها به NumPy و خروجی‌ها به tensor
+    تبدیل می‌شوند. ورودی‌هایی که در گراف ONNX حذف شده‌اند (مثل text در
+    مدل‌های CTC) نادیده گرفته می‌شوند.
+    """
+
+    def __init__(self, path: Path, threads: int = 0):
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.path = Path(path)
+        self.session = onnxruntime.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+        self.input_names = [item.name for item in self.session.get_inputs()]
+
+    def eval(self):
+        return self
+
+    def __call__(self, *inputs):
+        import torch
+
+        feeds = {}
+        for name, value in zip(self.input_names, inputs):
+            feeds[name] = value.detach().cpu().numpy() if hasattr(value, "detach") else np.asarray(value)
+
+        outputs = tuple(torch.from_numpy(output) for output in self.session.run(None, feeds))
+        return outputs[0] if len(outputs) == 1 else outputs
+
+
+def export_detector(model, path: Path):
+    """صدور CRAFT به ONNX با ابعاد ورودی پویا"""
+    import torch
+
+    model.eval()
+    dummy = torch.zeros(1, 3, 640, 640)
+    with torch.no_grad():
+        torch.onnx.export(model, (dummy,), str(path), opset_version=ONNX_OPSET,
+                          input_names=["image"], output_names=["score", "feature"],
+                          dynamic_axes={"image": {0: "batch", 2: "height", 3: "width"},
+                                        "score": {0: "batch", 1: "height", 2: "width"},
+                                        "feature": {0: "batch", 2: "height", 3: "width"}})
+
+
+def export_recognizer(model, path: Path):
+    """صدور recognizer به ONNX با تعداد و عرض خطوط پویا"""
+    import torch
+
+    model.eval()
+    image = torch.zeros(1, 1, RECOGNIZER_IMAGE_HEIGHT, 256)
+    text = torch.zeros(1, 1, dtype=torch.long)
+    with torch.no_grad():
+        torch.onnx.export(model, (image, text), str(path), opset_version=ONNX_OPSET,
+                          input_names=["image", "text"], output_names=["preds"],
+                          dynamic_axes={"image": {0: "batch", 3: "width"},
+                                        "text": {0: "batch", 1: "length"},
+                                        "preds": {0: "batch", 1: "steps"}})
+
+
+def _ensure_model(model, path: Path, export, quantize: bool = False) -> Path:
+    """صدور مدل (یک بار) و در صورت نیاز نسخه int8 آن با ONNX Runtime"""
+    if not path.exists():
+        logger.info(f"📦 صدور مدل به ONNX: {path.name}")
+        export(model, path)
+
+    if not quantize:
+        return path
+
+    quantized_path = path.with_name(f"{path.stem}_int8.onnx")
+    if not quantized_path.exists():
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(str(path), str(quantized_path), weight_type=QuantType.QInt8)
+    return quantized_path
+
+
+def use_onnx_runtime(reader, languages: list, options: Dict[str, Any], version: str = "") -> bool:
+    """جایگزینی detector و recognizer یک Reader (ساخته شده روی CPU و بدون
+    کوانتیزه‌سازی) با نسخه ONNX Runtime
+
+    مدل‌های صادر شده در options["onnx_dir"] (پیش‌فرض ~/.EasyOCR/onnx) نگهداری
+    و در اجراهای بعدی مستقیماً بارگذاری می‌شوند. در صورت هر خطا Reader بدون
+    تغییر (PyTorch) باقی می‌ماند.
+
+    Returns:
+        True اگر مدل‌ها جایگزین شده باشند
+    """
+    if onnxruntime is None:
+        logger.warning("⚠️ onnxruntime نصب نیست، EasyOCR با PyTorch اجرا می‌شود")
+        return False
+
+    try:
+        import torch
+
+        directory = Path(options.get("onnx_dir") or Path.home() / ".EasyOCR" / "onnx")
+        directory.mkdir(parents=True, exist_ok=True)
+        suffix = f"{'_'.join(languages)}_{version or 'unknown'}"
+        threads = options.get("threads") or torch.get_num_threads()
+
+        detector_path = _ensure_model(reader.detector, directory / f"detector_craft_{version or 'unknown'}.onnx",
+                                      export_detector)
+        # مانند کوانتیزه‌سازی PyTorch فقط recognizer (LSTM/Linear) int8 می‌شود؛
+        # Convهای CRAFT با int8 پویا روی CPU کندتر می‌شوند
+        recognizer_path = _ensure_model(reader.recognizer, directory / f"recognizer_{suffix}.onnx",
+                                        export_recognizer, options.get("onnx_quantize", True))
+
+        detector = OnnxModule(detector_path, threads)
+        recognizer = OnnxModule(recognizer_path, threads)
+    except Exception as e:
+        logger.error(f"❌ آماده‌سازی ONNX Runtime ناموفق، ادامه با PyTorch: {e}")
+        return False
+
+    reader.detector = detector
+    reader.recognizer = recognizer
+    logger.info(f"⚡ EasyOCR با ONNX Runtime ({recognizer_path.name}، {threads} thread)")
+    return True
+
+
+def resolve_cpu_mode(mode: Optional[str]) -> str:
+    """اعتبارسنجی حالت CPU؛ مقدار نامعتبر به int8 (پیش‌فرض EasyOCR) برمی‌گردد"""
+    if mode in CPU_MODES:
+        return mode
+    if mode:
+        logger.warning(f"⚠️ حالت CPU نامعتبر: {mode}، از int8 استفاده می‌شود")
+    return "int8"
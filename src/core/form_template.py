@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+قالب فرم اظهارنامه - کادرهای نام‌دار فیلدها در مختصات صفحه
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Rect = Tuple[float, float, float, float]
+
+
+class FormTemplate:
+    """قالب فرم با چیدمان ثابت
+
+    ساختار فایل JSON:
+        {
+            "name": "import_declaration",
+            "version": "1.0",
+            "page_size": [595, 842],
+            "dpi": 300,
+            "calibrated": true,
+            "anchor": {"text": "اظهارنامه", "rect": [x0, y0, x1, y1],
+                       "search_rect": [x0, y0, x1, y1], "max_shift": 40},
+            "fields": {
+                "کد_کالا": {"rect": [x0, y0, x1, y1], "value_pattern": "(\\d{8})"}
+            }
+        }
+
+    همه مختصات بر حسب point (1/72 اینچ) و نسبت به گوشه بالا-چپ صفحه است.
+    قالبی که calibrated آن false باشد (کادرهای تقریبی که هنوز روی اسکن مرجع
+    تنظیم نشده‌اند) استفاده نمی‌شود.
+    """
+
+    def __init__(self, data: Dict[str, Any], source: str = None):
+        self.source = source
+        self.name = data.get("name", "form_template")
+        self.version = str(data.get("version", "1.0"))
+        self.page_size = tuple(data.get("page_size", (595, 842)))
+        self.dpi = int(data.get("dpi", 300))
+        self.anchor = data.get("anchor")
+        self.calibrated = bool(data.get("calibrated", True))
+        self.fields = {}
+
+        for field_name, field_config in data.get("fields", {}).items():
+            rect = field_config.get("rect")
+            if not rect or len(rect) != 4:
+                logger.warning(f"⚠️ کادر نامعتبر برای فیلد {field_name} در قالب {self.name}")
+                continue
+            self.fields[field_name] = dict(field_config, rect=tuple(float(v) for v in rect))
+
+    @classmethod
+    def from_file(cls, path: str) -> "FormTemplate":
+        """بارگذاری قالب از فایل JSON"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        template = cls(data, source=str(path))
+        logger.info(f"🗺️ قالب فرم بارگذاری شد: {template.name} ({len(template.fields)} فیلد)")
+        return template
+
+    @classmethod
+    def resolve(cls, name_or_path: str, templates_dir: str = None) -> Optional["FormTemplate"]:
+        """یافتن و بارگذاری قالب از مسیر یا نام فایل در templates_dir"""
+        if not name_or_path:
+            return None
+
+        candidates = [Path(name_or_path)]
+        if templates_dir:
+            candidates.append(Path(templates_dir) / name_or_path)
+            candidates.append(Path(templates_dir) / f"{name_or_path}.json")
+
+        for candidate in candidates:
+            if candidate.is_file():
+                template = cls.from_file(str(candidate))
+                if not template.calibrated:
+                    logger.error(f"❌ قالب فرم {template.name} کالیبره نشده است (calibrated: false)؛ "
+                                 f"OCR کل صفحه استفاده می‌شود")
+                    return None
+                return template
+
+        logger.error(f"❌ قالب فرم یافت نشد: {name_or_path}")
+        return None
+
+    def scale_to(self, page_width: float, page_height: float) -> Tuple[float, float]:
+        """ضریب مقیاس صفحه واقعی نسبت به اندازه قالب"""
+        return page_width / self.page_size[0], page_height / self.page_size[1]
+
+    def anchor_search_rect(self) -> Optional[Rect]:
+        """ناحیه جستجوی کلمه لنگر"""
+        if not self.anchor:
+            return None
+        rect = self.anchor.get("search_rect") or self.anchor.get("rect")
+        return tuple(rect) if rect else None
+
+    def calibrate(self, found_rect: Optional[Rect]) -> Tuple[float, float]:
+        """محاسبه جابجایی (dx, dy) از موقعیت یافته شده لنگر
+
+        اگر لنگر یافت نشود یا جابجایی از max_shift بیشتر باشد، (0, 0)
+        برگردانده می‌شود تا کادرهای اصلی قالب استفاده شوند.
+        """
+        if not self.anchor or not found_rect:
+            return 0.0, 0.0
+
+        expected = self.anchor["rect"]
+        dx = found_rect[0] - expected[0]
+        dy = found_rect[1] - expected[1]
+
+        max_shift = self.anchor.get("max_shift", 40)
+        if abs(dx) > max_shift or abs(dy) > max_shift:
+            logger.warning(f"⚠️ جابجایی لنگر بیش از حد مجاز است ({dx:.1f}, {dy:.1f})، نادیده گرفته شد")
+            return 0.0, 0.0
+
+        return dx, dy
+
+    def field_rects(self, dx: float = 0.0, dy: float = 0.0,
+                    scale: Tuple[float, float] = (1.0, 1.0)) -> Dict[str, Rect]:
+        """کادرهای فیلدها پس از مقیاس و جابجایی"""
+        sx, sy = scale
+        rects = {}
+        for field_name, field_config in self.fields.items():
+            x0, y0, x1, y1 = field_config["rect"]
+            rects[field_name] = (x0 * sx + dx, y0 * sy + dy, x1 * sx + dx, y1 * sy + dy)
+        return rects
+
+    def field_names(self) -> List[str]:
+        """نام فیلدهای قالب"""
+        return list(self.fields.keys())
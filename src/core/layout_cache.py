@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+کش چیدمان صفحه - استفاده مجدد از کادرهای تشخیص متن برای فرم‌های ثابت
+"""
+
+import logging
+import threading
+from typing import Optional, List, Dict, Any, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class LayoutCache:
+    """کش کادرهای متن (خروجی detect) بر اساس اثر انگشت کم‌وضوح صفحه
+
+    اثر انگشت: تصویر خاکستری به شبکه grid×grid میانگین‌گیری و نسبت به
+    میانه آستانه‌گذاری می‌شود. صفحاتی که فاصله همینگ اثر انگشتشان کمتر از
+    max_distance (کسری از کل بیت‌ها) باشد چیدمان یکسان دارند. مختصات کادرها
+    نسبی (کسری از عرض/ارتفاع) ذخیره می‌شوند تا در DPI دیگر هم قابل استفاده باشند.
+    """
+
+    def __init__(self, grid: int = 32, max_distance: float = 0.08, max_entries: int = 8,
+                 min_confidence: float = 0.5):
+        self.grid = grid
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.min_confidence = min_confidence
+        self.entries = []
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> Optional["LayoutCache"]:
+        """ساخت کش از تنظیمات ocr.layout_cache؛ در صورت غیرفعال بودن None"""
+        if config is None or not config.get('ocr.layout_cache.enabled', False):
+            return None
+
+        return cls(
+            grid=config.get('ocr.layout_cache.grid', 32),
+            max_distance=config.get('ocr.layout_cache.max_distance', 0.08),
+            max_entries=config.get('ocr.layout_cache.max_entries', 8),
+            min_confidence=config.get('ocr.layout_cache.min_confidence', 0.5)
+        )
+
+    def fingerprint(self, grey: np.ndarray) -> np.ndarray:
+        """اثر انگشت دودویی grid×grid از تصویر خاکستری
+
+        مرز خانه‌ها نسبی است تا تصویر همان صفحه در DPI دیگر (با ابعاد
+        غیرمضرب grid) همان خانه‌ها را بپوشاند.
+        """
+        height, width = grey.shape[:2]
+        rows, cols = min(self.grid, height), min(self.grid, width)
+        row_edges = np.arange(rows) * height // rows
+        col_edges = np.arange(cols) * width // cols
+
+        sums = np.add.reduceat(np.add.reduceat(grey, col_edges, axis=1, dtype=np.uint32), row_edges, axis=0)
+        counts = np.outer(np.diff(np.append(row_edges, height)), np.diff(np.append(col_edges, width)))
+        cells = sums / counts
+        return (cells < np.median(cells)).ravel()
+
+    def lookup(self, grey: np.ndarray) -> Optional[Tuple[Dict[str, Any], List, List]]:
+        """یافتن چیدمان منطبق و بازگرداندن کادرها در مقیاس تصویر فعلی
+
+        Returns:
+            (entry, horizontal_list, free_list) یا None در صورت عدم تطابق
+        """
+        height, width = grey.shape[:2]
+        bits = self.fingerprint(grey)
+        aspect = width / height
+
+        with self._lock:
+            best, best_distance = None, None
+            for entry in self.entries:
+                if entry["bits"].shape != bits.shape or abs(entry["aspect"] - aspect) > 0.01:
+                    continue
+                distance = np.count_nonzero(entry["bits"] != bits) / bits.size
+                if distance <= self.max_distance and (best is None or distance < best_distance):
+                    best, best_distance = entry, distance
+
+            if best is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            best["hits"] += 1
+
+        horizontal_list = [[int(round(x_min * width)), int(round(x_max * width)),
+                            int(round(y_min * height)), int(round(y_max * height))]
+                           for x_min, x_max, y_min, y_max in best["horizontal"]]
+        free_list = [[[int(round(x * width)), int(round(y * height))] for x, y in box]
+                     for box in best["free"]]
+        return best, horizontal_list, free_list
+
+    def store(self, grey: np.ndarray, horizontal_list: List, free_list: List):
+        """ثبت کادرهای تشخیص داده شده برای چیدمان صفحه"""
+        height, width = grey.shape[:2]
+        entry = {
+            "bits": self.fingerprint(grey),
+            "aspect": width / height,
+            "horizontal": [[x_min / width, x_max / width, y_min / height, y_max / height]
+                           for x_min, x_max, y_min, y_max in horizontal_list],
+            "free": [[[x / width, y / height] for x, y in box] for box in free_list],
+            "hits": 0
+        }
+
+        with self._lock:
+            self.entries.append(entry)
+            if len(self.entries) > self.max_entries:
+                # حذف کم‌استفاده‌ترین چیدمان
+                evicted = min(self.entries[:-1], key=lambda item: item["hits"])
+                self.entries = [item for item in self.entries if item is not evicted]
+
+    def invalidate(self, entry: Dict[str, Any]):
+        """حذف چیدمانی که نتیجه قابل قبول نداده است"""
+        with self._lock:
+            self.fallbacks += 1
+            self.entries = [item for item in self.entries if item is not entry]
+
+    def is_acceptable(self, results: List) -> bool:
+        """آیا نتیجه recognize با کادرهای کش شده قابل قبول است"""
+        if not results:
+            return False
+        confidences = [confidence for _, _, confidence in results]
+        return sum(confidences) / len(confidences) >= self.min_confidence
+
+    def stats(self) -> Dict[str, Any]:
+        """آمار استفاده مجدد از چیدمان"""
+        lookups = self.hits + self.misses
+        return {
+            "layouts": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "fallbacks": self.fallbacks,
+            "hit_rate": self.hits / lookups if lookups else 0
+        }
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+موتورهای OCR قابل تعویض - EasyOCR، Tesseract و موتور بازپخش برای تست
+"""
+
+import hashlib
+import io
+import json
+import logging
+import shlex
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Tuple
+
+import numpy as np
+
+from .ocr_cache import OCRCache
+from .cpu_inference import resolve_cpu_mode, use_onnx_runtime
+from .ocr_profiles import DETECT_PARAMS, RECOGNIZE_PARAMS
+
+logger = logging.getLogger(__name__)
+
+# Readerهای مشترک در سطح پردازه، بر اساس (زبان‌ها، gpu)
+_shared_readers = {}
+_shared_readers_lock = threading.Lock()
+
+
+class _SharedReader:
+    """Reader مشترک EasyOCR که یک بار (در صورت نیاز در پس‌زمینه) بارگذاری می‌شود"""
+
+    def __init__(self, key: Tuple, languages: list, gpu: bool, cpu_options: Dict[str, Any] = None,
+                 recog_network: str = "standard"):
+        self.key = key
+        self.languages = languages
+        self.gpu = gpu
+        self.cpu_options = cpu_options or {}
+        self.recog_network = recog_network or "standard"
+        self.cpu_mode = resolve_cpu_mode(self.cpu_options.get("mode"))
+        self.reader = None
+        self.error = None
+        self.load_time = None
+        self.ready = threading.Event()
+
+    def load(self):
+        """بارگذاری مدل‌ها؛ import سنگین easyocr/torch هم اینجا انجام می‌شود"""
+        start_time = time.perf_counter()
+        try:
+            logger.info("🔍 راه‌اندازی EasyOCR...")
+            import easyocr
+
+            # بررسی CUDA فقط وقتی GPU در تنظیمات فعال است
+            use_gpu = False
+            if self.gpu:
+                import torch
+                use_gpu = torch.cuda.is_available()
+                if not use_gpu:
+                    logger.info("ℹ️ GPU در دسترس نیست، EasyOCR روی CPU اجرا می‌شود")
+
+            # روی CPU: int8 کوانتیزه‌سازی پویای خود EasyOCR است؛ fp32 و onnx مدل اصلی را می‌خواهند
+            self.reader = easyocr.Reader(self.languages, gpu=use_gpu, quantize=self.cpu_mode == "int8",
+                                         recog_network=self.recog_network)
+            if not use_gpu and self.cpu_mode == "onnx":
+                if not use_onnx_runtime(self.reader, self.languages, self.cpu_options,
+                                        _package_version('easyocr')):
+                    self.cpu_mode = "fp32"
+
+            self.load_time = time.perf_counter() - start_time
+            device = "GPU" if use_gpu else f"CPU {self.cpu_mode}"
+            logger.info(f"✅ EasyOCR آماده است ({self.load_time:.1f} ثانیه، {device})")
+        except Exception as e:
+            self.error = e
+            logger.error(f"❌ خطا در راه‌اندازی EasyOCR: {e}")
+            # امکان تلاش مجدد در فراخوانی بعدی
+            with _shared_readers_lock:
+                if _shared_readers.get(self.key) is self:
+                    del _shared_readers[self.key]
+        finally:
+            self.ready.set()
+
+
+def get_shared_reader(languages: list, gpu: bool, background: bool = False,
+                      cpu_options: Dict[str, Any] = None, recog_network: str = "standard") -> _SharedReader:
+    """دریافت Reader مشترک؛ اولین فراخوانی بارگذاری را شروع می‌کند
+
+    Args:
+        languages: زبان‌های EasyOCR
+        gpu: استفاده از GPU در صورت وجود
+        background: بارگذاری در thread پس‌زمینه (بدون انتظار)
+        cpu_options: تنظیمات ocr.easyocr.cpu (mode / onnx_dir / onnx_quantize / threads)
+        recog_network: شبکه recognizer (ocr.easyocr.recog_network)
+    """
+    cpu_options = cpu_options or {}
+    key = (tuple(languages), bool(gpu), tuple(sorted(cpu_options.items())), recog_network)
+    with _shared_readers_lock:
+        entry = _shared_readers.get(key)
+        created = entry is None
+        if created:
+            entry = _SharedReader(key, list(languages), bool(gpu), cpu_options, recog_network)
+            _shared_readers[key] = entry
+
+    if created:
+        if background:
+            threading.Thread(target=entry.load, name="easyocr-warmup", daemon=True).start()
+        else:
+            entry.load()
+    return entry
+
+
+def _package_version(package: str) -> str:
+    """نسخه بسته نصب شده (برای امضای کش)"""
+    try:
+        from importlib.metadata import version
+        return version(package)
+    except Exception:
+        return 'unknown'
+
+
+class OCRBackend:
+    """رابط مشترک موتورهای OCR
+
+    readtext خروجی هم‌شکل EasyOCR برمی‌گرداند: لیست (bbox, text, confidence)
+    که bbox چهار نقطه [x, y] است. موتورهایی که supports_boxes دارند detect و
+    recognize جداگانه هم ارائه می‌کنند (OCR دسته‌ای و کش چیدمان).
+    """
+
+    name = "base"
+    supports_boxes = False
+
+    def signature(self) -> str:
+        """امضای موتور و تنظیمات آن برای کلید کش"""
+        return self.name
+
+    def readtext(self, image: np.ndarray, **overrides) -> List:
+        """OCR کامل تصویر؛ overrides پارامترهای پروفایل را بازنویسی می‌کند
+        (مثلاً allowlist برای فیلدهای عددی) و موتورهای ناسازگار آن را نادیده می‌گیرند"""
+        raise NotImplementedError
+
+    def warm_up(self):
+        """آماده‌سازی اولیه (در صورت نیاز)"""
+
+    def load(self):
+        """آماده‌سازی کامل با انتظار (بارگذاری مدل‌ها)"""
+
+
+class EasyOCRBackend(OCRBackend):
+    """موتور EasyOCR با Reader مشترک در سطح پردازه
+
+    params پارامترهای readtext پروفایل فعال است (decoder، batch_size،
+    canvas_size، آستانه‌ها و allowlist) که به detect و recognize هم داده
+    می‌شوند.
+    """
+
+    name = "easyocr"
+    supports_boxes = True
+
+    def __init__(self, languages: list, gpu: bool = True, cpu_options: Dict[str, Any] = None,
+                 params: Dict[str, Any] = None, recog_network: str = "standard"):
+        self.languages = list(languages)
+        self.gpu = gpu
+        self.cpu_options = dict(cpu_options or {})
+        self.params = {key: value for key, value in (params or {}).items() if value is not None}
+        self.recog_network = recog_network or "standard"
+        self._signature = None
+
+    def signature(self) -> str:
+        if self._signature is None:
+            cpu_mode = resolve_cpu_mode(self.cpu_options.get("mode"))
+            params = hashlib.md5(json.dumps(self.params, sort_keys=True, ensure_ascii=False).encode()).hexdigest()[:12]
+            self._signature = (f"easyocr={_package_version('easyocr')};lang={','.join(self.languages)};"
+                               f"net={self.recog_network};params={params};cpu={cpu_mode}")
+        return self._signature
+
+    def _shared_reader(self, background: bool = False) -> _SharedReader:
+        return get_shared_reader(self.languages, self.gpu, background=background,
+                                 cpu_options=self.cpu_options, recog_network=self.recog_network)
+
+    def _select_params(self, keys: tuple) -> Dict[str, Any]:
+        return {key: self.params[key] for key in keys if key in self.params}
+
+    def warm_up(self):
+        """شروع بارگذاری Reader در پس‌زمینه (بدون مسدود کردن)"""
+        self._shared_reader(background=True)
+
+    def load(self):
+        """بارگذاری Reader با انتظار تا پایان"""
+        self.reader
+
+    @property
+    def reader(self):
+        """Reader مشترک EasyOCR؛ در صورت بارگذاری در جریان، منتظر می‌ماند"""
+        entry = self._shared_reader()
+        entry.ready.wait()
+        if entry.reader is None:
+            raise RuntimeError(f"EasyOCR بارگذاری نشد: {entry.error}")
+        return entry.reader
+
+    def readtext(self, image: np.ndarray, **overrides) -> List:
+        params = dict(self.params, **overrides)
+        return self.reader.readtext(image, **{key: value for key, value in params.items() if value is not None})
+
+    def detect(self, img: np.ndarray) -> Tuple[List, List]:
+        """کادرهای متن یک صفحه: (horizontal_list, free_list)"""
+        horizontal_list, free_list = self.reader.detect(img, reformat=False, **self._select_params(DETECT_PARAMS))
+        return horizontal_list[0], free_list[0]
+
+    def recognize(self, img_cv_grey: np.ndarray, horizontal_list: List, free_list: List,
+                  batch_size: int = None) -> List:
+        """اجرای recognizer روی کادرهای مشخص (بدون detect)"""
+        if not horizontal_list and not free_list:
+            return []
+        batch_size = batch_size or self.params.get("batch_size", 1)
+        return self.reader.recognize(img_cv_grey, horizontal_list=horizontal_list, free_list=free_list,
+                                     batch_size=batch_size, reformat=False,
+                                     **self._select_params(RECOGNIZE_PARAMS))
+
+
+class TesseractBackend(OCRBackend):
+    """موتور Tesseract با pytesseract یا در نبود آن، اجرای مستقیم tesseract
+
+    خروجی TSV در سطح کلمه به قالب readtext تبدیل می‌شود (اعتماد 0 تا 1).
+    """
+
+    name = "tesseract"
+
+    def __init__(self, command: str = "", languages: str = "fas+eng", config: str = "--psm 6",
+                 timeout: float = 30):
+        self.command = command or shutil.which('tesseract') or 'tesseract'
+        self.languages = languages
+        self.config = config or ""
+        self.timeout = timeout
+        self._signature = None
+
+    def signature(self) -> str:
+        if self._signature is None:
+            try:
+                output = subprocess.run([self.command, '--version'], capture_output=True, text=True,
+                                        timeout=10).stdout
+                version = output.splitlines()[0] if output else 'unknown'
+            except Exception:
+                version = 'unknown'
+            self._signature = f"tesseract={version};lang={self.languages};config={self.config}"
+        return self._signature
+
+    def readtext(self, image: np.ndarray, **overrides) -> List:
+        try:
+            import pytesseract
+        except ImportError:
+            pytesseract = None
+
+        config = self.config
+        if overrides.get("allowlist"):
+            config = f"{config} -c tessedit_char_whitelist={overrides['allowlist']}".strip()
+
+        if pytesseract is not None:
+            pytesseract.pytesseract.tesseract_cmd = self.command
+            tsv = pytesseract.image_to_data(image, lang=self.languages, config=config,
+                                            timeout=self.timeout)
+        else:
+            tsv = self._run_tesseract(image, config)
+
+        return self._parse_tsv(tsv)
+
+    def _run_tesseract(self, image: np.ndarray, config: str) -> str:
+        """اجرای tesseract با ورودی PNG از stdin و خروجی TSV"""
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.fromarray(image).save(buffer, format="PNG")
+
+        command = [self.command, 'stdin', 'stdout', '-l', self.languages] + shlex.split(config) + ['tsv']
+        completed = subprocess.run(command, input=buffer.getvalue(), capture_output=True,
+                                   timeout=self.timeout, check=True)
+        return completed.stdout.decode('utf-8', errors='replace')
+
+    @staticmethod
+    def _parse_tsv(tsv: str) -> List:
+        """تبدیل TSV سطح کلمه به لیست (bbox, text, confidence)"""
+        results = []
+        lines = tsv.splitlines()
+        for line in lines[1:]:
+            columns = line.split('\t')
+            if len(columns) < 12 or columns[0] != '5':
+                continue
+            text = columns[11].strip()
+            confidence = float(columns[10])
+            if not text or confidence < 0:
+                continue
+
+            left, top, width, height = (int(value) for value in columns[6:10])
+            bbox = [[left, top], [left + width, top], [left + width, top + height], [left, top + height]]
+            results.append((bbox, text, confidence / 100.0))
+        return results
+
+
+class StubBackend(OCRBackend):
+    """موتور بازپخش: خروجی‌های ضبط شده readtext را بدون مدل برمی‌گرداند
+
+    ضبط‌ها بر اساس کلید محتوایی تصویر (همان کلید کش OCR) نگهداری می‌شوند؛
+    اگر تصویر ضبط نشده باشد، ضبط‌ها به ترتیب ثبت بازپخش می‌شوند و در نبود
+    هر ضبطی لیست خالی برگردانده می‌شود. برای تست و بنچمارک pipeline روی
+    ماشین‌های بدون مدل.
+
+    ساختار فایل JSON:
+        {"version": 1, "by_key": {key: readtext_results}, "sequence": [key, ...]}
+    """
+
+    name = "stub"
+
+    def __init__(self, recordings: Dict[str, Any] = None, source: str = None):
+        recordings = recordings or {}
+        self.by_key = dict(recordings.get("by_key", {}))
+        self.sequence = list(recordings.get("sequence", []))
+        self.source = source
+        self._cursor = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str) -> "StubBackend":
+        """بارگذاری ضبط‌ها از فایل JSON"""
+        with open(path, 'r', encoding='utf-8') as f:
+            recordings = json.load(f)
+        backend = cls(recordings, source=str(path))
+        logger.info(f"📼 موتور بازپخش: {len(backend.by_key)} صفحه ضبط شده از {path}")
+        return backend
+
+    def signature(self) -> str:
+        return f"stub={self.source or 'memory'}"
+
+    @staticmethod
+    def image_key(image: np.ndarray) -> str:
+        return OCRCache.make_key(image, "stub")
+
+    def readtext(self, image: np.ndarray, **overrides) -> List:
+        key = self.image_key(image)
+        with self._lock:
+            results = self.by_key.get(key)
+            if results is None and self.sequence:
+                results = self.by_key.get(self.sequence[self._cursor % len(self.sequence)])
+                self._cursor += 1
+        return results if results is not None else []
+
+    def record(self, image: np.ndarray, results: List):
+        """افزودن خروجی readtext یک تصویر به ضبط‌ها"""
+        key = self.image_key(image)
+        with self._lock:
+            if key not in self.by_key:
+                self.sequence.append(key)
+            self.by_key[key] = OCRCache.to_serializable(results)
+
+    def save(self, path: str):
+        """ذخیره ضبط‌ها در فایل JSON"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            recordings = {"version": 1, "by_key": self.by_key, "sequence": self.sequence}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(recordings, f, ensure_ascii=False)
+        logger.info(f"📼 {len(self.by_key)} صفحه ضبط شد: {path}")
+
+
+def create_backend(name: str, config=None, languages: list = None,
+                   profile: Dict[str, Any] = None) -> Optional[OCRBackend]:
+    """ساخت موتور OCR بر اساس نام (easyocr / tesseract / stub) و پروفایل فعال"""
+    def get(key_path, default=None):
+        return config.get(key_path, default) if config is not None else default
+
+    if name == "easyocr":
+        profile = profile or {}
+        params = {key: profile[key] for key in ("batch_size",) + DETECT_PARAMS + RECOGNIZE_PARAMS
+                  if key in profile}
+        return EasyOCRBackend(languages or profile.get("languages") or ['fa', 'en'], get('ocr.easyocr.gpu', True),
+                              get('ocr.easyocr.cpu', {}), params, get('ocr.easyocr.recog_network', 'standard'))
+
+    if name == "tesseract":
+        return TesseractBackend(
+            command=get('ocr.tesseract.path', ''),
+            # ساده‌سازی: مانند EasyOCR فقط فارسی و انگلیسی
+            languages="fas+eng",
+            config=get('ocr.tesseract.config', '--psm 6'),
+            timeout=get('ocr.tesseract.timeout', 30)
+        )
+
+    if name == "stub":
+        path = get('ocr.stub.recordings', '')
+        if path and Path(path).is_file():
+            return StubBackend.from_file(path)
+        logger.warning(f"⚠️ فایل ضبط موتور بازپخش یافت نشد: {path or '-'}")
+        return StubBackend()
+
+    logger.error(f"❌ موتور OCR ناشناخته: {name}")
+    return None
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+کش پایدار نتایج OCR - کلید بر اساس محتوای تصویر و تنظیمات موتور
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class OCRCache:
+    """کش sqlite برای خروجی خام readtext
+
+    کلید: hash بایت‌های تصویر رندر شده (شامل ابعاد و نوع داده، که DPI را هم
+    در بر دارد) به همراه امضای تنظیمات موتور OCR. مقدار: خروجی خام readtext.
+    حجم کل به max_size_mb محدود است و قدیمی‌ترین ورودی‌ها (LRU) حذف می‌شوند.
+    """
+
+    def __init__(self, db_path: str, max_size_mb: float = 500):
+        self.db_path = Path(db_path)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # WAL برای دسترسی هم‌زمان پردازه‌های batch
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS ocr_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ocr_cache_access ON ocr_cache(last_access)")
+        self._conn.commit()
+
+        logger.info(f"🗄️ کش OCR: {self.db_path} (حداکثر {max_size_mb} MB)")
+
+    @classmethod
+    def from_config(cls, config) -> Optional["OCRCache"]:
+        """ساخت کش از تنظیمات ocr.cache؛ در صورت غیرفعال بودن None"""
+        if config is None or not config.get('ocr.cache.enabled', False):
+            return None
+
+        db_path = config.get('ocr.cache.path', '')
+        if not db_path:
+            temp_dir = config.get('paths.temp_dir') or config.get('processing.temp_dir') or 'data/temp'
+            db_path = str(Path(temp_dir) / "ocr_cache.sqlite")
+
+        try:
+            return cls(db_path, config.get('ocr.cache.max_size_mb', 500))
+        except Exception as e:
+            logger.error(f"❌ خطا در راه‌اندازی کش OCR: {e}")
+            return None
+
+    @staticmethod
+    def make_key(image: np.ndarray, engine_signature: str) -> str:
+        """کلید محتوایی: hash تصویر + ابعاد + نوع داده + امضای موتور"""
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(engine_signature.encode('utf-8'))
+        digest.update(str(image.shape).encode('ascii'))
+        digest.update(str(image.dtype).encode('ascii'))
+        digest.update(np.ascontiguousarray(image).data)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[List]:
+        """خواندن نتیجه خام readtext در صورت وجود"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM ocr_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._conn.execute("UPDATE ocr_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, results: List):
+        """ذخیره خروجی readtext و اعمال محدودیت حجم"""
+        value = json.dumps(self.to_serializable(results), ensure_ascii=False)
+        size = len(value.encode('utf-8'))
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_cache (key, value, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """حذف قدیمی‌ترین ورودی‌ها تا رسیدن به حد مجاز حجم"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()[0]
+        if total <= self.max_size_bytes:
+            return
+
+        rows = self._conn.execute("SELECT key, size FROM ocr_cache ORDER BY last_access ASC")
+        to_delete = []
+        for key, size in rows:
+            if total <= self.max_size_bytes:
+                break
+            to_delete.append((key,))
+            total -= size
+
+        self._conn.executemany("DELETE FROM ocr_cache WHERE key = ?", to_delete)
+        self.evictions += len(to_delete)
+
+    @staticmethod
+    def to_serializable(value: Any) -> Any:
+        """تبدیل انواع NumPy در خروجی readtext به انواع JSON"""
+        if isinstance(value, (list, tuple)):
+            return [OCRCache.to_serializable(item) for item in value]
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """آمار کش: تعداد hit/miss، نرخ hit، تعداد ورودی‌ها و حجم"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_mb": size / (1024 * 1024)
+        }
+
+    def close(self):
+        """بستن اتصال پایگاه داده"""
+        with self._lock:
+            self._conn.close()
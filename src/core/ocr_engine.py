@@ -5,68 +5,548 @@
 موتور OCR ساده شده - فقط EasyOCR با DPI 600
 """
 
-import easyocr
+import bisect
 import numpy as np
 import logging
+import threading
 import time
-from typing import Dict, Any
+from contextlib import contextmanager
+from typing import Dict, Any, List, Callable
+from .cancellation import PageTimeout, ProcessingCancelled
+from .ocr_cache import OCRCache
+from .layout_cache import LayoutCache
+from .ocr_backends import OCRBackend, StubBackend, create_backend
+from .ocr_profiles import load_profile, RECOGNITION_MODES
+from .spatial_extractor import words_from_readtext
 
 logger = logging.getLogger(__name__)
 
 
 class OCREngine:
-    """موتور OCR ساده شده با EasyOCR"""
+    """موتور OCR ساده شده با EasyOCR
 
-    def __init__(self, config=None):
+    Reader به صورت تنبل و مشترک در کل پردازه ساخته می‌شود؛ ساخت چند
+    OCREngine یا PDFProcessor مدل‌ها را دوباره بارگذاری نمی‌کند.
+
+    موتور OCR از ocr.backend (easyocr / tesseract / stub) انتخاب می‌شود. با
+    ocr.cascade (مثلاً ["tesseract", "easyocr"]) هر صفحه ابتدا با موتور سریع
+    پردازش و در صورت اعتماد کمتر از ocr.cascade_min_confidence با موتور
+    بعدی تکرار می‌شود.
+
+    زبان‌ها، decoder، اندازه دسته، پارامترهای detect و آستانه اعتماد از
+    پروفایل فعال (ocr.profile یا آرگومان profile: fast / balanced /
+    accurate یا پروفایل تعریف شده در ocr.profiles) خوانده می‌شوند.
+
+    timeout (ثانیه برای هر صفحه، 0 = بدون مهلت) و should_stop بین مراحل OCR
+    (هر موتور cascade، detect و recognize هر صفحه) بررسی می‌شوند و
+    PageTimeout یا ProcessingCancelled ایجاد می‌کنند. یک فراخوانی در حال
+    اجرای مدل قطع نمی‌شود؛ برای kill فوری OCRWorker (processing.isolate_ocr).
+    """
+
+    def __init__(self, config=None, backends: List[str] = None, profile: str = None,
+                 timeout: float = 0, should_stop: Callable[[], bool] = None):
         self.config = config
-        logger.info("🔍 راه‌اندازی EasyOCR...")
+        self.timeout = timeout
+        self.should_stop = should_stop
+        # مهلت فراخوانی جاری (در هر thread جداگانه)
+        self._limits = threading.local()
+
+        # پروفایل موتور: زبان‌ها، پارامترهای EasyOCR و آستانه اعتماد
+        self.profile = load_profile(config, profile)
+        self.languages = list(self.profile["languages"])
+        self.min_confidence = self.profile["min_confidence"]
+
+        # تعداد خطوط متن در هر دسته recognizer برای OCR چندصفحه‌ای
+        self.recognizer_batch_size = self._get_config('ocr.batch.recognizer_batch_size', 32)
+
+        # موتورهای OCR به ترتیب cascade (اولی موتور اصلی است)
+        backend_names = backends or self._get_config('ocr.cascade') or [self._get_config('ocr.backend', 'easyocr')]
+        self.backends = [backend for backend in (create_backend(name, config, self.languages, self.profile)
+                                                 for name in backend_names) if backend is not None]
+        if not self.backends:
+            raise ValueError(f"هیچ موتور OCR معتبری تنظیم نشده است: {backend_names}")
+        self.backend = self.backends[0]
+        self.cascade_min_confidence = self._get_config('ocr.cascade_min_confidence', 0.7)
+
+        # ضبط خروجی readtext برای بازپخش با موتور stub (ocr.stub.record_to)
+        self.record_path = self._get_config('ocr.stub.record_to', '')
+        self.recorder = StubBackend() if self.record_path else None
+
+        # کش پایدار خروجی readtext (در صورت فعال بودن ocr.cache)
+        self.cache = OCRCache.from_config(config)
+
+        # استفاده مجدد از کادرهای detect برای صفحات با چیدمان یکسان (ocr.layout_cache)
+        self.layout_cache = LayoutCache.from_config(config)
+
+        logger.info(f"🎛️ پروفایل OCR: {self.profile['name']} ({', '.join(self.languages)}، "
+                    f"{self.profile['decoder']})")
+
+    def _get_config(self, key_path: str, default: Any = None) -> Any:
+        """خواندن تنظیمات در صورت وجود ConfigManager"""
+        if self.config is None:
+            return default
+        return self.config.get(key_path, default)
+
+    def _limited(self) -> bool:
+        """آیا مهلت یا لغو باید بین مراحل OCR بررسی شود"""
+        return bool(self.timeout) or self.should_stop is not None
 
+    @contextmanager
+    def _time_limit(self, pages: int = 1):
+        """مهلت pages صفحه برای فراخوانی جاری؛ فراخوانی‌های تو در تو مهلت بیرونی را نگه می‌دارند"""
+        if not self.timeout or getattr(self._limits, "deadline", None) is not None:
+            yield
+            return
+
+        self._limits.timeout = self.timeout * pages
+        self._limits.deadline = time.monotonic() + self._limits.timeout
         try:
-            # ساده‌سازی: فقط فارسی و انگلیسی
-            self.reader = easyocr.Reader(['fa', 'en'], gpu=True)
-            logger.info("✅ EasyOCR آماده است")
-        except Exception as e:
-            logger.error(f"❌ خطا در راه‌اندازی EasyOCR: {e}")
-            raise
+            yield
+        finally:
+            self._limits.deadline = None
+
+    def _checkpoint(self):
+        """ایجاد ProcessingCancelled یا PageTimeout در صورت لغو یا پایان مهلت"""
+        if self.should_stop is not None and self.should_stop():
+            raise ProcessingCancelled()
+        deadline = getattr(self._limits, "deadline", None)
+        if deadline is not None and time.monotonic() > deadline:
+            raise PageTimeout(self._limits.timeout)
+
+    def engine_signature(self, backend: OCRBackend = None) -> str:
+        """امضای تنظیمات موتور برای کلید کش (نوع و نسخه موتور، زبان‌ها، پارامترها)"""
+        backend = backend or self.backend
+        signature = backend.signature()
+        if self.layout_cache is not None and backend.supports_boxes:
+            signature += ";layout_reuse"
+        return signature
+
+    def _readtext(self, image: np.ndarray, backend: OCRBackend = None) -> List:
+        """اجرای readtext با مراجعه اول به کش"""
+        backend = backend or self.backend
+        if self.cache is None:
+            return self._record(image, self._readtext_page(image, backend), backend)
+
+        key = OCRCache.make_key(image, self.engine_signature(backend))
+        results = self.cache.get(key)
+        if results is not None:
+            logger.info("♻️ نتیجه OCR از کش خوانده شد")
+            return results
+
+        results = self._record(image, self._readtext_page(image, backend), backend)
+        self.cache.put(key, results)
+        return results
+
+    def _record(self, image: np.ndarray, results: List, backend: OCRBackend) -> List:
+        """ثبت خروجی موتور اصلی برای بازپخش (در صورت فعال بودن ضبط)"""
+        if self.recorder is not None and backend is self.backend:
+            self.recorder.record(image, results)
+        return results
+
+    def save_recording(self):
+        """ذخیره خروجی‌های ضبط شده در ocr.stub.record_to"""
+        if self.recorder is not None:
+            self.recorder.save(self.record_path)
+
+    def _readtext_page(self, image: np.ndarray, backend: OCRBackend) -> List:
+        """OCR یک صفحه؛ در حالت کش چیدمان، detect برای چیدمان‌های شناخته شده حذف می‌شود
+
+        با کش چیدمان یا مهلت/لغو، detect و recognize جداگانه اجرا می‌شوند تا
+        بین آن‌ها مهلت و لغو بررسی شود.
+        """
+        if not backend.supports_boxes or (self.layout_cache is None and not self._limited()):
+            return backend.readtext(image)
+
+        from easyocr.utils import reformat_input
+
+        img, img_cv_grey = reformat_input(image)
+        horizontal_list, free_list, layout = self._detect_boxes(backend, img, img_cv_grey)
+        self._checkpoint()
+        results = backend.recognize(img_cv_grey, horizontal_list, free_list)
+
+        if layout is not None and not self.layout_cache.is_acceptable(results):
+            results = self._redetect(backend, layout, img, img_cv_grey)
+        return results
+
+    def _detect_boxes(self, backend: OCRBackend, img: np.ndarray, img_cv_grey: np.ndarray,
+                      reuse: bool = True) -> tuple:
+        """کادرهای متن صفحه: از کش چیدمان در صورت تطابق، وگرنه detect کامل
+
+        Returns:
+            (horizontal_list, free_list, layout) که layout در صورت استفاده از کش
+            ورودی منطبق و در غیر این صورت None است
+        """
+        if self.layout_cache is not None and reuse:
+            match = self.layout_cache.lookup(img_cv_grey)
+            if match is not None:
+                layout, horizontal_list, free_list = match
+                return horizontal_list, free_list, layout
+
+        horizontal_list, free_list = backend.detect(img)
+        if self.layout_cache is not None:
+            self.layout_cache.store(img_cv_grey, horizontal_list, free_list)
+        return horizontal_list, free_list, None
+
+    def _redetect(self, backend: OCRBackend, layout: Dict[str, Any], img: np.ndarray,
+                  img_cv_grey: np.ndarray) -> List:
+        """بازگشت به detect کامل وقتی کادرهای کش شده با صفحه نمی‌خوانند"""
+        logger.info("🔁 چیدمان صفحه با کش نمی‌خواند، detect کامل اجرا می‌شود")
+        self.layout_cache.invalidate(layout)
+        horizontal_list, free_list, _ = self._detect_boxes(backend, img, img_cv_grey, reuse=False)
+        self._checkpoint()
+        return backend.recognize(img_cv_grey, horizontal_list, free_list)
+
+    def layout_stats(self) -> Dict[str, Any]:
+        """آمار کش چیدمان (یا دیکشنری خالی در صورت غیرفعال بودن)"""
+        return self.layout_cache.stats() if self.layout_cache is not None else {}
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """آمار کش OCR (یا دیکشنری خالی در صورت غیرفعال بودن)"""
+        return self.cache.stats() if self.cache is not None else {}
+
+    def warm_up(self):
+        """شروع آماده‌سازی موتورها در پس‌زمینه (بدون مسدود کردن)"""
+        for backend in self.backends:
+            backend.warm_up()
+
+    def load(self):
+        """بارگذاری کامل موتورها (با انتظار)"""
+        for backend in self.backends:
+            backend.load()
+
+    def readtext(self, image: np.ndarray) -> List:
+        """خروجی خام موتور اصلی: لیست (bbox, text, confidence)"""
+        return self.backend.readtext(image)
 
     def extract_text(self, image: np.ndarray) -> Dict[str, Any]:
         """استخراج متن از تصویر - ساده شده"""
+        with self._time_limit():
+            return self._run_cascade(image)
+
+    def extract_field(self, image: np.ndarray, recognition: str = "text") -> Dict[str, Any]:
+        """OCR ناحیه یک فیلد با حالت بازشناسی آن
+
+        recognition = numeric: recognizer فقط ارقام فارسی/عربی/لاتین و
+        جداکننده‌ها را می‌پذیرد و decoder حریصانه است؛ سایر حالت‌ها مانند
+        extract_text.
+        """
+        overrides = RECOGNITION_MODES.get(recognition)
+        if not overrides:
+            return self.extract_text(image)
+
+        backend = self.backend
+        self._checkpoint()
         try:
             start_time = time.time()
+            if self.cache is None:
+                results = backend.readtext(image, **overrides)
+            else:
+                key = OCRCache.make_key(image, f"{self.engine_signature(backend)};recognition={recognition}")
+                results = self.cache.get(key)
+                if results is None:
+                    results = backend.readtext(image, **overrides)
+                    self.cache.put(key, results)
+
+            result = self._build_result(results, time.time() - start_time, backend.name)
+            result['recognition'] = recognition
+            return result
+
+        except (PageTimeout, ProcessingCancelled):
+            raise
+        except Exception as e:
+            logger.error(f"❌ خطا در OCR فیلد ({recognition}): {e}")
+            return self._error_result(e, backend.name)
 
-            # استخراج متن
-            results = self.reader.readtext(image)
+    def _run_backend(self, image: np.ndarray, backend: OCRBackend) -> Dict[str, Any]:
+        """OCR تصویر با یک موتور و ساخت دیکشنری نتیجه"""
+        try:
+            start_time = time.time()
 
-            # ترکیب تمام متن‌ها
-            text_parts = []
-            total_confidence = 0
+            # استخراج متن (ابتدا از کش)
+            results = self._readtext(image, backend)
 
-            for (bbox, text, confidence) in results:
-                if confidence > 0.5:  # حد آستانه ثابت
-                    text_parts.append(text)
-                    total_confidence += confidence
+            return self._build_result(results, time.time() - start_time, backend.name)
 
-            full_text = ' '.join(text_parts)
-            avg_confidence = total_confidence / len(results) if results else 0
-            processing_time = time.time() - start_time
+        except (PageTimeout, ProcessingCancelled):
+            raise
+        except Exception as e:
+            logger.error(f"❌ خطا در OCR ({backend.name}): {e}")
+            return self._error_result(e, backend.name)
 
-            result = {
-                'text': full_text,
-                'confidence': avg_confidence,
-                'processing_time': processing_time,
-                'method': 'easyocr',
-                'text_length': len(full_text)
-            }
+    def _run_cascade(self, image: np.ndarray, first_result: Dict[str, Any] = None) -> Dict[str, Any]:
+        """اجرای موتورها به ترتیب تا رسیدن به اعتماد کافی
 
-            logger.info(f"✅ OCR: {len(full_text)} کاراکتر، اعتماد: {avg_confidence:.2f}")
-            return result
+        Args:
+            first_result: نتیجه آماده موتور اول (مثلاً از OCR دسته‌ای)
 
+        Returns:
+            نتیجه با بیشترین اعتماد؛ در حالت cascade تلاش‌ها در backend_attempts
+        """
+        results = []
+        for index, backend in enumerate(self.backends):
+            self._checkpoint()
+            if index == 0 and first_result is not None:
+                result = first_result
+            else:
+                result = self._run_backend(image, backend)
+            results.append(result)
+
+            if 'error' not in result and result['confidence'] >= self.cascade_min_confidence:
+                break
+            if index + 1 < len(self.backends):
+                logger.info(f"⏭️ اعتماد {backend.name} کافی نیست ({result['confidence']:.2f})، "
+                            f"تلاش با {self.backends[index + 1].name}")
+
+        # مانند OCRWorker، صفحه‌ای که از مهلت گذشته باشد نتیجه ندارد
+        self._checkpoint()
+
+        if len(self.backends) == 1:
+            return results[0]
+
+        best = max(results, key=lambda item: item['confidence'])
+        best['backend_attempts'] = [{"backend": item['method'], "confidence": item['confidence']}
+                                    for item in results]
+        return best
+
+    def extract_text_batch(self, images: List[np.ndarray], batch_size: int = None) -> List[Dict[str, Any]]:
+        """استخراج متن چند صفحه با دسته‌بندی مشترک recognizer
+
+        تشخیص متن (CRAFT) برای هر صفحه جداگانه انجام می‌شود، سپس تصاویر
+        خاکستری صفحات زیر هم روی یک بوم قرار می‌گیرند تا recognize تمام
+        خطوط همه صفحات را در دسته‌های batch_size تایی پردازش کند. نتایج بر
+        اساس موقعیت عمودی به صفحه مربوط برگردانده می‌شوند. موتورهای بدون
+        detect/recognize جداگانه صفحه به صفحه پردازش می‌شوند.
+
+        Returns:
+            لیست نتایج به ترتیب ورودی، هر کدام با همان ساختار extract_text
+        """
+        if not images:
+            return []
+        with self._time_limit(len(images)):
+            return self._extract_text_batch(images, batch_size)
+
+    def _extract_text_batch(self, images: List[np.ndarray], batch_size: int = None) -> List[Dict[str, Any]]:
+        if len(images) == 1 or not self.backend.supports_boxes:
+            return [self._run_cascade(image) for image in images]
+
+        batch_size = batch_size or self.recognizer_batch_size
+        start_time = time.time()
+        raw_results = [None] * len(images)
+        keys = [None] * len(images)
+
+        try:
+            # صفحات موجود در کش
+            if self.cache is not None:
+                for index, image in enumerate(images):
+                    keys[index] = OCRCache.make_key(image, self.engine_signature())
+                    raw_results[index] = self.cache.get(keys[index])
+
+            pending = [index for index, result in enumerate(raw_results) if result is None]
+            if pending:
+                batched = self._readtext_batched([images[index] for index in pending], batch_size)
+                for index, results in zip(pending, batched):
+                    raw_results[index] = self._record(images[index], results, self.backend)
+                    if self.cache is not None:
+                        self.cache.put(keys[index], results)
+
+            per_page_time = (time.time() - start_time) / len(images)
+            logger.info(f"📚 OCR دسته‌ای: {len(images)} صفحه ({len(pending)} از مدل)")
+            first_results = [self._build_result(results, per_page_time, self.backend.name)
+                             for results in raw_results]
+
+        except (PageTimeout, ProcessingCancelled):
+            raise
+        except Exception as e:
+            logger.error(f"❌ خطا در OCR دسته‌ای، پردازش صفحه به صفحه: {e}")
+            return [self._run_cascade(image) for image in images]
+
+        return [self._run_cascade(image, result) for image, result in zip(images, first_results)]
+
+    def _readtext_batched(self, images: List[np.ndarray], batch_size: int) -> List[List]:
+        """detect جداگانه برای هر صفحه و recognize یکجا روی بوم صفحات"""
+        from easyocr.utils import reformat_input
+
+        backend = self.backend
+        images_rgb = []
+        greys = []
+        layouts = []
+        horizontal_all = []
+        free_all = []
+        offsets = []
+        y_offset = 0
+
+        for image in images:
+            self._checkpoint()
+            img, img_cv_grey = reformat_input(image)
+            horizontal_list, free_list, layout = self._detect_boxes(backend, img, img_cv_grey)
+
+            offsets.append(y_offset)
+            for x_min, x_max, y_min, y_max in horizontal_list:
+                horizontal_all.append([x_min, x_max, y_min + y_offset, y_max + y_offset])
+            for box in free_list:
+                free_all.append([[x, y + y_offset] for x, y in box])
+
+            images_rgb.append(img)
+            greys.append(img_cv_grey)
+            layouts.append(layout)
+            y_offset += img_cv_grey.shape[0]
+
+        page_results = [[] for _ in images]
+        if horizontal_all or free_all:
+            # بوم خاکستری: صفحات زیر هم، عرض برابر با عریض‌ترین صفحه
+            width = max(grey.shape[1] for grey in greys)
+            canvas = np.full((y_offset, width), 255, dtype=np.uint8)
+            for grey, offset in zip(greys, offsets):
+                canvas[offset:offset + grey.shape[0], :grey.shape[1]] = grey
+
+            self._checkpoint()
+            results = backend.recognize(canvas, horizontal_all, free_all, batch_size)
+
+            for bbox, text, confidence in results:
+                center_y = sum(point[1] for point in bbox) / len(bbox)
+                page_index = max(0, bisect.bisect_right(offsets, center_y) - 1)
+                offset = offsets[page_index]
+                page_bbox = [[point[0], point[1] - offset] for point in bbox]
+                page_results[page_index].append((page_bbox, text, confidence))
+
+        # صفحاتی که با کادرهای کش شده نتیجه قابل قبول نداده‌اند
+        for index, layout in enumerate(layouts):
+            if layout is not None and not self.layout_cache.is_acceptable(page_results[index]):
+                page_results[index] = self._redetect(backend, layout, images_rgb[index], greys[index])
+
+        return page_results
+
+    def recognize_regions(self, images: List[np.ndarray], batch_size: int = None) -> List[tuple]:
+        """بازشناسی متن چند تصویر کوچک (هر کدام یک کادر متن) بدون detect
+
+        برای موتورهای دارای recognize، تصاویر زیر هم روی یک بوم خاکستری قرار
+        می‌گیرند و کل تصویر هر کدام یک کادر در نظر گرفته می‌شود تا همه با یک
+        فراخوانی recognizer پردازش شوند.
+
+        Returns:
+            لیست (text, confidence) به ترتیب ورودی
+        """
+        if not images:
+            return []
+
+        self._checkpoint()
+        backend = self.backend
+        region_results = [[] for _ in images]
+
+        if backend.supports_boxes:
+            greys = [image if image.ndim == 2 else image[..., :3].mean(axis=2).astype(np.uint8)
+                     for image in images]
+            offsets = []
+            horizontal_list = []
+            y_offset = 0
+            for grey in greys:
+                offsets.append(y_offset)
+                horizontal_list.append([0, grey.shape[1], y_offset, y_offset + grey.shape[0]])
+                y_offset += grey.shape[0]
+
+            canvas = np.full((y_offset, max(grey.shape[1] for grey in greys)), 255, dtype=np.uint8)
+            for grey, offset in zip(greys, offsets):
+                canvas[offset:offset + grey.shape[0], :grey.shape[1]] = grey
+
+            results = backend.recognize(canvas, horizontal_list, [], batch_size or self.recognizer_batch_size)
+            for bbox, text, confidence in results:
+                center_y = sum(point[1] for point in bbox) / len(bbox)
+                region_results[max(0, bisect.bisect_right(offsets, center_y) - 1)].append((text, confidence))
+        else:
+            for index, image in enumerate(images):
+                region_results[index] = [(text, confidence) for _, text, confidence in backend.readtext(image)]
+
+        merged = []
+        for results in region_results:
+            if results:
+                merged.append((' '.join(text for text, _ in results),
+                               sum(confidence for _, confidence in results) / len(results)))
+            else:
+                merged.append(('', 0.0))
+        return merged
+
+    def refine(self, ocr_result: Dict[str, Any], regions: Dict[int, np.ndarray]) -> Dict[str, Any]:
+        """جایگزینی کلمات کم‌اعتماد با بازشناسی دوباره تصویر دقیق‌تر آن‌ها
+
+        Args:
+            ocr_result: نتیجه extract_text شامل words
+            regions: اندیس کلمه -> تصویر کادر آن با رزولوشن بالاتر
+
+        Returns:
+            همان نتیجه با کلمات، متن و اعتماد به‌روز شده و خلاصه refinement
+        """
+        words = ocr_result.get('words')
+        if words is None or not regions:
+            return ocr_result
+
+        indices = list(regions)
+        try:
+            refined = self.recognize_regions([regions[index] for index in indices])
         except Exception as e:
-            logger.error(f"❌ خطا در OCR: {e}")
-            return {
-                'text': '',
-                'confidence': 0,
-                'processing_time': 0,
-                'method': 'easyocr',
-                'error': str(e)
-            }
\ No newline at end of file
+            logger.error(f"❌ خطا در بازشناسی کادرهای کم‌اعتماد: {e}")
+            return ocr_result
+
+        texts = list(words["texts"])
+        confidences = words["confidences"].copy()
+        improved = 0
+        for index, (text, confidence) in zip(indices, refined):
+            # فقط در صورت بهبود اعتماد جایگزین می‌شود
+            if text and confidence > confidences[index]:
+                texts[index] = text
+                confidences[index] = confidence
+                improved += 1
+
+        words["texts"] = np.array(texts, dtype=np.str_) if texts else words["texts"]
+        words["confidences"] = confidences
+        full_text, avg_confidence = self._summarize(texts, confidences)
+
+        ocr_result['text'] = full_text
+        ocr_result['text_length'] = len(full_text)
+        ocr_result['confidence'] = avg_confidence
+        ocr_result['refinement'] = {"regions": len(indices), "improved": improved}
+        logger.info(f"🔬 بازشناسی {len(indices)} کادر کم‌اعتماد: {improved} بهبود، "
+                    f"اعتماد صفحه {avg_confidence:.2f}")
+        return ocr_result
+
+    def _summarize(self, texts: List[str], confidences) -> tuple:
+        """متن کامل و میانگین اعتماد از متن و اعتماد کلمات"""
+        # ترکیب متن‌های بالاتر از آستانه اعتماد پروفایل
+        text_parts = []
+        total_confidence = 0
+
+        for text, confidence in zip(texts, confidences):
+            if confidence > self.min_confidence:
+                text_parts.append(text)
+                total_confidence += confidence
+
+        avg_confidence = float(total_confidence / len(texts)) if len(texts) else 0
+        return ' '.join(text_parts), avg_confidence
+
+    def _build_result(self, results: List, processing_time: float, method: str = 'easyocr') -> Dict[str, Any]:
+        """ترکیب خروجی readtext در دیکشنری نتیجه"""
+        full_text, avg_confidence = self._summarize([text for _, text, _ in results],
+                                                    [confidence for _, _, confidence in results])
+
+        result = {
+            'text': full_text,
+            'confidence': avg_confidence,
+            'processing_time': processing_time,
+            'method': method,
+            'text_length': len(full_text),
+            'profile': self.profile['name'],
+            # هندسه کلمات: boxes/texts/confidences به صورت آرایه NumPy
+            'words': words_from_readtext(results)
+        }
+
+        logger.info(f"✅ OCR: {len(full_text)} کاراکتر، اعتماد: {avg_confidence:.2f}")
+        return result
+
+    def _error_result(self, error: Exception, method: str = 'easyocr') -> Dict[str, Any]:
+        """نتیجه خالی در صورت خطای OCR"""
+        return {
+            'text': '',
+            'confidence': 0,
+            'processing_time': 0,
+            'method': method,
+            'error': str(error)
+        }
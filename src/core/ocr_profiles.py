@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+پروفایل‌های موتور OCR - زبان‌ها، decoder، اندازه دسته و آستانه‌ها
+"""
+
+import logging
+from typing import Dict, Any
+
+logger = logging.getLogger(__name__)
+
+# پارامترهای readtext که به detect و recognize EasyOCR داده می‌شوند
+DETECT_PARAMS = ("canvas_size", "mag_ratio", "text_threshold", "low_text", "link_threshold")
+RECOGNIZE_PARAMS = ("decoder", "beamWidth", "allowlist", "blocklist")
+
+# balanced همان تنظیمات پیش‌فرض EasyOCR است؛ fast کوچک‌تر و حریصانه،
+# accurate بزرگ‌تر با beam search
+DEFAULT_PROFILES = {
+    "fast": {
+        "languages": ["fa", "en"],
+        "decoder": "greedy",
+        "beamWidth": 1,
+        "batch_size": 16,
+        "canvas_size": 1600,
+        "mag_ratio": 1.0,
+        "text_threshold": 0.7,
+        "low_text": 0.4,
+        "link_threshold": 0.4,
+        "allowlist": None,
+        "blocklist": None,
+        "min_confidence": 0.5
+    },
+    "balanced": {
+        "languages": ["fa", "en"],
+        "decoder": "greedy",
+        "beamWidth": 5,
+        "batch_size": 1,
+        "canvas_size": 2560,
+        "mag_ratio": 1.0,
+        "text_threshold": 0.7,
+        "low_text": 0.4,
+        "link_threshold": 0.4,
+        "allowlist": None,
+        "blocklist": None,
+        "min_confidence": 0.5
+    },
+    "accurate": {
+        "languages": ["fa", "en"],
+        "decoder": "beamsearch",
+        "beamWidth": 10,
+        "batch_size": 8,
+        "canvas_size": 3200,
+        "mag_ratio": 1.5,
+        "text_threshold": 0.6,
+        "low_text": 0.3,
+        "link_threshold": 0.4,
+        "allowlist": None,
+        "blocklist": None,
+        "min_confidence": 0.4
+    }
+}
+
+DEFAULT_PROFILE = "balanced"
+
+# ارقام لاتین، فارسی و عربی-هندی به همراه جداکننده‌های اعشار و هزارگان
+NUMERIC_ALLOWLIST = "0123456789" "۰۱۲۳۴۵۶۷۸۹" "٠١٢٣٤٥٦٧٨٩" ".,/٫٬"
+
+# بازنویسی پارامترهای recognizer برای ناحیه یک فیلد (recognition در تعریف فیلد)
+RECOGNITION_MODES = {
+    "numeric": {"allowlist": NUMERIC_ALLOWLIST, "blocklist": None, "decoder": "greedy"}
+}
+
+
+def load_profile(config=None, name: str = None) -> Dict[str, Any]:
+    """تنظیمات پروفایل فعال
+
+    ترتیب اولویت: ocr.profiles.<name> در تنظیمات، سپس پروفایل داخلی هم‌نام،
+    سپس allowlist / blocklist عمومی ocr.easyocr. نام پروفایل از آرگومان
+    name یا ocr.profile خوانده می‌شود.
+
+    Returns:
+        دیکشنری تنظیمات شامل کلید name
+    """
+    def get(key_path, default=None):
+        return config.get(key_path, default) if config is not None else default
+
+    name = name or get('ocr.profile', DEFAULT_PROFILE)
+    overrides = (get('ocr.profiles', {}) or {}).get(name)
+
+    if name not in DEFAULT_PROFILES and overrides is None:
+        logger.warning(f"⚠️ پروفایل OCR ناشناخته: {name}، از {DEFAULT_PROFILE} استفاده می‌شود")
+        name = DEFAULT_PROFILE
+
+    profile = dict(DEFAULT_PROFILES.get(name, DEFAULT_PROFILES[DEFAULT_PROFILE]))
+    for key in ("allowlist", "blocklist"):
+        if profile.get(key) is None:
+            profile[key] = get(f'ocr.easyocr.{key}')
+    profile.update(overrides or {})
+    profile["name"] = name
+    return profile
+
+
+def profile_names(config=None) -> list:
+    """نام پروفایل‌های داخلی و تعریف شده در تنظیمات"""
+    custom = config.get('ocr.profiles', {}) if config is not None else {}
+    return list(DEFAULT_PROFILES) + [name for name in (custom or {}) if name not in DEFAULT_PROFILES]
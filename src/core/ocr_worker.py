@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+کارگر OCR در پردازه جداگانه - مهلت زمانی هر فراخوانی و امکان kill
+"""
+
+import logging
+import threading
+import time
+from multiprocessing import get_context
+from typing import Optional, List, Dict, Any, Callable
+
+import numpy as np
+
+from .batch import ConfigSnapshot, limit_threads, thread_env
+from .cancellation import PageTimeout, ProcessingCancelled
+
+logger = logging.getLogger(__name__)
+
+
+def _worker_main(conn, config_snapshot: ConfigSnapshot, profile: Optional[str] = None,
+                 threads: Optional[int] = None):
+    """حلقه پردازه کارگر: دریافت (متد، آرگومان‌ها) و اجرای آن روی OCREngine"""
+    # BLAS/OpenMP با thread_env هنگام شروع پردازه محدود شده است؛ اینجا torch
+    if threads:
+        limit_threads(threads)
+
+    from .ocr_engine import OCREngine
+
+    try:
+        engine = OCREngine(config_snapshot, profile=profile)
+        engine.load()
+        conn.send(("ready", None))
+    except Exception as e:
+        conn.send(("error", str(e)))
+        return
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+
+        method, args = message
+        try:
+            conn.send(("ok", getattr(engine, method)(*args)))
+        except Exception as e:
+            conn.send(("error", str(e)))
+
+
+class OCRWorker:
+    """رابط OCREngine که فراخوانی‌ها را در پردازه جداگانه اجرا می‌کند
+
+    هر فراخوانی مهلت زمانی دارد؛ اگر از مهلت بگذرد یا should_stop برقرار
+    شود، پردازه کارگر kill شده و PageTimeout یا ProcessingCancelled ایجاد
+    می‌شود. پردازه بعدی در فراخوانی بعد به صورت خودکار ساخته می‌شود. زمان
+    بارگذاری مدل جزو مهلت صفحه حساب نمی‌شود.
+
+    تصویر هر صفحه از طریق Pipe به کارگر کپی می‌شود، پس این حالت اختیاری
+    است (processing.isolate_ocr). threads محدودیت threadهای کارگر است (مثلاً
+    سهم هر کارگر BatchProcessor).
+    """
+
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, config=None, timeout: float = 600, should_stop: Callable[[], bool] = None,
+                 profile: str = None, threads: int = None):
+        self.config = ConfigSnapshot.from_config(config)
+        self.profile = profile
+        self.threads = threads
+        self.timeout = timeout
+        self.should_stop = should_stop
+        self.restarts = 0
+        self._process = None
+        self._conn = None
+        self._ready = False
+        self._lock = threading.RLock()
+
+    def start(self):
+        """ساخت پردازه کارگر در صورت نبود (بدون انتظار برای بارگذاری مدل)"""
+        with self._lock:
+            if self._process is not None and self._process.is_alive():
+                return
+
+            context = get_context("spawn")
+            parent_conn, child_conn = context.Pipe()
+            self._process = context.Process(target=_worker_main, args=(child_conn, self.config, self.profile, self.threads),
+                                            name="ocr-worker", daemon=True)
+            with thread_env(self.threads):
+                self._process.start()
+            child_conn.close()
+            self._conn = parent_conn
+            self._ready = False
+            logger.info(f"👷 کارگر OCR راه‌اندازی شد (pid {self._process.pid})")
+
+    def warm_up(self):
+        """شروع بارگذاری مدل در پردازه کارگر"""
+        self.start()
+
+    def _stopped(self) -> bool:
+        return self.should_stop is not None and self.should_stop()
+
+    def _wait(self, deadline: Optional[float], timeout: float):
+        """انتظار برای پاسخ با بررسی مهلت، لغو و زنده بودن کارگر"""
+        while not self._conn.poll(self.POLL_INTERVAL):
+            if self._stopped():
+                self._kill("لغو پردازش")
+                raise ProcessingCancelled()
+            if deadline is not None and time.monotonic() > deadline:
+                self._kill(f"مهلت {timeout:.0f} ثانیه")
+                raise PageTimeout(timeout)
+            if not self._process.is_alive():
+                self._kill("خروج غیرمنتظره")
+                raise RuntimeError("کارگر OCR به طور غیرمنتظره متوقف شد")
+        return self._conn.recv()
+
+    def call(self, method: str, *args, timeout: float = None) -> Any:
+        """اجرای متد OCREngine در کارگر با مهلت timeout (None = مهلت پیش‌فرض، 0 = بدون مهلت)"""
+        timeout = self.timeout if timeout is None else timeout
+        if self._stopped():
+            raise ProcessingCancelled()
+
+        with self._lock:
+            self.start()
+            if not self._ready:
+                # بارگذاری مدل: بدون مهلت، فقط قابل لغو
+                status, value = self._wait(None, 0)
+                if status != "ready":
+                    self._kill("خطای راه‌اندازی")
+                    raise RuntimeError(f"کارگر OCR راه‌اندازی نشد: {value}")
+                self._ready = True
+
+            self._conn.send((method, args))
+            deadline = time.monotonic() + timeout if timeout else None
+            status, value = self._wait(deadline, timeout)
+
+        if status == "error":
+            raise RuntimeError(value)
+        return value
+
+    def _kill(self, reason: str):
+        """توقف اجباری پردازه کارگر"""
+        logger.warning(f"⛔ توقف کارگر OCR ({reason})")
+        if self._process is not None:
+            self._process.kill()
+            self._process.join(timeout=5)
+        if self._conn is not None:
+            self._conn.close()
+        self._process = None
+        self._conn = None
+        self._ready = False
+        self.restarts += 1
+
+    def close(self):
+        """بستن مرتب پردازه کارگر"""
+        with self._lock:
+            if self._process is None:
+                return
+            try:
+                self._conn.send(None)
+                self._process.join(timeout=5)
+            except (OSError, EOFError):
+                pass
+            if self._process.is_alive():
+                self._process.kill()
+            self._conn.close()
+            self._process = None
+            self._conn = None
+            self._ready = False
+
+    # رابط هم‌شکل OCREngine
+
+    def extract_text(self, image: np.ndarray) -> Dict[str, Any]:
+        return self.call("extract_text", image)
+
+    def extract_text_batch(self, images: List[np.ndarray], batch_size: int = None) -> List[Dict[str, Any]]:
+        # مهلت دسته متناسب با تعداد صفحات
+        return self.call("extract_text_batch", images, batch_size,
+                         timeout=self.timeout * len(images) if self.timeout else 0)
+
+    def extract_field(self, image: np.ndarray, recognition: str = "text") -> Dict[str, Any]:
+        return self.call("extract_field", image, recognition)
+
+    def readtext(self, image: np.ndarray) -> List:
+        return self.call("readtext", image)
+
+    def refine(self, ocr_result: Dict[str, Any], regions: Dict[int, np.ndarray]) -> Dict[str, Any]:
+        return self.call("refine", ocr_result, regions)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self._call_if_running("cache_stats", {})
+
+    def layout_stats(self) -> Dict[str, Any]:
+        return self._call_if_running("layout_stats", {})
+
+    def save_recording(self):
+        self._call_if_running("save_recording", None)
+
+    def _call_if_running(self, method: str, default: Any) -> Any:
+        """فراخوانی متدهای آماری فقط اگر کارگر آماده باشد"""
+        if not self._ready:
+            return default
+        try:
+            return self.call(method, timeout=0)
+        except Exception as e:
+            logger.error(f"❌ خطا در {method} کارگر OCR: {e}")
+            return default
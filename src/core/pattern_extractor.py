@@ -9,6 +9,9 @@ import re
 import logging
 from typing import Dict, Any, List
 from datetime import datetime
+from .safe_regex import compile_pattern, resolve_engine, lint_patterns, PATTERN_TIMEOUT
+from .pattern_registry import registry, resolve_pack_path, PatternPack
+from .text_normalizer import normalize_text, normalize_tokens, to_latin_digits, tokenize
 
 logger = logging.getLogger(__name__)
 
@@ -16,174 +19,196 @@ logger = logging.getLogger(__name__)
 class CustomsPatternExtractor:
     """استخراج‌کننده الگوهای گمرکی - ساده شده"""
 
-    def __init__(self):
+    def __init__(self, config=None):
+        self.config = config
+        # موتور اجرای الگوها: RE2 (زمان خطی) یا regex با مهلت هر الگو
+        self.engine = resolve_engine(self._get_config('patterns.engine', 'auto'))
+        self.pattern_timeout = self._get_config('patterns.timeout', PATTERN_TIMEOUT)
+
+        # بسته الگو؛ با تغییر فایل در حین اجرا (دسته‌ای یا GUI) دوباره بارگذاری می‌شود
+        self.pack_path = resolve_pack_path(config)
+        self.hot_reload = self._get_config('patterns.hot_reload', True)
         self.setup_patterns()
         logger.info("🎯 Pattern Extractor آماده است")
 
     def setup_patterns(self):
-        """تنظیم الگوهای استخراج - مطابق کد تست"""
-        self.patterns = {
-            "کد_کالا": {
-                "patterns": [
-                    r'"ك٧٧"[^"]*"(\d{8})"',
-                    r'"(\d{8})"[^"]*"٠٣٢"',
-                    r'ك٧٧.*?"(\d{8})"'
-                ],
-                "type": "string",
-                "description": "کد 8 رقمی کالا که معمولاً قبل از '٠٣٢' یا بعد از 'ك٧٧' قرار دارد"
-            },
-            "کد_ثبت_سفارش": {
-                "patterns": [
-                    r'"سفارشس"[^"]*"(\d{8})"',
-                    r'سفارشس.*?"(\d{8})"',
-                    r'ثبت.*?سفارش.*?"(\d{8})"'
-                ],
-                "type": "string",
-                "description": "کد 8 رقمی ثبت سفارش که معمولاً بعد از 'سفارشس' قرار دارد"
-            },
-            "وزن_ناخالص": {
-                "patterns": [
-                    r'"(\d+)"[^"]*"س"[^"]*"(\d+)"[^"]*"٣٨"',
-                    r'وزن.*?"(\d+)"',
-                    r'"(\d+)"\s*"٣٨"'
-                ],
-                "type": "float",
-                "description": "وزن ناخالص کالا که معمولاً قبل از '٣٨' قرار دارد"
-            },
-            "نوع_بسته": {
-                "patterns": [
-                    r'"نوع"\s*"بسته"\s*"(\w+)"',
-                    r'بسته.*?"(نگله|رول|گونی|کارتن|عدد|جعبه|سایر|پالت|نکله)"',
-                    r'نوع.*?بسته.*?"(\w+)"'
-                ],
-                "type": "string",
-                "valid_values": ["نگله", "رول", "گونی", "کارتن", "عدد", "جعبه", "سایر", "پالت", "نکله"],
-                "description": "نوع بسته بندی کالا از مقادیر مشخص شده"
-            },
-            "نرخ_ارز": {
-                "patterns": [
-                    r'"(\d{6}\.0)"',
-                    r'نرخ.*?ارز.*?"(\d{6}\.0)"',
-                    r'ارز.*?"(\d{6}\.0)"'
-                ],
-                "type": "float",
-                "description": "نرخ ارز به صورت عدد 6 رقمی با .0 در انتها"
-            },
-            "نوع_معامله": {
-                "patterns": [
-                    r'"(حواله\s*ارزی|حواله)"[^"]*"ادزی"',
-                    r'نوع.*?معامله.*?"(پیله\s*وری|حواله\s*ارزی|برات)"',
-                    r'معامله.*?"(\w+\s*\w+)"'
-                ],
-                "type": "string",
-                "mapping": {"حواله": "حواله ارزی"},
-                "description": "نوع معامله که می‌تواند پیله وری، حواله ارزی یا برات باشد"
-            },
-            "نوع_ارز": {
-                "patterns": [
-                    r'"(يورو|EUR|USD|GBP)"',
-                    r'ارز.*?"(\w+)"',
-                    r'"(يورو)"[^"]*"بانکی"'
-                ],
-                "type": "string",
-                "description": "نوع ارز مورد استفاده در معامله"
-            },
-            "مبلغ_کل_فاکتور": {
-                "patterns": [
-                    r'"انبار"[^"]*"(\d+,\d+)"[^"]*"(\d+)"[^"]*"بىكيرى"',
-                    r'فاكتور.*?"(\d+(?:,\d+)*)"',
-                    r'مبلغ.*?كل.*?"(\d+(?:,\d+)*)"'
-                ],
-                "type": "float",
-                "description": "مبلغ کل فاکتور که معمولاً به صورت عدد با ممیز است"
-            },
-            "تعداد_واحد_کالا": {
-                "patterns": [
-                    r'"(\d+)"[^"]*"بىكيرى"',
-                    r'تعداد.*?واحد.*?"(\d+)"',
-                    r'واحد.*?كالا.*?"(\d+)"'
-                ],
-                "type": "int",
-                "description": "تعداد واحدهای کالا"
-            },
-            "شرح_کالا": {
-                "patterns": [
-                    r'"شرح"\s*"کالا"\s*"([^"]+)"\s*"([^"]+)"\s*"([^"]+)"[^"]*"باقی"',
-                    r'کالا.*?"([^"]+)"\s*"([^"]+)"\s*"([^"]+)".*?باقی'
-                ],
-                "type": "string",
-                "description": "شرح کامل کالا که معمولاً بین 'کالا' و 'باقی' قرار دارد"
-            },
-            "بیمه": {
-                "patterns": [
-                    r'بیمه.*?"(\d+)"',
-                    r'نرخ.*?تعديل.*?نرخ.*?"(\d+)"',
-                    r'"(\d+)"[^"]*"بیمه"'
-                ],
-                "type": "float",
-                "description": "مبلغ بیمه کالا"
-            },
-            "ارزش_گمرکی_قلم_کالا": {
-                "patterns": [
-                    r'"(\d+,\d+)"[^"]*"اسناد"',
-                    r'ارزش.*?گمركى.*?"(\d+(?:,\d+)*)"',
-                    r'قلم.*?كالا.*?"(\d+(?:,\d+)*)"'
-                ],
-                "type": "float",
-                "description": "ارزش گمرکی قلم کالا"
-            },
-            "جمع_حقوق_و_عوارض": {
-                "patterns": [
-                    r'مدسه.*?"(\d+)"',
-                    r'جمع.*?حقوق.*?"(\d+)"',
-                    r'"(\d+)"[^"]*"مدسه"'
-                ],
-                "type": "int",
-                "description": "جمع حقوق و عوارض گمرکی"
-            },
-            "مبلغ_مالیات_بر_ارزش_افزوده": {
-                "patterns": [
-                    r'رسید.*?"(\d+)"',
-                    r'مالیات.*?ارزش.*?"(\d+(?:,\d+)*)"',
-                    r'"(\d+)"[^"]*"رسید"'
-                ],
-                "type": "int",
-                "description": "مبلغ مالیات بر ارزش افزوده"
-            },
-            "مبلغ_حقوق_ورودی": {
-                "patterns": [
-                    r'تضمین.*?"(\d+)"',
-                    r'حقوق.*?ورودی.*?"(\d+(?:,\d+)*)"',
-                    r'"(\d+)"[^"]*"تضمین"'
-                ],
-                "type": "int",
-                "description": "مبلغ حقوق ورودی"
-            }
-        }
+        """بارگذاری الگوهای استخراج از بسته JSON (patterns.import_patterns_file)
+
+        بدون بسته الگو همه صفحات بدون هیچ فیلدی استخراج می‌شوند، پس در این
+        حالت خطا ایجاد می‌شود.
+        """
+        pack = registry.get(self.pack_path, self.engine, self.pattern_timeout)
+        if pack is None:
+            raise RuntimeError(f"بسته الگوهای استخراج بارگذاری نشد: {self.pack_path}")
+        self._use_pack(pack)
+
+    def refresh_patterns(self) -> bool:
+        """بارگذاری مجدد بسته الگو در صورت تغییر فایل (بدون ساخت دوباره موتور OCR)
+
+        Returns:
+            True اگر نسخه جدیدی جایگزین شده باشد
+        """
+        if not self.hot_reload:
+            return False
+        pack = registry.get(self.pack_path, self.engine, self.pattern_timeout)
+        if pack is self.pack:
+            return False
+        self._use_pack(pack)
+        return True
+
+    def _use_pack(self, pack: PatternPack):
+        """جایگزینی الگوها و موتورهای کامپایل شده با نسخه pack"""
+        self.pack = pack
+        self.patterns = pack.patterns
+        self.anchor_extractor = pack.anchor_extractor
+        self.spatial_extractor = pack.spatial_extractor
+        self._lint_patterns()
+
+    def _get_config(self, key_path: str, default: Any = None) -> Any:
+        """خواندن تنظیمات در صورت وجود ConfigManager"""
+        if self.config is None:
+            return default
+        return self.config.get(key_path, default)
+
+    def _lint_patterns(self):
+        """بررسی الگوها هنگام بارگذاری: کمیت‌سنج‌های تو در تو یا تنبل نامحدود
+
+        زمان بدترین حالت روی ورودی مصنوعی با benchmarks/bench_pattern_safety.py
+        گزارش می‌شود.
+        """
+        reports = lint_patterns(self.patterns, self.engine)
+        flagged = [report for report in reports if report["issues"]]
+        for report in flagged:
+            logger.debug(f"🔍 {report['field']} [{report['engine']}] {report['pattern']}: "
+                         f"{'، '.join(report['issues'])}")
+
+        unsafe = [report for report in flagged if report["engine"] == "re"]
+        if unsafe:
+            logger.warning(f"⚠️ {len(unsafe)} الگوی پرخطر از نظر عقبگرد بدون محدودیت زمانی اجرا می‌شوند: "
+                           f"{', '.join(sorted({report['field'] for report in unsafe}))}")
+        elif flagged:
+            logger.info(f"🔍 {len(flagged)} الگو از {len(reports)} عقبگرد پرهزینه دارند "
+                        f"(اجرا با {', '.join(sorted({report['engine'] for report in flagged}))})")
+
+    def create_structured_json(self, text: str, page_number: int, keep_fields: Dict[str, Any] = None,
+                               extraction_method: str = "regex_patterns") -> Dict[str, Any]:
+        """ایجاد JSON ساختاریافته - مطابق کد تست
+
+        متن یک بار نرمال می‌شود (ك/ک، ى/ی، ارقام عربی و فارسی)، لنگرهای همه
+        فیلدها یک بار نمایه می‌شوند و الگوها فقط در بازه‌هایی از متن اطراف
+        لنگرها اجرا می‌شوند که هر تطابق ممکن در آن قرار دارد
+        (AnchorIndexedExtractor). raw_value هر فیلد از متن اصلی صفحه برداشته
+        می‌شود.
+
+        Args:
+            keep_fields: نتایج آماده فیلدها که بدون جستجوی متن نگه داشته می‌شوند
+                (مثلاً مقادیر قالب فرم یا حالت مکانی هنگام استخراج مجدد)
+            extraction_method: روش ثبت شده در document_info
+        """
+        self.refresh_patterns()
+        keep_fields = keep_fields or {}
+        customs_fields = {}
+        start_time = datetime.now()
 
-    def create_structured_json(self, text: str, page_number: int) -> Dict[str, Any]:
-        """ایجاد JSON ساختاریافته - مطابق کد تست"""
+        page_index = self.index_page(text)
+        for field_name in self.patterns:
+            if field_name in keep_fields:
+                customs_fields[field_name] = keep_fields[field_name]
+                continue
+            customs_fields[field_name] = self._extract_field_indexed(page_index, field_name)
+
+        end_time = datetime.now()
+        return self._build_structured_json(customs_fields, text, page_number, extraction_method,
+                                           (end_time - start_time).total_seconds())
+
+    def create_structured_json_spatial(self, words: Dict[str, Any], text: str,
+                                       page_number: int) -> Dict[str, Any]:
+        """ایجاد JSON ساختاریافته از هندسه کلمات (حالت مکانی)
+
+        هر فیلد با یافتن کادر برچسب (anchors) و نزدیک‌ترین کادر مقدار هم‌ردیف
+        یا زیر آن استخراج می‌شود. فیلدهایی که به این روش یافت نشوند با
+        الگوهای regex روی متن صفحه جستجو می‌شوند.
+
+        Args:
+            words: آرایه‌های boxes/texts/confidences خروجی OCR
+            text: متن کامل صفحه
+            page_number: شماره صفحه
+        """
+        self.refresh_patterns()
+        start_time = datetime.now()
+        spatial_matches = self.spatial_extractor.extract(words, normalize=normalize_text)
+
+        customs_fields = {}
+        page_index = None
+        for field_name, field_config in self.patterns.items():
+            match = spatial_matches.get(field_name)
+            if match is not None:
+                customs_fields[field_name] = {
+                    "value": self._convert_value(match["value_text"], field_config),
+                    "confidence": match["confidence"],
+                    "matched_pattern": f"spatial:{match['anchor']}",
+                    "raw_value": match["value_text"]
+                }
+                continue
 
-        # تبدیل متن به فرمت قابل جستجو (مطابق کد تست)
-        persian_words = self._extract_persian_text(text)
-        search_text = '"' + '", "'.join(persian_words) + '"'
+            if page_index is None:
+                page_index = self.index_page(text)
+            customs_fields[field_name] = self._extract_field_indexed(page_index, field_name)
 
-        # استخراج تمام فیلدها
+        end_time = datetime.now()
+        return self._build_structured_json(customs_fields, text, page_number, "spatial",
+                                           (end_time - start_time).total_seconds())
+
+    def create_structured_json_from_fields(self, field_texts: Dict[str, Dict[str, Any]],
+                                           page_number: int) -> Dict[str, Any]:
+        """ایجاد JSON ساختاریافته از متن OCR ناحیه‌های فیلد (قالب فرم)
+
+        Args:
+            field_texts: نام فیلد -> {"text", "confidence", "value_pattern"}
+            page_number: شماره صفحه
+        """
+        self.refresh_patterns()
         customs_fields = {}
+        start_time = datetime.now()
+
+        for field_name, field_data in field_texts.items():
+            text = field_data.get("text", "") or ""
+            value_pattern = field_data.get("value_pattern")
+            raw_value = None
+
+            if value_pattern:
+                match = compile_pattern(value_pattern, 0, self.engine, self.pattern_timeout).search(
+                    normalize_text(text))
+                if match:
+                    raw_value = match.group(1) if match.groups() else match.group(0)
+            elif text.strip():
+                raw_value = text.strip()
+
+            field_config = self.patterns.get(field_name, {"type": "string"})
+            customs_fields[field_name] = {
+                "value": self._convert_value(raw_value, field_config),
+                "confidence": field_data.get("confidence", 0) if raw_value is not None else 0,
+                "matched_pattern": f"form_template:{value_pattern or 'region'}" if raw_value is not None else None,
+                "raw_value": raw_value
+            }
+
+        end_time = datetime.now()
+        page_text = ' '.join(data.get("text", "") or "" for data in field_texts.values())
+        return self._build_structured_json(customs_fields, page_text, page_number, "form_template",
+                                           (end_time - start_time).total_seconds())
+
+    def _build_structured_json(self, customs_fields: Dict[str, Any], text: str, page_number: int,
+                               extraction_method: str, extraction_time: float) -> Dict[str, Any]:
+        """ساخت خروجی استاندارد از نتایج فیلدها"""
         extraction_stats = {
-            "total_fields": len(self.patterns),
+            "total_fields": len(customs_fields),
             "extracted_fields": 0,
             "failed_fields": 0,
             "high_confidence_fields": 0,
-            "extraction_time": 0
+            "extraction_time": extraction_time
         }
 
-        start_time = datetime.now()
-
-        for field_name in self.patterns:
-            result = self._extract_field(search_text, field_name)
-            customs_fields[field_name] = result
-
+        for result in customs_fields.values():
             if result.get('value') is not None:
                 extraction_stats["extracted_fields"] += 1
                 if result.get('confidence', 0) > 0.8:
@@ -191,9 +216,6 @@ class CustomsPatternExtractor:
             else:
                 extraction_stats["failed_fields"] += 1
 
-        end_time = datetime.now()
-        extraction_stats["extraction_time"] = (end_time - start_time).total_seconds()
-
         # محاسبه نرخ موفقیت
         success_rate = (extraction_stats["extracted_fields"] / extraction_stats["total_fields"]) * 100 if \
         extraction_stats["total_fields"] > 0 else 0
@@ -207,7 +229,8 @@ class CustomsPatternExtractor:
                 "type": "اظهارنامه_گمرکی_وارداتی",
                 "page_number": page_number,
                 "processed_at": datetime.now().isoformat(),
-                "extraction_method": "regex_patterns"
+                "extraction_method": extraction_method,
+                "pattern_pack": self.pack.info()
             },
             "raw_text": text[:500] + "..." if len(text) > 500 else text,
             "customs_fields": customs_fields,
@@ -215,15 +238,30 @@ class CustomsPatternExtractor:
             "summary": summary
         }
 
+    def index_page(self, text: str):
+        """نرمال‌سازی متن صفحه و نمایه لنگرهای آن"""
+        return self.anchor_extractor.index_text(text)
+
     def _extract_persian_text(self, text: str) -> List[str]:
-        """استخراج persian_text مطابق نمونه JSON"""
-        import re
-        persian_pattern = r'[\u0600-\u06FF\u200C\u200D\u06F0-\u06F9\u0660-\u0669]+'
-        words = re.findall(persian_pattern, text)
-        return [word.strip() for word in words if word.strip()]
+        """استخراج persian_text مطابق نمونه JSON (توکن‌های متن نرمال شده)"""
+        return normalize_tokens(tokenize(text))
+
+    def _extract_field_indexed(self, page_index, field_name: str) -> Dict[str, Any]:
+        """استخراج یک فیلد از نمایه لنگرهای صفحه"""
+        if field_name not in self.patterns:
+            return {"value": None, "matched_pattern": None, "confidence": 0, "raw_value": None}
+
+        best_match, matched_pattern, confidence, span = self.anchor_extractor.extract(page_index, field_name)
+        return {
+            "value": self._convert_value(best_match, self.patterns[field_name]),
+            "confidence": confidence,
+            "matched_pattern": matched_pattern,
+            # مقدار به همان شکلی که در متن اصلی صفحه آمده است
+            "raw_value": (page_index.original(*span) or best_match) if span else best_match
+        }
 
     def _extract_field(self, text: str, field_name: str) -> Dict[str, Any]:
-        """استخراج یک فیلد خاص - مطابق کد تست"""
+        """استخراج یک فیلد خاص با اجرای همه الگوها روی کل متن - مطابق کد تست"""
         if field_name not in self.patterns:
             return {"value": None, "matched_pattern": None, "confidence": 0, "raw_value": None}
 
@@ -236,23 +274,26 @@ class CustomsPatternExtractor:
 
         for pattern in patterns:
             try:
-                matches = re.finditer(pattern, text, re.IGNORECASE)
-                for match in matches:
-                    if match.groups():
-                        groups = match.groups()
-                        if not best_match:
-                            best_match = groups[0]
+                compiled = compile_pattern(pattern, re.IGNORECASE, self.engine, self.pattern_timeout)
+                for match in compiled.finditer(text):
+                    if compiled.groups:
+                        if match.group(1):
+                            best_match = match.group(1)
                             matched_pattern = pattern
                             confidence = 0.6  # اعتماد پایه
-                    else:
-                        if not best_match:
-                            best_match = match.group(0)
-                            matched_pattern = pattern
-                            confidence = 0.5
+                            break
+                    elif match.group(0):
+                        best_match = match.group(0)
+                        matched_pattern = pattern
+                        confidence = 0.5
+                        break
             except Exception as e:
                 logger.error(f"خطا در الگو {pattern}: {e}")
                 continue
 
+            if best_match:
+                break
+
         # تبدیل مقدار
         converted_value = self._convert_value(best_match, field_config)
 
@@ -271,28 +312,31 @@ class CustomsPatternExtractor:
         field_type = field_config.get("type", "string")
 
         try:
-            # تبدیل اعداد فارسی به انگلیسی
+            # شکل استاندارد حروف و تبدیل اعداد فارسی و عربی به انگلیسی
             if isinstance(value, str):
-                value = self._persian_to_english(value)
+                if field_type == "float":
+                    # جداکننده هزارگان عربی (٬) حذف می‌شود تا ممیز خوانده نشود
+                    value = value.replace('٬', '')
+                value = normalize_text(value)
 
             if field_type == "int":
                 cleaned = re.sub(r'\D', '', value)
                 return int(cleaned) if cleaned else None
             elif field_type == "float":
-                cleaned = re.sub(r'[^\d.,]', '', value)
-                cleaned = cleaned.replace(',', '.')
+                cleaned = re.sub(r'[^\d.,]', '', value).replace(',', '.')
                 return float(cleaned) if cleaned else None
             else:
                 return str(value).strip()
         except (ValueError, TypeError):
             return value
 
+    def recognition_mode(self, field_name: str) -> str:
+        """حالت بازشناسی ناحیه فیلد: numeric (فقط ارقام) یا text"""
+        return self.patterns.get(field_name, {}).get("recognition", "text")
+
     def _persian_to_english(self, text: str) -> str:
-        """تبدیل اعداد فارسی به انگلیسی"""
-        persian_digits = '۰۱۲۳۴۵۶۷۸۹'
-        english_digits = '0123456789'
-        translation_table = str.maketrans(persian_digits, english_digits)
-        return text.translate(translation_table)
+        """تبدیل اعداد فارسی و عربی به انگلیسی (جدول تبدیل از پیش ساخته شده)"""
+        return to_latin_digits(text)
 
     def _create_summary(self, customs_fields: Dict[str, Any]) -> Dict[str, Any]:
         """ایجاد خلاصه - مطابق نمونه JSON"""
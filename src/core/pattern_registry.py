@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+بسته‌های الگوی استخراج - بارگذاری از JSON، کامپایل یک‌باره و بارگذاری مجدد خودکار
+"""
+
+import json
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from .anchor_index import AnchorIndexedExtractor
+from .spatial_extractor import SpatialFieldExtractor
+from .safe_regex import PATTERN_TIMEOUT
+from .text_normalizer import normalize_text, normalize_pattern
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+# مسیر پیش‌فرض (نسبت به ریشه پروژه) مطابق patterns.import_patterns_file
+DEFAULT_PACK_FILE = "patterns/import_patterns.json"
+
+
+def canonical_fields(fields: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """الگوها، لنگرها و مقادیر مجاز به شکل متن نرمال شده (موارد تکراری حذف می‌شوند)
+
+    متن صفحه پیش از استخراج نرمال می‌شود، پس رشته‌های ثابت الگوها هم باید
+    به همان شکل باشند (مثلاً ك٧٧ -> ک77). منبع regexها با normalize_pattern
+    نرمال می‌شود تا ٫ به جای . لفظی به نقطه دلخواه regex تبدیل نشود.
+    """
+    canonical = {}
+    for field_name, field_config in fields.items():
+        field_config = dict(field_config)
+        for key, normalize in (("patterns", normalize_pattern), ("anchors", normalize_text),
+                               ("valid_values", normalize_text)):
+            if isinstance(field_config.get(key), list):
+                field_config[key] = list(dict.fromkeys(
+                    normalize(item) if isinstance(item, str) else item for item in field_config[key]))
+        if isinstance(field_config.get("value_pattern"), str):
+            field_config["value_pattern"] = normalize_pattern(field_config["value_pattern"])
+        canonical[field_name] = field_config
+    return canonical
+
+
+class PatternPack:
+    """یک نسخه از بسته الگو به همراه موتورهای کامپایل شده آن
+
+    version نسخه اعلام شده در فایل و hash چکیده SHA-256 محتوای آن است؛
+    label (مثلاً 1.0.0+3f2a9c1b) در خروجی هر صفحه ثبت می‌شود.
+    """
+
+    def __init__(self, data: Dict[str, Any], path: Path, content_hash: str,
+                 engine: str = "auto", timeout: float = PATTERN_TIMEOUT):
+        fields = data.get("fields")
+        if not isinstance(fields, dict) or not fields:
+            raise ValueError("بسته الگو فیلدی ندارد (کلید fields)")
+        for field_name, field_config in fields.items():
+            if not isinstance(field_config.get("patterns"), list):
+                raise ValueError(f"فیلد {field_name} فهرست patterns ندارد")
+
+        self.name = data.get("name") or path.stem
+        self.version = str(data.get("version", "0"))
+        self.document_type = data.get("document_type", "اظهارنامه_گمرکی_وارداتی")
+        self.path = path
+        self.hash = content_hash
+        self.patterns = canonical_fields(fields)
+
+        self.anchor_extractor = AnchorIndexedExtractor(self.patterns, engine=engine, timeout=timeout)
+        self.spatial_extractor = SpatialFieldExtractor(self.patterns, engine=engine, timeout=timeout)
+
+    @property
+    def label(self) -> str:
+        return f"{self.version}+{self.hash[:8]}"
+
+    def info(self) -> Dict[str, Any]:
+        """مشخصات نسخه برای ثبت در خروجی صفحه"""
+        return {"name": self.name, "version": self.version, "hash": self.hash[:16], "file": self.path.name}
+
+
+class PatternRegistry:
+    """نگهداری بسته‌های کامپایل شده بر اساس مسیر، زمان تغییر و hash محتوا
+
+    get() با یک os.stat بررسی می‌کند که فایل از آخرین بارگذاری تغییر کرده
+    یا نه؛ در صورت تغییر mtime (یا اندازه) محتوا خوانده و hash می‌شود و فقط
+    اگر hash متفاوت باشد الگوها دوباره کامپایل می‌شوند. اگر فایل جدید
+    نامعتبر باشد آخرین نسخه سالم استفاده می‌شود.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._packs = {}  # (مسیر، hash، موتور، مهلت) -> PatternPack
+        self._current = {}  # (مسیر، موتور، مهلت) -> (mtime و اندازه فایل، PatternPack فعلی)
+
+    def get(self, path, engine: str = "auto", timeout: float = PATTERN_TIMEOUT) -> Optional[PatternPack]:
+        path = Path(path)
+        key = (str(path), engine, timeout)
+        with self._lock:
+            stamp, current = self._current.get(key, (None, None))
+            try:
+                stat = path.stat()
+            except OSError as e:
+                if current is None:
+                    logger.error(f"❌ فایل الگوها یافت نشد: {path} ({e})")
+                return current
+
+            if (stat.st_mtime_ns, stat.st_size) == stamp:
+                return current
+
+            try:
+                content = path.read_bytes()
+                content_hash = hashlib.sha256(content).hexdigest()
+                pack = self._packs.get((str(path), content_hash, engine, timeout))
+                if pack is None:
+                    pack = PatternPack(json.loads(content.decode('utf-8')), path, content_hash, engine, timeout)
+                    self._packs[(str(path), content_hash, engine, timeout)] = pack
+                    action = "بارگذاری مجدد" if current is not None else "بارگذاری"
+                    logger.info(f"📚 {action} الگوها: {pack.name} نسخه {pack.label} ({len(pack.patterns)} فیلد)")
+            except Exception as e:
+                logger.error(f"❌ خطا در بارگذاری الگوها از {path}: {e}"
+                             + ("، نسخه قبلی استفاده می‌شود" if current is not None else ""))
+                # تا تغییر بعدی فایل دوباره تلاش نمی‌شود
+                self._current[key] = ((stat.st_mtime_ns, stat.st_size), current)
+                return current
+
+            self._current[key] = ((stat.st_mtime_ns, stat.st_size), pack)
+            return pack
+
+
+# رجیستری مشترک هر پردازه (هر worker دسته‌ای رجیستری خود را دارد)
+registry = PatternRegistry()
+
+
+def resolve_pack_path(config=None, key: str = "patterns.import_patterns_file") -> Path:
+    """مسیر فایل بسته الگو
+
+    مسیر نسبی نسبت به ریشه همین پروژه (PROJECT_ROOT) است، نه
+    paths.project_root ذخیره شده در app_config.json که ممکن است مسیر سیستم
+    دیگری باشد. اگر فایل تنظیم شده وجود نداشته باشد بسته پیش‌فرض پروژه
+    استفاده می‌شود.
+    """
+    value = config.get(key, DEFAULT_PACK_FILE) if config is not None else DEFAULT_PACK_FILE
+    path = Path(value or DEFAULT_PACK_FILE)
+    if not path.is_absolute():
+        path = PROJECT_ROOT / path
+
+    default_path = PROJECT_ROOT / DEFAULT_PACK_FILE
+    if not path.is_file() and path != default_path:
+        logger.error(f"❌ فایل الگوها یافت نشد: {path}، بسته پیش‌فرض استفاده می‌شود ({default_path})")
+        path = default_path
+    return path
+
+
+def load_patterns(config=None) -> Dict[str, Dict[str, Any]]:
+    """الگوهای فیلدها از بسته فعال (برای ابزارهای جانبی)"""
+    pack = registry.get(resolve_pack_path(config))
+    return pack.patterns if pack is not None else {}
@@ -2,77 +2,585 @@
 # -*- coding: utf-8 -*-
 
 """
-پردازشکننده PDF ساده شده - DPI ثابت 600
+پردازشکننده PDF ساده شده - DPI ثابت یا تطبیقی
 """
 
 import fitz  # PyMuPDF
 import numpy as np
-from PIL import Image
-import io
 import logging
 import json
+import queue
+import re
+import threading
+import time
+import unicodedata
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Iterable
 from datetime import datetime
 from .ocr_engine import OCREngine
+from .ocr_worker import OCRWorker
+from .cancellation import ProcessingCancelled, PageTimeout
 from .pattern_extractor import CustomsPatternExtractor
+from .text_normalizer import normalize_text
+from .form_template import FormTemplate
+from .spatial_extractor import save_words
+from .preprocessing import ImagePreprocessor, apply_to_result
 
 logger = logging.getLogger(__name__)
 
+# حالت‌های رنگ رندر: rgb (پیش‌فرض)، gray (خاکستری) و binary (دودویی 0/255)
+RENDER_COLORSPACES = ("rgb", "gray", "binary")
+
+# کلمات کلیدی فرم اظهارنامه برای تشخیص لایه متنی معتبر
+TEXT_LAYER_ANCHORS = [
+    "اظهارنامه", "کوتاژ", "کالا", "سفارش", "ارز", "معامله",
+    "بیمه", "وزن", "بسته", "گمرکی", "حقوق", "مالیات", "فاکتور"
+]
+
+PERSIAN_CHAR_PATTERN = re.compile(r'[\u0600-\u06FF]')
+
+# اعداد متن نرمال شده (ارقام لاتین با جداکننده هزارگان/اعشار)
+NUMBER_PATTERN = re.compile(r'[0-9]+(?:[,.][0-9]+)*')
+
+# PyMuPDF thread-safe نیست؛ همه دسترسی‌های رندر از threadهای مختلف سریال می‌شوند
+_FITZ_LOCK = threading.RLock()
+
+# نشانه پایان صف بین مراحل pipeline
+_STAGE_DONE = object()
+
+PIPELINE_STAGES = ("render", "ocr", "extract", "write")
+
+
+class _PixmapBuffer:
+    """نگهدارنده بافر Pixmap برای ساخت آرایه NumPy بدون کپی
+
+    آرایه ساخته شده از این شیء، آن را به عنوان base نگه می‌دارد تا
+    Pixmap تا پایان عمر آرایه آزاد نشود.
+    """
+
+    def __init__(self, pix: "fitz.Pixmap"):
+        self.pix = pix
+        shape = (pix.h, pix.w) if pix.n == 1 else (pix.h, pix.w, pix.n)
+        strides = (pix.stride, 1) if pix.n == 1 else (pix.stride, pix.n, 1)
+        self.__array_interface__ = {
+            "shape": shape,
+            "strides": strides,
+            "typestr": "|u1",
+            "data": (pix.samples_ptr, False),
+            "version": 3
+        }
+
+
+def pixmap_to_array(pix: "fitz.Pixmap") -> np.ndarray:
+    """تبدیل Pixmap به آرایه NumPy به صورت view روی pix.samples (بدون کپی)"""
+    return np.asarray(_PixmapBuffer(pix))
+
 
 class PDFProcessor:
     """پردازشکننده PDF ساده شده"""
 
-    def __init__(self, config=None):
+    def __init__(self, config=None, profile: str = None, ocr_threads: int = None):
         self.config = config
-        self.default_dpi = 600  # ثابت شده
+        # پروفایل موتور OCR (None = ocr.profile)
+        self.ocr_profile = profile
+        self.default_dpi = self._get_config('processing.default_dpi', 600)
+        self.min_dpi = self._get_config('processing.min_dpi', 200)
+        self.max_dpi = self._get_config('processing.max_dpi', 600)
+
+        # حالت DPI تطبیقی: ابتدا DPI پایین، افزایش فقط در صورت نیاز
+        self.adaptive_dpi = self._get_config('processing.adaptive_dpi.enabled', False)
+        self.escalation_confidence = self._get_config('processing.adaptive_dpi.min_confidence', 0.6)
+        self.required_fields = self._get_config('processing.adaptive_dpi.required_fields',
+                                                ["کد_کالا", "کد_ثبت_سفارش"])
+
+        # بازشناسی کادرهای کم‌اعتماد از کلیپ PDF با DPI بالاتر (بدون OCR مجدد کل صفحه)
+        self.refinement_enabled = self._get_config('processing.refinement.enabled', False)
+        self.refinement_min_confidence = self._get_config('processing.refinement.min_confidence', 0.5)
+        self.refinement_scale = self._get_config('processing.refinement.dpi_scale', 2)
+        self.refinement_padding = self._get_config('processing.refinement.padding', 2)
+        self.refinement_max_regions = self._get_config('processing.refinement.max_regions', 50)
+
+        # تعداد صفحاتی که پیش از مصرف رندر می‌شوند (0 = بدون پیش‌واکشی)
+        self.prefetch_pages = self._get_config('processing.prefetch_pages', 2)
+
+        # صفحات اسکن‌شده تک‌تصویری با رزولوشن اصلی اسکن دیکد می‌شوند
+        self.embedded_image_fast_path = self._get_config('processing.embedded_image_fast_path', True)
+        self.min_image_coverage = self._get_config('processing.min_image_coverage', 0.9)
+
+        # صفحات دارای لایه متنی واقعی (خروجی مستقیم سامانه) بدون OCR پردازش می‌شوند
+        self.text_layer_enabled = self._get_config('processing.text_layer.enabled', True)
+        self.text_layer_min_persian_chars = self._get_config('processing.text_layer.min_persian_chars', 200)
+        self.text_layer_min_anchors = self._get_config('processing.text_layer.min_anchor_words', 3)
+
+        # حالت رنگ رندر؛ EasyOCR برای این فرم‌ها به رنگ نیاز ندارد
+        self.render_colorspace = self._get_config('processing.render_colorspace', 'rgb')
+        self.binary_threshold = self._get_config('processing.binary_threshold', 160)
+
+        # pipeline مراحل render / ocr / extract / write با صف‌های محدود
+        self.pipeline_enabled = self._get_config('processing.pipeline.enabled', True)
+        self.pipeline_queue_size = self._get_config('processing.pipeline.queue_size', 2)
+
+        # روش استخراج فیلدها: regex روی متن یا spatial روی هندسه کلمات
+        self.extraction_mode = self._get_config('processing.extraction_mode', 'regex')
+        # ذخیره هندسه کلمات در فایل .npz کنار JSON صفحه
+        self.save_word_geometry = self._get_config('processing.save_word_geometry', False)
+
+        # OCR دسته‌ای چند صفحه (ocr.batch.pages صفحه در هر فراخوانی recognizer)
+        self.ocr_batch_pages = max(1, int(self._get_config('ocr.batch.pages', 4)))
+        self.last_stage_stats = None
+
+        # قالب فرم: OCR فقط روی کادرهای فیلدها به جای کل صفحه
+        self.form_template = FormTemplate.resolve(self._get_config('processing.form_template', ''),
+                                                  self._get_config('paths.templates_dir'))
+
+        # مهلت OCR هر صفحه (ثانیه، 0 = بدون مهلت) و لغو پردازش: در همین پردازه
+        # بین مراحل OCR (detect / recognize هر صفحه، موتورهای cascade و
+        # کادرهای قالب) بررسی می‌شوند. processing.isolate_ocr OCR را در پردازه
+        # جداگانه اجرا می‌کند تا فراخوانی در حال اجرای مدل هم فوراً kill شود
+        # (به قیمت کپی تصویر هر صفحه به کارگر)
+        self.page_timeout = self._get_config('processing.timeout', 600)
+        self.isolate_ocr = self._get_config('processing.isolate_ocr', False)
+        self.cancel_token = None
+        self.last_timed_out_pages = []
 
         # فقط OCR و Pattern Extractor
-        self.ocr_engine = OCREngine(config)
-        self.pattern_extractor = CustomsPatternExtractor()
+        if self.isolate_ocr and self.page_timeout:
+            self.ocr_engine = OCRWorker(config, self.page_timeout, should_stop=self._cancelled, profile=profile,
+                                        threads=ocr_threads)
+        else:
+            self.ocr_engine = OCREngine(config, profile=profile, timeout=self.page_timeout,
+                                        should_stop=self._cancelled)
+        # پیش‌پردازش تصویر بین رندر و OCR (processing.image_preprocessing)
+        self.preprocessor = ImagePreprocessor.from_config(config)
+        self.pattern_extractor = CustomsPatternExtractor(config)
 
-        logger.info("📄 PDF Processor ساده آماده است (DPI: 600)")
+        mode = "تطبیقی" if self.adaptive_dpi else "ثابت"
+        logger.info(f"📄 PDF Processor ساده آماده است (DPI: {self.default_dpi}، حالت {mode})")
 
-    def convert_to_image(self, pdf_path: str, page_num: int = 0) -> Optional[np.ndarray]:
-        """تبدیل PDF به تصویر با DPI ثابت 600"""
+    def warm_up(self):
+        """شروع بارگذاری مدل OCR (در پس‌زمینه یا پردازه کارگر)"""
+        self.ocr_engine.warm_up()
+
+    def close(self):
+        """بستن پردازه کارگر OCR (در صورت وجود)"""
+        if isinstance(self.ocr_engine, OCRWorker):
+            self.ocr_engine.close()
+
+    def _cancelled(self) -> bool:
+        """آیا توقف پردازش درخواست شده است"""
+        return self.cancel_token is not None and self.cancel_token.cancelled
+
+    def _get_config(self, key_path: str, default: Any = None) -> Any:
+        """خواندن تنظیمات در صورت وجود ConfigManager"""
+        if self.config is None:
+            return default
+        return self.config.get(key_path, default)
+
+    def _resolve_colorspace(self, colorspace: str = None) -> str:
+        """اعتبارسنجی حالت رنگ"""
+        colorspace = (colorspace or self.render_colorspace).lower()
+        if colorspace not in RENDER_COLORSPACES:
+            raise ValueError(f"حالت رنگ نامعتبر: {colorspace}")
+        return colorspace
+
+    def _pixmap_to_image(self, pix: "fitz.Pixmap", colorspace: str) -> np.ndarray:
+        """تبدیل Pixmap (با فضای رنگ مناسب) به آرایه خروجی"""
+        image = pixmap_to_array(pix)
+        if colorspace == "binary":
+            image = np.multiply(image >= self.binary_threshold, 255, dtype=np.uint8)
+        return image
+
+    def _render_page(self, page: "fitz.Page", dpi: int, colorspace: str = None) -> np.ndarray:
+        """رندر یک صفحه باز شده به آرایه NumPy
+
+        خروجی view مستقیم روی نمونه‌های Pixmap است (بدون رمزگذاری PPM و
+        کپی‌های PIL/NumPy). در حالت gray صفحه مستقیماً خاکستری رندر می‌شود
+        و در حالت binary تصویر خاکستری با binary_threshold آستانه‌گذاری می‌شود.
+        """
+        colorspace = self._resolve_colorspace(colorspace)
+
+        zoom = dpi / 72.0
+        mat = fitz.Matrix(zoom, zoom)
+        cs = fitz.csRGB if colorspace == "rgb" else fitz.csGRAY
+        pix = page.get_pixmap(matrix=mat, colorspace=cs, alpha=False)
+
+        return self._pixmap_to_image(pix, colorspace)
+
+    def _find_single_page_image(self, page: "fitz.Page") -> Optional[Dict[str, Any]]:
+        """تشخیص صفحه اسکن‌شده: فقط یک تصویر، بدون متن/برداری، پوشش کامل صفحه
+
+        Returns:
+            اطلاعات تصویر (xref، bbox، width، height) یا None برای صفحات
+            برداری/ترکیبی که باید رندر شوند
+        """
+        images = page.get_images(full=True)
+        if len(images) != 1 or page.rotation != 0:
+            return None
+
+        xref, smask = images[0][0], images[0][1]
+        if smask:
+            return None
+
+        infos = [info for info in page.get_image_info(xrefs=True) if info.get("xref") == xref]
+        if len(infos) != 1:
+            return None
+        info = infos[0]
+
+        # فقط تصویر بدون چرخش و قرینه (a > 0, d > 0, b = c = 0)
+        a, b, c, d = info["transform"][:4]
+        if abs(b) > 1e-3 or abs(c) > 1e-3 or a <= 0 or d <= 0:
+            return None
+
+        bbox = fitz.Rect(info["bbox"]) & page.rect
+        if bbox.is_empty or bbox.get_area() < self.min_image_coverage * page.rect.get_area():
+            return None
+
+        if page.get_text("text").strip() or page.get_drawings():
+            return None
+
+        return {"xref": xref, "bbox": bbox, "width": info["width"], "height": info["height"]}
+
+    def _extract_embedded_image(self, page: "fitz.Page", colorspace: str = None) -> Optional[tuple]:
+        """دیکد مستقیم تصویر اسکن‌شده صفحه با رزولوشن اصلی
+
+        Returns:
+            (image, native_dpi) یا None اگر صفحه تک‌تصویری نباشد یا رزولوشن
+            اسکن از max_dpi بیشتر باشد
+        """
+        info = self._find_single_page_image(page)
+        if info is None:
+            return None
+
+        native_dpi = int(round(info["width"] / (info["bbox"].width / 72.0)))
+        if native_dpi > self.max_dpi:
+            return None
+
+        colorspace = self._resolve_colorspace(colorspace)
+        pix = fitz.Pixmap(page.parent, info["xref"])
+        if pix.alpha:
+            pix = fitz.Pixmap(pix, 0)
+
+        target = fitz.csRGB if colorspace == "rgb" else fitz.csGRAY
+        if pix.colorspace is None or pix.colorspace.n != target.n:
+            pix = fitz.Pixmap(target, pix)
+
+        return self._pixmap_to_image(pix, colorspace), native_dpi
+
+    def _extract_text_layer(self, page: "fitz.Page") -> Optional[str]:
+        """خواندن لایه متنی صفحه در صورت کیفیت کافی
+
+        لایه متنی فقط وقتی پذیرفته می‌شود که حداقل text_layer_min_persian_chars
+        حرف فارسی و text_layer_min_anchors کلمه کلیدی فرم را داشته باشد؛ در
+        غیر این صورت (اسکن، لایه OCR ضعیف یا فونت بدون نگاشت یونیکد) None.
+        """
+        text = page.get_text("text", sort=True)
+        if not text.strip():
+            return None
+
+        # تبدیل اشکال نمایشی عربی (FB50-FEFF) به حروف استاندارد
+        text = unicodedata.normalize("NFKC", text)
+
+        persian_chars = len(PERSIAN_CHAR_PATTERN.findall(text))
+        if persian_chars < self.text_layer_min_persian_chars:
+            return None
+
+        # ك/ى عربی در لایه متنی برخی PDFها
+        canonical = normalize_text(text)
+        anchors = sum(1 for word in TEXT_LAYER_ANCHORS if word in canonical)
+        if anchors < self.text_layer_min_anchors:
+            return None
+
+        return ' '.join(text.split())
+
+    def iter_page_images(self, pdf_path: str, dpi: int = None,
+                         pages: Iterable[int] = None,
+                         prefetch: int = None,
+                         colorspace: str = None,
+                         detect_text_layer: bool = False) -> Iterator[Dict[str, Any]]:
+        """پیمایش صفحات PDF با یک بار باز کردن فایل
+
+        سند فقط یک بار باز می‌شود و صفحات به صورت تنبل رندر می‌شوند.
+        در صورت prefetch > 0 یک thread پس‌زمینه حداکثر prefetch صفحه را
+        جلوتر از مصرف‌کننده آماده می‌کند. سند پس از اتمام پیمایش یا بسته
+        شدن generator (break / close) بسته می‌شود.
+
+        Args:
+            pdf_path: مسیر فایل PDF
+            dpi: رزولوشن رندر (پیش‌فرض default_dpi)
+            pages: شماره صفحات (از صفر)؛ None یعنی همه صفحات
+            prefetch: تعداد صفحات پیش‌واکشی (پیش‌فرض prefetch_pages)
+            colorspace: حالت رنگ rgb / gray / binary (پیش‌فرض render_colorspace)
+            detect_text_layer: بررسی لایه متنی پیش از رندر؛ صفحات با لایه
+                متنی معتبر بدون تصویر و با source = "text_layer" و کلید text
+                برگردانده می‌شوند
+
+        Yields:
+            دیکشنری شامل page_num، total_pages، dpi، source و image.
+            source برای صفحات اسکن‌شده تک‌تصویری "embedded_image" (دیکد
+            مستقیم با رزولوشن اصلی) و در غیر این صورت "render" است.
+            (image در صورت خطای رندر None است)
+        """
+        dpi = dpi or self.default_dpi
+        prefetch = self.prefetch_pages if prefetch is None else max(0, int(prefetch))
+
+        doc = fitz.open(str(pdf_path))
         try:
-            pdf_path = Path(pdf_path)
-            if not pdf_path.exists():
-                logger.error(f"❌ فایل PDF یافت نشد: {pdf_path}")
-                return None
+            total_pages = len(doc)
+            if pages is None:
+                page_numbers = list(range(total_pages))
+            else:
+                page_numbers = []
+                for page_num in pages:
+                    if 0 <= page_num < total_pages:
+                        page_numbers.append(page_num)
+                    else:
+                        logger.error(f"❌ شماره صفحه نامعتبر: {page_num}")
 
-            logger.info(f"🔄 تبدیل PDF به تصویر (صفحه {page_num + 1})")
+            def render(page_num: int) -> Dict[str, Any]:
+                logger.info(f"🔄 تبدیل PDF به تصویر (صفحه {page_num + 1})")
+                with _FITZ_LOCK:
+                    return render_locked(page_num)
 
-            doc = fitz.open(str(pdf_path))
-            if page_num >= len(doc):
-                logger.error(f"❌ شماره صفحه نامعتبر: {page_num}")
-                doc.close()
-                return None
+            def render_locked(page_num: int) -> Dict[str, Any]:
+                image = None
+                text = None
+                page_dpi = dpi
+                source = "render"
+                try:
+                    page = doc.load_page(page_num)
+                    if detect_text_layer and self.text_layer_enabled:
+                        text = self._extract_text_layer(page)
+                        if text is not None:
+                            logger.info(f"📝 صفحه {page_num + 1}: لایه متنی معتبر، OCR لازم نیست")
+                            return {
+                                "page_num": page_num,
+                                "total_pages": total_pages,
+                                "dpi": None,
+                                "source": "text_layer",
+                                "image": None,
+                                "text": text
+                            }
+
+                    embedded = None
+                    if self.embedded_image_fast_path:
+                        try:
+                            embedded = self._extract_embedded_image(page, colorspace)
+                        except Exception as e:
+                            logger.warning(f"⚠️ دیکد تصویر صفحه {page_num + 1} ناموفق، رندر می‌شود: {e}")
 
-            page = doc.load_page(page_num)
+                    if embedded is not None:
+                        image, page_dpi = embedded
+                        source = "embedded_image"
+                    else:
+                        image = self._render_page(page, dpi, colorspace)
+                    logger.info(f"✅ تصویر آماده ({source}، DPI {page_dpi}): {image.shape}")
+                except Exception as e:
+                    logger.error(f"❌ خطا در تبدیل صفحه {page_num + 1}: {e}")
+                return {
+                    "page_num": page_num,
+                    "total_pages": total_pages,
+                    "dpi": page_dpi,
+                    "source": source,
+                    "image": image
+                }
 
-            # DPI ثابت 600
-            zoom = 600 / 72.0
-            mat = fitz.Matrix(zoom, zoom)
-            pix = page.get_pixmap(matrix=mat, alpha=False)
+            if prefetch == 0:
+                for page_num in page_numbers:
+                    yield render(page_num)
+                return
+
+            # فقط thread تولیدکننده به سند دسترسی دارد؛ PyMuPDF thread-safe نیست
+            buffer = queue.Queue(maxsize=prefetch)
+            stop_event = threading.Event()
+            done = object()
+
+            def producer():
+                try:
+                    for page_num in page_numbers:
+                        if stop_event.is_set():
+                            return
+                        item = render(page_num)
+                        while not stop_event.is_set():
+                            try:
+                                buffer.put(item, timeout=0.1)
+                                break
+                            except queue.Full:
+                                continue
+                finally:
+                    while not stop_event.is_set():
+                        try:
+                            buffer.put(done, timeout=0.1)
+                            break
+                        except queue.Full:
+                            continue
 
-            # تبدیل به PIL Image
-            img_data = pix.tobytes("ppm")
-            img = Image.open(io.BytesIO(img_data))
+            worker = threading.Thread(target=producer, name="pdf-prefetch", daemon=True)
+            worker.start()
+            try:
+                while True:
+                    item = buffer.get()
+                    if item is done:
+                        break
+                    yield item
+            finally:
+                stop_event.set()
+                worker.join()
+        finally:
             doc.close()
 
-            # تبدیل به NumPy array
-            image_array = np.array(img)
+    def _locate_anchor(self, page: "fitz.Page", template: FormTemplate,
+                       scale: tuple) -> Optional[tuple]:
+        """یافتن موقعیت کلمه لنگر قالب در صفحه (مختصات قالب)
 
-            logger.info(f"✅ تصویر آماده: {image_array.shape}")
-            return image_array
+        ابتدا در لایه متنی جستجو می‌شود؛ در صورت نبود، ناحیه جستجوی لنگر
+        با DPI قالب رندر و OCR می‌شود.
+        """
+        anchor_text = template.anchor.get("text") if template.anchor else None
+        search_rect = template.anchor_search_rect()
+        if not anchor_text or not search_rect:
+            return None
+
+        sx, sy = scale
+        clip = fitz.Rect(search_rect[0] * sx, search_rect[1] * sy,
+                         search_rect[2] * sx, search_rect[3] * sy) & page.rect
+
+        found = page.search_for(anchor_text, clip=clip)
+        if found:
+            rect = found[0]
+            return rect.x0 / sx, rect.y0 / sy, rect.x1 / sx, rect.y1 / sy
+
+        zoom = template.dpi / 72.0
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip,
+                              colorspace=fitz.csGRAY, alpha=False)
+        for bbox, text, confidence in self.ocr_engine.readtext(pixmap_to_array(pix)):
+            if anchor_text in text:
+                xs = [point[0] for point in bbox]
+                ys = [point[1] for point in bbox]
+                return ((clip.x0 + min(xs) / zoom) / sx, (clip.y0 + min(ys) / zoom) / sy,
+                        (clip.x0 + max(xs) / zoom) / sx, (clip.y0 + max(ys) / zoom) / sy)
+        return None
+
+    def _render_field_page(self, page: "fitz.Page", total_pages: int, template: FormTemplate,
+                           colorspace: str, detect_text_layer: bool) -> Dict[str, Any]:
+        """رندر کادرهای فیلد یک صفحه (یا خواندن لایه متنی آن)"""
+        page_num = page.number
+
+        if detect_text_layer and self.text_layer_enabled:
+            text = self._extract_text_layer(page)
+            if text is not None:
+                return {
+                    "page_num": page_num,
+                    "total_pages": total_pages,
+                    "dpi": None,
+                    "source": "text_layer",
+                    "image": None,
+                    "text": text
+                }
+
+        cs = fitz.csRGB if colorspace == "rgb" else fitz.csGRAY
+        zoom = template.dpi / 72.0
+        mat = fitz.Matrix(zoom, zoom)
+
+        scale = template.scale_to(page.rect.width, page.rect.height)
+        try:
+            anchor_rect = self._locate_anchor(page, template, scale)
+        except Exception as e:
+            logger.warning(f"⚠️ یافتن لنگر صفحه {page_num + 1} ناموفق: {e}")
+            anchor_rect = None
+        dx, dy = template.calibrate(anchor_rect)
+
+        field_images = {}
+        pixels_processed = 0
+        for field_name, rect in template.field_rects(dx * scale[0], dy * scale[1], scale).items():
+            clip = fitz.Rect(rect) & page.rect
+            if clip.is_empty:
+                continue
+            pix = page.get_pixmap(matrix=mat, clip=clip, colorspace=cs, alpha=False)
+            field_images[field_name] = self._pixmap_to_image(pix, colorspace)
+            pixels_processed += pix.width * pix.height
+
+        full_page_pixels = int(page.rect.width * zoom) * int(page.rect.height * zoom)
+        logger.info(f"🗺️ صفحه {page_num + 1}: {len(field_images)} کادر، "
+                    f"{pixels_processed / max(full_page_pixels, 1):.1%} پیکسل‌های صفحه")
+
+        return {
+            "page_num": page_num,
+            "total_pages": total_pages,
+            "dpi": template.dpi,
+            "source": "form_template",
+            "image": None,
+            "field_images": field_images,
+            "calibration": {"anchor_found": anchor_rect is not None, "dx": dx, "dy": dy},
+            "pixels_processed": pixels_processed,
+            "full_page_pixels": full_page_pixels
+        }
+
+    def iter_field_images(self, pdf_path: str, template: FormTemplate = None,
+                          pages: Iterable[int] = None,
+                          detect_text_layer: bool = True) -> Iterator[Dict[str, Any]]:
+        """پیمایش صفحات و رندر فقط کادرهای فیلدهای قالب فرم
+
+        هر کادر با get_pixmap(clip=...) و DPI قالب رندر می‌شود. موقعیت
+        کادرها در صورت یافتن کلمه لنگر، به اندازه جابجایی آن اصلاح می‌شود.
+
+        Yields:
+            دیکشنری شامل page_num، total_pages، dpi، source = "form_template"،
+            field_images (نام فیلد -> تصویر)، calibration، pixels_processed و
+            full_page_pixels. صفحات با لایه متنی معتبر مانند iter_page_images
+            با source = "text_layer" برگردانده می‌شوند.
+        """
+        template = template or self.form_template
+        if template is None:
+            raise ValueError("قالب فرم تعریف نشده است")
+
+        colorspace = self._resolve_colorspace()
+
+        doc = fitz.open(str(pdf_path))
+        try:
+            total_pages = len(doc)
+            page_numbers = range(total_pages) if pages is None else [
+                page_num for page_num in pages if 0 <= page_num < total_pages
+            ]
+
+            for page_num in page_numbers:
+                with _FITZ_LOCK:
+                    item = self._render_field_page(doc.load_page(page_num), total_pages, template,
+                                                   colorspace, detect_text_layer)
+                yield item
+        finally:
+            doc.close()
+
+    def convert_to_image(self, pdf_path: str, page_num: int = 0) -> Optional[np.ndarray]:
+        """تبدیل یک صفحه PDF به تصویر با DPI پیش‌فرض"""
+        try:
+            pdf_path = Path(pdf_path)
+            if not pdf_path.exists():
+                logger.error(f"❌ فایل PDF یافت نشد: {pdf_path}")
+                return None
+
+            for page in self.iter_page_images(str(pdf_path), pages=[page_num], prefetch=0):
+                return page["image"]
+            return None
 
         except Exception as e:
             logger.error(f"❌ خطا در تبدیل PDF: {e}")
             return None
 
-    def process_pdf_pages_individually(self, pdf_path: str, output_dir: str = None) -> List[Dict[str, Any]]:
-        """پردازش ساده PDF - تولید JSON مطابق نمونه"""
+    def process_pdf_pages_individually(self, pdf_path: str, output_dir: str = None,
+                                       cancel_token=None) -> List[Dict[str, Any]]:
+        """پردازش ساده PDF - تولید JSON مطابق نمونه
+
+        صفحات از مراحل render → ocr → extract → write عبور می‌کنند. در حالت
+        pipeline هر مرحله در thread جداگانه با صف محدود اجرا می‌شود تا صفحه
+        N+1 هم‌زمان با OCR صفحه N رندر و صفحه N-1 ذخیره شود. آمار بهره‌وری
+        هر مرحله در last_stage_stats نگهداری و در پایان لاگ می‌شود.
+
+        با لغو cancel_token (CancellationToken) صفحه در حال OCR متوقف و
+        نتایج صفحات تکمیل شده برگردانده می‌شوند. صفحاتی که از مهلت OCR
+        تجاوز کنند با DPI پایین‌تر تکرار و در صورت شکست مجدد در
+        last_timed_out_pages ثبت می‌شوند.
+        """
+        self.cancel_token = cancel_token
         try:
             if output_dir is None:
                 output_dir = Path("data")  # مسیر ثابت
@@ -80,74 +588,605 @@ class PDFProcessor:
             output_dir = Path(output_dir)
             output_dir.mkdir(exist_ok=True)
 
-            doc = fitz.open(str(pdf_path))
-            total_pages = len(doc)
-            doc.close()
+            context = {
+                "pdf_path": pdf_path,
+                "pdf_name": Path(pdf_path).stem,
+                "output_dir": output_dir,
+                "dpi_ladder": self._get_dpi_ladder(),
+                "escalation": {},  # سند دوم برای رندر مجدد، فقط در صورت نیاز باز می‌شود
+                "total_pages": 0,
+                "timed_out_pages": []
+            }
+
+            if self.form_template is not None:
+                pages = self.iter_field_images(pdf_path)
+            else:
+                pages = self.iter_page_images(pdf_path, dpi=context["dpi_ladder"][0],
+                                              prefetch=0 if self.pipeline_enabled else None,
+                                              detect_text_layer=True)
+
+            # مرحله OCR صفحات را دسته‌ای به recognizer می‌دهد (فقط اسناد چندصفحه‌ای)
+            stages = [
+                ("ocr", self._stage_ocr_batch, self.ocr_batch_pages),
+                ("extract", self._stage_extract),
+                ("write", self._stage_write)
+            ]
+
+            try:
+                if self.pipeline_enabled:
+                    results, stats = self._run_pipeline(pages, stages, context)
+                else:
+                    results, stats = self._run_sequential(pages, stages, context)
+            finally:
+                if context["escalation"].get("doc") is not None:
+                    with _FITZ_LOCK:
+                        context["escalation"]["doc"].close()
 
-            if total_pages == 0:
+            if context["total_pages"] == 0 and not self._cancelled():
                 logger.error("❌ PDF خالی است")
                 return []
 
-            results = []
-            pdf_name = Path(pdf_path).stem
+            self.last_stage_stats = stats
+            self.last_timed_out_pages = context["timed_out_pages"]
+            self.ocr_engine.save_recording()
+            self._log_stage_stats(stats)
+
+            cache_stats = self.ocr_engine.cache_stats()
+            if cache_stats:
+                logger.info(f"🗄️ کش OCR: {cache_stats['hits']} hit / {cache_stats['misses']} miss "
+                            f"({cache_stats['hit_rate']:.0%})، {cache_stats['entries']} ورودی، "
+                            f"{cache_stats['size_mb']:.1f} MB")
+
+            preprocessing_stats = self.preprocessor.stats()
+            if preprocessing_stats:
+                parts = [f"{step}: {seconds * 1000:.0f}ms" for step, seconds in preprocessing_stats.items()]
+                logger.info("🧼 میانگین زمان پیش‌پردازش - " + "، ".join(parts))
+
+            layout_stats = self.ocr_engine.layout_stats()
+            if layout_stats:
+                logger.info(f"🧩 کش چیدمان: {layout_stats['hits']} بدون detect / {layout_stats['misses']} detect کامل، "
+                            f"{layout_stats['fallbacks']} بازگشت، {layout_stats['layouts']} چیدمان")
+
+            if context["timed_out_pages"]:
+                pages_text = "، ".join(str(page["page_number"]) for page in context["timed_out_pages"])
+                logger.warning(f"⏱️ صفحات با تجاوز از مهلت OCR: {pages_text}")
+
+            if self._cancelled():
+                logger.info(f"⏹️ پردازش متوقف شد: {len(results)} صفحه تکمیل شده")
+                return results
+
+            logger.info(f"✅ پردازش کامل: {len(results)} صفحه")
+            return results
+
+        except Exception as e:
+            logger.error(f"❌ خطا در پردازش PDF: {e}")
+            return []
+
+    def _stage_ocr_batch(self, pages: List[Dict[str, Any]], context: Dict[str, Any]) -> List[Optional[Dict[str, Any]]]:
+        """مرحله OCR دسته‌ای: صفحات رندر شده با یک فراخوانی extract_text_batch
+
+        صفحات لایه متنی و قالب فرم جداگانه پردازش می‌شوند؛ تنها صفحات کامل
+        رندر شده در یک دسته به recognizer داده می‌شوند. افزایش DPI تطبیقی
+        پس از آن برای هر صفحه جداگانه انجام می‌شود.
+        """
+        batch_pages = [page for page in pages
+                       if page.get("source") in ("render", "embedded_image") and page["image"] is not None]
 
+        initial_results = {}
+        if len(batch_pages) > 1:
+            prepared = [self.preprocessor.process(page["image"]) for page in batch_pages]
+            try:
+                ocr_results = self.ocr_engine.extract_text_batch([image for image, _ in prepared])
+                initial_results = {page["page_num"]: apply_to_result(result, info)
+                                   for page, result, (_, info) in zip(batch_pages, ocr_results, prepared)}
+            except PageTimeout as e:
+                # صفحه کند مشخص نیست؛ هر صفحه جداگانه با مهلت خود پردازش می‌شود
+                logger.warning(f"⏱️ OCR دسته‌ای صفحات {pages[0]['page_num'] + 1}-{pages[-1]['page_num'] + 1}: "
+                               f"{e}، پردازش تک‌صفحه‌ای")
+
+        outputs = []
+        for page in pages:
+            try:
+                outputs.append(self._stage_ocr(page, context, initial_results.get(page["page_num"])))
+            except ProcessingCancelled:
+                raise
+            except Exception as e:
+                logger.error(f"❌ خطا در صفحه {page['page_num'] + 1}: {e}")
+                outputs.append(None)
+        return outputs
+
+    def _stage_ocr(self, page: Dict[str, Any], context: Dict[str, Any],
+                   ocr_result: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """مرحله OCR: لایه متنی، قالب فرم یا OCR کامل صفحه با DPI تطبیقی"""
+        page_num = page["page_num"]
+        total_pages = page["total_pages"]
+        context["total_pages"] = total_pages
+
+        if page_num == 0:
             logger.info(f"📄 پردازش {total_pages} صفحه...")
+        logger.info(f"🔄 صفحه {page_num + 1}/{total_pages}")
+
+        try:
+            if page.get("source") == "text_layer":
+                # لایه متنی: بدون رندر و OCR
+                ocr_result, customs_extraction = self._use_text_layer(page)
+            elif page.get("source") == "form_template":
+                # قالب فرم: OCR کادرهای فیلدها
+                ocr_result, customs_extraction = self._ocr_page_template(page)
+            else:
+                if page["image"] is None:
+                    return None
+
+                # OCR (با افزایش DPI در صورت نیاز)
+                ocr_result, customs_extraction = self._ocr_page_adaptive(
+                    context["pdf_path"], page, context["dpi_ladder"], context["escalation"], ocr_result
+                )
+        except PageTimeout as e:
+            logger.error(f"⏱️ صفحه {page_num + 1}: {e}، صفحه رد شد")
+            context["timed_out_pages"].append({"page_number": page_num + 1, "timeout": e.timeout})
+            return None
+
+        return {
+            "page_num": page_num,
+            "total_pages": total_pages,
+            "ocr_result": ocr_result,
+            "customs_extraction": customs_extraction
+        }
+
+    def _stage_extract(self, item: Dict[str, Any], context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """مرحله استخراج: تولید JSON مطابق نمونه"""
+        page_num = item["page_num"]
+        page_text = item["ocr_result"].get('text', '')
+
+        if not page_text.strip():
+            logger.warning(f"⚠️ صفحه {page_num + 1}: متن استخراج نشد")
+            return None
+
+        item["final_result"] = self._create_standard_json(
+            page_text, page_num + 1, item["total_pages"],
+            context["pdf_name"], context["pdf_path"], item["ocr_result"], item["customs_extraction"]
+        )
+        return item
+
+    def _stage_write(self, item: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """مرحله ذخیره JSON و تولید خلاصه نتیجه"""
+        page_num = item["page_num"]
+        ocr_result = item["ocr_result"]
 
-            for page_num in range(total_pages):
+        json_filename = f"{context['pdf_name']}_page_{page_num + 1:02d}.json"
+        json_path = context["output_dir"] / json_filename
+
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(item["final_result"], f, ensure_ascii=False, indent=2)
+
+        logger.info(f"💾 ذخیره شد: {json_path}")
+
+        # خلاصه نتیجه
+        summary = {
+            "page_number": page_num + 1,
+            "json_file": str(json_path),
+            "text_length": len(ocr_result.get('text', '')),
+            "confidence": ocr_result.get('confidence', 0),
+            "render_path": ocr_result.get('render_path', 'render')
+        }
+
+        if self.save_word_geometry and ocr_result.get('words') is not None:
+            summary["words_file"] = save_words(json_path, ocr_result['words'])
+
+        return summary
+
+    def _run_sequential(self, pages: Iterable[Dict[str, Any]], stages: List[tuple],
+                        context: Dict[str, Any]) -> tuple:
+        """اجرای پشت سر هم مراحل؛ صفحات به اندازه بزرگ‌ترین دسته مراحل گروه می‌شوند"""
+        stats = {name: {"busy_time": 0.0, "items": 0} for name in PIPELINE_STAGES}
+        results = []
+        start_time = time.perf_counter()
+        group_size = max(self._stage_batch_size(stage) for stage in stages)
+
+        page_iter = iter(pages)
+        finished = False
+        while not finished:
+            items = []
+            while len(items) < group_size:
+                if self._cancelled():
+                    self._close_pages(page_iter)
+                    finished = True
+                    break
+                stage_start = time.perf_counter()
                 try:
-                    logger.info(f"🔄 صفحه {page_num + 1}/{total_pages}")
+                    item = next(page_iter, _STAGE_DONE)
+                except ProcessingCancelled:
+                    item = _STAGE_DONE
+                stats["render"]["busy_time"] += time.perf_counter() - stage_start
+                if item is _STAGE_DONE:
+                    finished = True
+                    break
+                stats["render"]["items"] += 1
+                items.append(item)
 
-                    # مرحله 1: تبدیل به تصویر
-                    image = self.convert_to_image(pdf_path, page_num)
-                    if image is None:
-                        continue
+            for stage in stages:
+                if not items:
+                    break
+                name = stage[0]
+                stage_start = time.perf_counter()
+                items = self._apply_stage(stage, items, context)
+                stats[name]["busy_time"] += time.perf_counter() - stage_start
+                stats[name]["items"] += len(items)
 
-                    # مرحله 2: OCR
-                    ocr_result = self.ocr_engine.extract_text(image)
-                    page_text = ocr_result.get('text', '')
+            results.extend(items)
 
-                    if not page_text.strip():
-                        logger.warning(f"⚠️ صفحه {page_num + 1}: متن استخراج نشد")
-                        continue
+        return results, self._finalize_stage_stats(stats, time.perf_counter() - start_time)
+
+    @staticmethod
+    def _close_pages(page_iter: Iterator[Dict[str, Any]]):
+        """بستن generator صفحات (توقف پیش‌واکشی و بستن سند)"""
+        close = getattr(page_iter, "close", None)
+        if close is not None:
+            close()
+
+    @staticmethod
+    def _stage_batch_size(stage: tuple) -> int:
+        """اندازه دسته مرحله (name, func[, batch_size])؛ بدون آن یک صفحه"""
+        return stage[2] if len(stage) > 2 else 1
+
+    def _apply_stage(self, stage: tuple, items: List[Dict[str, Any]],
+                     context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """اجرای یک مرحله روی گروه صفحات و حذف صفحات ناموفق
 
-                    # مرحله 3: تولید JSON مطابق نمونه
-                    final_result = self._create_standard_json(
-                        page_text, page_num + 1, total_pages,
-                        pdf_name, pdf_path, ocr_result
-                    )
+        مراحل دسته‌ای کل لیست را دریافت می‌کنند و لیست هم‌اندازه برمی‌گردانند؛
+        سایر مراحل برای هر صفحه جداگانه فراخوانی می‌شوند. پس از لغو پردازش
+        صفحات باقی‌مانده کنار گذاشته می‌شوند.
+        """
+        if self._cancelled():
+            return []
 
-                    # ذخیره JSON
-                    json_filename = f"{pdf_name}_page_{page_num + 1:02d}.json"
-                    json_path = output_dir / json_filename
+        if len(stage) > 2:
+            try:
+                outputs = stage[1](items, context)
+            except ProcessingCancelled:
+                return []
+            except Exception as e:
+                logger.error(f"❌ خطا در صفحات {items[0]['page_num'] + 1}-{items[-1]['page_num'] + 1}: {e}")
+                return []
+            return [output for output in outputs if output is not None]
 
-                    with open(json_path, 'w', encoding='utf-8') as f:
-                        json.dump(final_result, f, ensure_ascii=False, indent=2)
+        outputs = []
+        for item in items:
+            try:
+                output = stage[1](item, context)
+            except ProcessingCancelled:
+                break
+            except Exception as e:
+                logger.error(f"❌ خطا در صفحه {item['page_num'] + 1}: {e}")
+                output = None
+            if output is not None:
+                outputs.append(output)
+        return outputs
 
-                    logger.info(f"💾 ذخیره شد: {json_path}")
+    def _run_pipeline(self, pages: Iterable[Dict[str, Any]], stages: List[tuple],
+                      context: Dict[str, Any]) -> tuple:
+        """اجرای مراحل در threadهای جداگانه با صف‌های محدود بین آن‌ها
 
-                    # خلاصه نتیجه
-                    result_summary = {
-                        "page_number": page_num + 1,
-                        "json_file": str(json_path),
-                        "text_length": len(page_text),
-                        "confidence": ocr_result.get('confidence', 0)
-                    }
+        ترتیب صفحات حفظ می‌شود زیرا هر مرحله یک thread و صف FIFO دارد.
+        """
+        stats = {name: {"busy_time": 0.0, "items": 0} for name in PIPELINE_STAGES}
+        # صف ورودی هر مرحله دسته‌ای باید دست کم یک دسته کامل را جا دهد
+        queues = [queue.Queue(maxsize=max(self.pipeline_queue_size, self._stage_batch_size(stage)))
+                  for stage in stages]
+        results = []
+        errors = []
+        start_time = time.perf_counter()
 
-                    results.append(result_summary)
+        def feed():
+            try:
+                page_iter = iter(pages)
+                while True:
+                    if self._cancelled():
+                        self._close_pages(page_iter)
+                        break
+                    stage_start = time.perf_counter()
+                    item = next(page_iter, _STAGE_DONE)
+                    stats["render"]["busy_time"] += time.perf_counter() - stage_start
+                    if item is _STAGE_DONE:
+                        break
+                    stats["render"]["items"] += 1
+                    queues[0].put(item)
+            except ProcessingCancelled:
+                pass
+            except Exception as e:
+                errors.append(e)
+            finally:
+                queues[0].put(_STAGE_DONE)
 
-                except Exception as e:
-                    logger.error(f"❌ خطا در صفحه {page_num + 1}: {e}")
+        def work(index: int, stage: tuple):
+            name = stage[0]
+            batch_size = self._stage_batch_size(stage)
+            in_queue = queues[index]
+            out_queue = queues[index + 1] if index + 1 < len(queues) else None
+            finished = False
+            while not finished:
+                item = in_queue.get()
+                if item is _STAGE_DONE:
+                    break
+
+                # دسته: صفحه اول با انتظار، بقیه فقط اگر هم‌اکنون در صف باشند
+                items = [item]
+                while len(items) < batch_size:
+                    try:
+                        item = in_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STAGE_DONE:
+                        finished = True
+                        break
+                    items.append(item)
+
+                stage_start = time.perf_counter()
+                outputs = self._apply_stage(stage, items, context)
+                stats[name]["busy_time"] += time.perf_counter() - stage_start
+                stats[name]["items"] += len(outputs)
+
+                for output in outputs:
+                    if out_queue is not None:
+                        out_queue.put(output)
+                    else:
+                        results.append(output)
+
+            if out_queue is not None:
+                out_queue.put(_STAGE_DONE)
+
+        threads = [threading.Thread(target=feed, name="pipeline-render", daemon=True)]
+        for index, stage in enumerate(stages):
+            threads.append(threading.Thread(target=work, args=(index, stage),
+                                            name=f"pipeline-{stage[0]}", daemon=True))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+
+        return results, self._finalize_stage_stats(stats, time.perf_counter() - start_time)
+
+    def _finalize_stage_stats(self, stats: Dict[str, Dict[str, Any]], wall_time: float) -> Dict[str, Any]:
+        """محاسبه بهره‌وری هر مرحله (زمان مشغول / زمان کل)"""
+        for stage_stats in stats.values():
+            stage_stats["utilization"] = stage_stats["busy_time"] / wall_time if wall_time > 0 else 0
+        return {"wall_time": wall_time, "pipelined": self.pipeline_enabled, "stages": stats}
+
+    def _log_stage_stats(self, stats: Dict[str, Any]):
+        """لاگ بهره‌وری مراحل"""
+        parts = [f"{name}: {data['utilization']:.0%} ({data['busy_time']:.2f}s)"
+                 for name, data in stats["stages"].items()]
+        logger.info(f"📊 بهره‌وری مراحل در {stats['wall_time']:.2f}s - " + "، ".join(parts))
+
+    def _get_dpi_ladder(self) -> List[int]:
+        """پله‌های DPI برای رندر؛ در حالت ثابت فقط default_dpi"""
+        if not self.adaptive_dpi:
+            return [self.default_dpi]
+
+        steps = {self.min_dpi, self.default_dpi, self.max_dpi}
+        return sorted(dpi for dpi in steps if self.min_dpi <= dpi <= self.max_dpi)
+
+    def _ocr_image(self, image: np.ndarray) -> Dict[str, Any]:
+        """پیش‌پردازش و OCR یک تصویر صفحه"""
+        image, info = self.preprocessor.process(image)
+        return apply_to_result(self.ocr_engine.extract_text(image), info)
+
+    def _extract_customs_fields(self, ocr_result: Dict[str, Any], page_num: int) -> Dict[str, Any]:
+        """استخراج فیلدهای گمرکی با روش تنظیم شده (spatial در صورت وجود هندسه کلمات)"""
+        text = ocr_result.get('text', '')
+        words = ocr_result.get('words')
+        if self.extraction_mode == 'spatial' and words is not None and len(words["boxes"]):
+            return self.pattern_extractor.create_structured_json_spatial(words, text, page_num + 1)
+        return self.pattern_extractor.create_structured_json(text, page_num + 1)
+
+    def _missing_required_fields(self, customs_extraction: Dict[str, Any]) -> List[str]:
+        """فیلدهای ضروری که استخراج نشده‌اند"""
+        fields = customs_extraction.get("customs_fields", {})
+        return [name for name in self.required_fields
+                if name in fields and fields[name].get("value") is None]
+
+    def _use_text_layer(self, page: Dict[str, Any]) -> tuple:
+        """ساخت نتیجه معادل OCR از لایه متنی صفحه
+
+        Returns:
+            (ocr_result, customs_extraction)
+        """
+        start_time = time.time()
+        text = page["text"]
+        customs_extraction = self.pattern_extractor.create_structured_json(text, page["page_num"] + 1)
+
+        ocr_result = {
+            'text': text,
+            'confidence': 1.0,
+            'processing_time': time.time() - start_time,
+            'method': 'text_layer',
+            'text_length': len(text),
+            'dpi': None,
+            'dpi_attempts': [],
+            'render_path': 'text_layer'
+        }
+        return ocr_result, customs_extraction
+
+    def _ocr_page_template(self, page: Dict[str, Any]) -> tuple:
+        """OCR کادرهای فیلد و استخراج مستقیم مقادیر
+
+        Returns:
+            (ocr_result, customs_extraction)
+        """
+        start_time = time.time()
+        template = self.form_template
+        field_texts = {}
+        confidences = []
+
+        for field_name, image in page["field_images"].items():
+            # فیلدهای عددی با allowlist ارقام بازشناسی می‌شوند (recognition در قالب یا الگوی فیلد)
+            recognition = (template.fields[field_name].get("recognition")
+                           or self.pattern_extractor.recognition_mode(field_name))
+            result = self.ocr_engine.extract_field(image, recognition)
+            field_texts[field_name] = {
+                "text": result.get('text', ''),
+                "confidence": result.get('confidence', 0),
+                "value_pattern": template.fields[field_name].get("value_pattern")
+            }
+            confidences.append(result.get('confidence', 0))
+
+        customs_extraction = self.pattern_extractor.create_structured_json_from_fields(
+            field_texts, page["page_num"] + 1
+        )
+        text = ' '.join(data["text"] for data in field_texts.values() if data["text"])
+
+        ocr_result = {
+            'text': text,
+            'confidence': sum(confidences) / len(confidences) if confidences else 0,
+            'processing_time': time.time() - start_time,
+            'method': 'easyocr',
+            'text_length': len(text),
+            'dpi': page["dpi"],
+            'dpi_attempts': [],
+            'render_path': 'form_template',
+            'form_template': {
+                "name": template.name,
+                "version": template.version,
+                "calibration": page["calibration"],
+                "pixels_processed": page["pixels_processed"],
+                "full_page_pixels": page["full_page_pixels"],
+                "field_texts": {name: data["text"] for name, data in field_texts.items()}
+            }
+        }
+        return ocr_result, customs_extraction
+
+    def _ocr_page_adaptive(self, pdf_path: str, page: Dict[str, Any], dpi_ladder: List[int],
+                           escalation: Dict[str, Any], ocr_result: Dict[str, Any] = None) -> tuple:
+        """OCR صفحه با افزایش تدریجی DPI
+
+        صفحه ابتدا با DPI پایین پردازش می‌شود و تنها در صورتی که اعتماد OCR
+        کمتر از escalation_confidence باشد یا فیلدهای ضروری یافت نشوند، با
+        DPI بالاتر دوباره رندر می‌شود. DPI نهایی و تلاش‌ها در ocr_result ثبت
+        می‌شود. اگر ocr_result (مثلاً از OCR دسته‌ای) داده شود، OCR اولیه
+        تکرار نمی‌شود. کادرهای کم‌اعتماد هر نتیجه OCR (تک‌صفحه‌ای یا دسته‌ای)
+        پیش از استخراج فیلدها با DPI بالاتر بازشناسی می‌شوند
+        (processing.refinement). در صورت تجاوز از مهلت OCR، صفحه با نصف DPI
+        (حداقل min_dpi) دوباره رندر می‌شود و اگر در min_dpi هم از مهلت بگذرد
+        PageTimeout ایجاد می‌شود.
+
+        Returns:
+            (ocr_result, customs_extraction)
+        """
+        page_num = page["page_num"]
+        image = page["image"]
+        dpi = page["dpi"]
+        attempts = []
+
+        # تصویر اصلی اسکن با رندر مجدد دقیق‌تر نمی‌شود
+        refine = self.refinement_enabled and page.get("source") != "embedded_image"
+        if page.get("source") == "embedded_image":
+            dpi_ladder = []
+
+        while True:
+            if ocr_result is None:
+                try:
+                    ocr_result = self._ocr_image(image)
+                except PageTimeout:
+                    attempts.append({"dpi": dpi, "timed_out": True})
+                    if dpi is None or dpi <= self.min_dpi:
+                        raise
+                    lower_dpi = max(self.min_dpi, int(dpi) // 2)
+                    logger.warning(f"⏱️ صفحه {page_num + 1}: تجاوز از مهلت OCR در DPI {dpi}، "
+                                   f"تلاش مجدد با DPI {lower_dpi}")
+                    # پس از مهلت، DPIهای بالاتر امتحان نمی‌شوند
+                    dpi_ladder = [step for step in dpi_ladder if step < dpi]
+                    image = self._render_escalation(pdf_path, page_num, lower_dpi, escalation)
+                    dpi = lower_dpi
                     continue
+            if refine:
+                ocr_result = self._refine_low_confidence(pdf_path, page_num, ocr_result, dpi, escalation)
+            customs_extraction = self._extract_customs_fields(ocr_result, page_num)
 
-            logger.info(f"✅ پردازش کامل: {len(results)} صفحه")
-            return results
+            confidence = ocr_result.get('confidence', 0)
+            missing = self._missing_required_fields(customs_extraction)
+            attempts.append({"dpi": dpi, "confidence": confidence, "missing_fields": missing})
+
+            higher = [step for step in dpi_ladder if step > dpi]
+            if not higher or (confidence >= self.escalation_confidence and not missing):
+                break
+
+            next_dpi = higher[0]
+            logger.info(f"🔼 صفحه {page_num + 1}: افزایش DPI {dpi} → {next_dpi} "
+                        f"(اعتماد {confidence:.2f}، فیلدهای ناقص: {len(missing)})")
+
+            image = self._render_escalation(pdf_path, page_num, next_dpi, escalation)
+            dpi = next_dpi
+            ocr_result = None
+
+        ocr_result['dpi'] = dpi
+        ocr_result['dpi_attempts'] = attempts
+        ocr_result['render_path'] = page.get("source", "render") if len(attempts) == 1 else "render"
+        return ocr_result, customs_extraction
 
+    def _refine_low_confidence(self, pdf_path: str, page_num: int, ocr_result: Dict[str, Any],
+                               dpi: int, escalation: Dict[str, Any]) -> Dict[str, Any]:
+        """بازشناسی کلمات کم‌اعتماد از کلیپ فشرده PDF با dpi_scale برابر DPI
+
+        فقط کادر کلمات با اعتماد کمتر از refinement_min_confidence (حداکثر
+        max_regions کادر، ضعیف‌ترین‌ها) دوباره رندر و به recognizer داده
+        می‌شوند؛ کل صفحه دوباره OCR نمی‌شود.
+        """
+        words = ocr_result.get('words')
+        if words is None or not len(words["boxes"]) or not dpi:
+            return ocr_result
+
+        weak = np.flatnonzero(words["confidences"] < self.refinement_min_confidence)
+        if not len(weak):
+            return ocr_result
+        weak = weak[np.argsort(words["confidences"][weak], kind="stable")][:self.refinement_max_regions]
+
+        start_time = time.time()
+        refine_dpi = int(dpi * self.refinement_scale)
+        zoom = refine_dpi / 72.0
+        to_points = 72.0 / dpi
+        padding = self.refinement_padding
+
+        try:
+            regions = {}
+            with _FITZ_LOCK:
+                if escalation.get("doc") is None:
+                    escalation["doc"] = fitz.open(str(pdf_path))
+                pdf_page = escalation["doc"].load_page(page_num)
+                for index in weak:
+                    x0, y0, x1, y1 = (float(value) * to_points for value in words["boxes"][index])
+                    clip = fitz.Rect(x0 - padding, y0 - padding, x1 + padding, y1 + padding) & pdf_page.rect
+                    if clip.is_empty:
+                        continue
+                    pix = pdf_page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip,
+                                              colorspace=fitz.csGRAY, alpha=False)
+                    regions[int(index)] = np.array(pixmap_to_array(pix))
+
+            ocr_result = self.ocr_engine.refine(ocr_result, regions)
+        except ProcessingCancelled:
+            raise
         except Exception as e:
-            logger.error(f"❌ خطا در پردازش PDF: {e}")
-            return []
+            logger.warning(f"⚠️ صفحه {page_num + 1}: بازشناسی کادرهای کم‌اعتماد ناموفق: {e}")
+            return ocr_result
+
+        if 'refinement' in ocr_result:
+            ocr_result['refinement'].update({"dpi": refine_dpi,
+                                             "processing_time": round(time.time() - start_time, 4)})
+        return ocr_result
+
+    def _render_escalation(self, pdf_path: str, page_num: int, dpi: int,
+                           escalation: Dict[str, Any]) -> np.ndarray:
+        """رندر مجدد صفحه با DPI دیگر از سند دوم (فقط در صورت نیاز باز می‌شود)"""
+        with _FITZ_LOCK:
+            if escalation.get("doc") is None:
+                escalation["doc"] = fitz.open(str(pdf_path))
+            return self._render_page(escalation["doc"].load_page(page_num), dpi)
 
     def _create_standard_json(self, text: str, page_num: int, total_pages: int,
-                              pdf_name: str, pdf_path: str, ocr_result: Dict) -> Dict[str, Any]:
+                              pdf_name: str, pdf_path: str, ocr_result: Dict,
+                              customs_extraction: Dict[str, Any] = None) -> Dict[str, Any]:
         """تولید JSON استاندارد مطابق نمونه"""
 
         # تقسیم متن برای persian_text
@@ -190,15 +1229,28 @@ class PDFProcessor:
                     "english_text": english_words
                 }
             },
-            "customs_extraction": self.pattern_extractor.create_structured_json(text, page_num),
+            "customs_extraction": customs_extraction or self.pattern_extractor.create_structured_json(text, page_num),
             "ocr_info": {
                 "confidence": ocr_result.get('confidence', 0),
                 "processing_time": ocr_result.get('processing_time', 0),
-                "method": "easyocr",
-                "text_length": len(text)
+                "method": ocr_result.get('method', 'easyocr'),
+                "profile": ocr_result.get('profile'),
+                "text_length": len(text),
+                "dpi": ocr_result.get('dpi', self.default_dpi),
+                "dpi_attempts": ocr_result.get('dpi_attempts', []),
+                "render_path": ocr_result.get('render_path', 'render')
             }
         }
 
+        if 'form_template' in ocr_result:
+            structured_json["ocr_info"]["form_template"] = ocr_result['form_template']
+        if 'preprocessing' in ocr_result:
+            structured_json["ocr_info"]["preprocessing"] = ocr_result['preprocessing']
+        if 'backend_attempts' in ocr_result:
+            structured_json["ocr_info"]["backend_attempts"] = ocr_result['backend_attempts']
+        if 'refinement' in ocr_result:
+            structured_json["ocr_info"]["refinement"] = ocr_result['refinement']
+
         return structured_json
 
     def _extract_persian_words(self, text: str) -> List[str]:
@@ -216,8 +1268,5 @@ class PDFProcessor:
         return list(set(words))
 
     def _extract_numbers(self, text: str) -> List[str]:
-        """استخراج اعداد"""
-        import re
-        number_pattern = r'[\d\u06F0-\u06F9\u0660-\u0669]+(?:[,\.][\d\u06F0-\u06F9\u0660-\u0669]+)*'
-        numbers = re.findall(number_pattern, text)
-        return numbers
\ No newline at end of file
+        """استخراج اعداد (به شکل استاندارد با ارقام لاتین)"""
+        return NUMBER_PATTERN.findall(normalize_text(text))
\ No newline at end of file
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+پیش‌پردازش تصویر پیش از OCR - عملیات برداری NumPy/OpenCV با زمان‌سنجی هر مرحله
+"""
+
+import logging
+import time
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+
+try:
+    import cv2
+except ImportError:  # OpenCV همراه EasyOCR نصب می‌شود؛ در نبود آن معادل NumPy استفاده می‌شود
+    cv2 = None
+
+logger = logging.getLogger(__name__)
+
+# ترتیب اجرای مراحل
+PREPROCESSING_STEPS = ("grayscale", "downscale", "crop_borders", "denoise",
+                       "enhance_contrast", "sharpen", "threshold")
+
+
+class ImagePreprocessor:
+    """اجرای مراحل processing.image_preprocessing روی تصویر صفحه
+
+    مراحل: تبدیل به خاکستری، کوچک‌سازی (downscale_max_side)، حذف حاشیه و
+    فضای سفید، حذف نویز (median)، افزایش کنتراست (CLAHE)، تیزسازی و
+    دودویی‌سازی (Otsu). زمان هر مرحله جداگانه ثبت می‌شود و مقیاس و جابجایی
+    ناشی از کوچک‌سازی و برش برای برگرداندن مختصات کلمات نگهداری می‌شود.
+    """
+
+    def __init__(self, settings: Dict[str, Any] = None):
+        settings = settings or {}
+        self.enabled = settings.get("enabled", False)
+        self.downscale_max_side = settings.get("downscale_max_side", 0)
+        self.crop_borders = settings.get("crop_borders", True)
+        self.crop_margin = settings.get("crop_margin", 10)
+        self.denoise = settings.get("denoise", True)
+        self.enhance_contrast = settings.get("enhance_contrast", True)
+        self.clahe_clip_limit = settings.get("clahe_clip_limit", 3.0)
+        self.clahe_tile_grid = tuple(settings.get("clahe_tile_grid", (8, 8)))
+        self.sharpen = settings.get("sharpen", False)
+        self.threshold = settings.get("threshold", True)
+
+        # مجموع زمان هر مرحله در طول اجرا
+        self.totals = {step: 0.0 for step in PREPROCESSING_STEPS}
+        self.images = 0
+
+    @classmethod
+    def from_config(cls, config) -> "ImagePreprocessor":
+        """ساخت از تنظیمات processing.image_preprocessing"""
+        settings = config.get('processing.image_preprocessing', {}) if config is not None else {}
+        return cls(settings)
+
+    def enabled_steps(self) -> List[str]:
+        """مراحل فعال به ترتیب اجرا"""
+        flags = {
+            "grayscale": True,
+            "downscale": bool(self.downscale_max_side),
+            "crop_borders": self.crop_borders,
+            "denoise": self.denoise,
+            "enhance_contrast": self.enhance_contrast,
+            "sharpen": self.sharpen,
+            "threshold": self.threshold
+        }
+        return [step for step in PREPROCESSING_STEPS if flags[step]]
+
+    def process(self, image: np.ndarray) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """اجرای مراحل فعال
+
+        Returns:
+            (تصویر پردازش شده، {"steps": زمان هر مرحله، "scale"، "offset": (x, y)})
+        """
+        info = {"steps": {}, "scale": 1.0, "offset": (0, 0)}
+        if not self.enabled or image is None:
+            return image, info
+
+        for step in self.enabled_steps():
+            start = time.perf_counter()
+            image = getattr(self, f"_step_{step}")(image, info)
+            elapsed = time.perf_counter() - start
+            info["steps"][step] = elapsed
+            self.totals[step] += elapsed
+
+        self.images += 1
+        return image, info
+
+    @staticmethod
+    def to_original(boxes: np.ndarray, info: Dict[str, Any]) -> np.ndarray:
+        """برگرداندن کادرهای [x0, y0, x1, y1] به مختصات تصویر اصلی"""
+        if not len(boxes):
+            return boxes
+        offset_x, offset_y = info["offset"]
+        scale = info["scale"]
+        return (boxes / scale + np.array([offset_x, offset_y, offset_x, offset_y], dtype=np.float32)).astype(np.float32)
+
+    def stats(self) -> Dict[str, Any]:
+        """میانگین زمان هر مرحله (ثانیه) روی تصاویر پردازش شده"""
+        if not self.images:
+            return {}
+        return {step: total / self.images for step, total in self.totals.items() if total}
+
+    # --- مراحل -------------------------------------------------------------
+
+    def _step_grayscale(self, image: np.ndarray, info: Dict[str, Any]) -> np.ndarray:
+        if image.ndim == 2:
+            return image
+        weights = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+        return (image[..., :3] @ weights).astype(np.uint8)
+
+    def _step_downscale(self, image: np.ndarray, info: Dict[str, Any]) -> np.ndarray:
+        height, width = image.shape[:2]
+        scale = self.downscale_max_side / max(height, width)
+        if scale >= 1:
+            return image
+
+        if cv2 is not None:
+            image = cv2.resize(image, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+        else:
+            # میانگین بلوکی با ضریب صحیح
+            factor = int(np.ceil(1 / scale))
+            rows, cols = height // factor, width // factor
+            image = image[:rows * factor, :cols * factor].reshape(rows, factor, cols, factor).mean(axis=(1, 3))
+            image = image.astype(np.uint8)
+            scale = 1 / factor
+
+        info["scale"] *= scale
+        return image
+
+    def _step_crop_borders(self, image: np.ndarray, info: Dict[str, Any]) -> np.ndarray:
+        ink = image < 200
+
+        # سطر/ستون تقریباً کاملاً تیره = حاشیه اسکنر؛ کمی جوهر = محتوا
+        row_ink = ink.mean(axis=1)
+        rows = np.flatnonzero((row_ink > 0.001) & (row_ink < 0.95))
+        if not len(rows):
+            return image
+
+        col_ink = ink[rows[0]:rows[-1] + 1].mean(axis=0)
+        cols = np.flatnonzero((col_ink > 0.001) & (col_ink < 0.95))
+        if not len(cols):
+            return image
+
+        margin = self.crop_margin
+        top, bottom = max(0, rows[0] - margin), min(image.shape[0], rows[-1] + margin + 1)
+        left, right = max(0, cols[0] - margin), min(image.shape[1], cols[-1] + margin + 1)
+
+        offset_x, offset_y = info["offset"]
+        scale = info["scale"]
+        info["offset"] = (offset_x + float(left) / scale, offset_y + float(top) / scale)
+        return image[top:bottom, left:right]
+
+    def _step_denoise(self, image: np.ndarray, info: Dict[str, Any]) -> np.ndarray:
+        if cv2 is not None:
+            return cv2.medianBlur(image, 3)
+
+        # میانه 3×3 با نماهای جابجا شده
+        padded = np.pad(image, 1, mode='edge')
+        height, width = image.shape
+        stack = np.stack([padded[dy:dy + height, dx:dx + width] for dy in range(3) for dx in range(3)])
+        return np.median(stack, axis=0).astype(np.uint8)
+
+    def _step_enhance_contrast(self, image: np.ndarray, info: Dict[str, Any]) -> np.ndarray:
+        if cv2 is not None:
+            clahe = cv2.createCLAHE(clipLimit=self.clahe_clip_limit, tileGridSize=self.clahe_tile_grid)
+            return clahe.apply(image)
+
+        # معادل‌سازی سراسری هیستوگرام
+        histogram = np.bincount(image.ravel(), minlength=256)
+        cdf = histogram.cumsum()
+        cdf_min = cdf[np.nonzero(cdf)[0][0]]
+        lut = np.clip((cdf - cdf_min) * 255 / max(1, cdf[-1] - cdf_min), 0, 255).astype(np.uint8)
+        return lut[image]
+
+    def _step_sharpen(self, image: np.ndarray, info: Dict[str, Any]) -> np.ndarray:
+        if cv2 is not None:
+            blurred = cv2.GaussianBlur(image, (0, 0), 1.0)
+            return cv2.addWeighted(image, 1.5, blurred, -0.5, 0)
+
+        # unsharp mask با میانگین 3×3
+        padded = np.pad(image.astype(np.float32), 1, mode='edge')
+        height, width = image.shape
+        blurred = sum(padded[dy:dy + height, dx:dx + width] for dy in range(3) for dx in range(3)) / 9
+        return np.clip(image * 1.5 - blurred * 0.5, 0, 255).astype(np.uint8)
+
+    def _step_threshold(self, image: np.ndarray, info: Dict[str, Any]) -> np.ndarray:
+        # آستانه Otsu با هیستوگرام
+        histogram = np.bincount(image.ravel(), minlength=256).astype(np.float64)
+        levels = np.arange(256)
+        weight_background = histogram.cumsum()
+        weight_foreground = weight_background[-1] - weight_background
+        mean_cumulative = (histogram * levels).cumsum()
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_background = mean_cumulative / weight_background
+            mean_foreground = (mean_cumulative[-1] - mean_cumulative) / weight_foreground
+            variance = weight_background * weight_foreground * (mean_background - mean_foreground) ** 2
+
+        threshold = int(np.nanargmax(variance))
+        return np.where(image > threshold, 255, 0).astype(np.uint8)
+
+
+def apply_to_result(ocr_result: Dict[str, Any], info: Dict[str, Any]) -> Dict[str, Any]:
+    """ثبت زمان‌های پیش‌پردازش و برگرداندن مختصات کلمات به تصویر اصلی"""
+    if not info["steps"]:
+        return ocr_result
+
+    words = ocr_result.get('words')
+    if words is not None:
+        words["boxes"] = ImagePreprocessor.to_original(words["boxes"], info)
+
+    ocr_result['preprocessing'] = {
+        "steps": {step: round(seconds, 4) for step, seconds in info["steps"].items()},
+        "total_time": round(sum(info["steps"].values()), 4),
+        "scale": info["scale"],
+        "offset": [float(value) for value in info["offset"]]
+    }
+    return ocr_result
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+استخراج مجدد فیلدها از JSONهای ذخیره شده صفحات - بدون اجرای دوباره OCR
+"""
+
+import json
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Iterator, Iterable, Tuple
+
+from .batch import ConfigSnapshot
+
+logger = logging.getLogger(__name__)
+
+# تعداد صفحات هر کار ارسالی به کارگر (هزینه ارتباط بین پردازه‌ها سرشکن می‌شود)
+CHUNK_SIZE = 64
+# فاصله گزارش پیشرفت (ثانیه)
+PROGRESS_INTERVAL = 2.0
+# حداکثر خطاهای نگه داشته شده در گزارش هر کار
+MAX_REPORTED_ERRORS = 20
+
+# CustomsPatternExtractor مخصوص هر پردازه کارگر
+_worker_extractor = None
+
+# پیشوند matched_pattern فیلدهایی که از کادرهای OCR (قالب فرم یا حالت مکانی)
+# استخراج شده‌اند؛ متن ذخیره شده برای بازسازی آن‌ها کافی نیست
+GEOMETRY_PATTERN_PREFIXES = ("form_template:", "spatial:")
+
+
+def page_text(data: Dict[str, Any]) -> Optional[str]:
+    """متن کامل صفحه از JSON ذخیره شده
+
+    raw_text داخل customs_extraction به 500 حرف کوتاه شده است؛ متن کامل در
+    raw_text سطح بالا، text_extraction یا structured_data قرار دارد.
+    """
+    for section in (data, data.get("text_extraction"), data.get("structured_data")):
+        if isinstance(section, dict) and isinstance(section.get("raw_text"), str) and section["raw_text"]:
+            return section["raw_text"]
+    return None
+
+
+def iter_page_files(inputs: Iterable[str]) -> Iterator[Path]:
+    """پیمایش تنبل فایل‌های JSON صفحات (*_page_*.json) در فایل‌ها و پوشه‌های ورودی"""
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith(".json") and "_page_" in name:
+                        yield Path(root) / name
+        elif path.is_file():
+            yield path
+        else:
+            logger.warning(f"⚠️ مسیر یافت نشد: {path}")
+
+
+def _field_values(customs_extraction: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    fields = (customs_extraction or {}).get("customs_fields") or {}
+    return {name: field.get("value") for name, field in fields.items() if isinstance(field, dict)}
+
+
+def _geometry_fields(customs_extraction: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """فیلدهای استخراج شده از قالب فرم یا حالت مکانی (GEOMETRY_PATTERN_PREFIXES)"""
+    fields = (customs_extraction or {}).get("customs_fields") or {}
+    return {name: field for name, field in fields.items()
+            if isinstance(field, dict) and isinstance(field.get("matched_pattern"), str)
+            and field["matched_pattern"].startswith(GEOMETRY_PATTERN_PREFIXES)}
+
+
+def _write_json(path: Path, data: Dict[str, Any]):
+    """نوشتن JSON در فایل موقت و جایگزینی اتمی (فایل نیمه‌نوشته باقی نمی‌ماند)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    # dumps و یک write: json.dump با indent هر تکه را جداگانه می‌نویسد
+    content = json.dumps(data, ensure_ascii=False, indent=2)
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+
+def reextract_page(extractor, path: Path, output_path: Optional[Path] = None,
+                   force: bool = False, dry_run: bool = False) -> str:
+    """استخراج مجدد یک صفحه و بازنویسی فقط بخش customs_extraction
+
+    مقادیر قالب فرم و حالت مکانی (form_template: و spatial:) از کادرهای
+    OCR به دست آمده‌اند و بدون تغییر نگه داشته می‌شوند؛ بقیه فیلدها با
+    الگوهای فعلی روی متن صفحه جستجو می‌شوند.
+
+    Returns:
+        وضعیت صفحه: changed یا unchanged (مقادیر فیلدها نسبت به استخراج قبلی)،
+        skipped (با همین نسخه الگوها استخراج شده) یا ignored (JSON صفحه نیست)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    text = page_text(data) if isinstance(data, dict) else None
+    if text is None:
+        return "ignored"
+
+    previous = data.get("customs_extraction")
+    if not force and isinstance(previous, dict):
+        previous_pack = (previous.get("document_info") or {}).get("pattern_pack") or {}
+        if previous_pack.get("hash") == extractor.pack.info()["hash"]:
+            # مجموعه خروجی جدید باید کامل باشد
+            if output_path is not None and not dry_run:
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(path, output_path)
+            return "skipped"
+
+    page_number = (data.get("document_info") or {}).get("page_number") or \
+        ((previous or {}).get("document_info") or {}).get("page_number") or 1
+    kept_fields = _geometry_fields(previous)
+    method = ((previous or {}).get("document_info") or {}).get("extraction_method") if kept_fields else None
+    customs_extraction = extractor.create_structured_json(text, page_number, keep_fields=kept_fields,
+                                                          extraction_method=method or "regex_patterns")
+    status = "changed" if _field_values(previous) != _field_values(customs_extraction) else "unchanged"
+
+    if not dry_run:
+        data["customs_extraction"] = customs_extraction
+        _write_json(output_path or path, data)
+    return status
+
+
+def _init_worker(config_snapshot: ConfigSnapshot):
+    """ساخت یک CustomsPatternExtractor برای هر کارگر"""
+    global _worker_extractor
+    from .pattern_extractor import CustomsPatternExtractor
+
+    _worker_extractor = CustomsPatternExtractor(config_snapshot)
+    # همه صفحات یک اجرا با یک نسخه الگوها استخراج می‌شوند
+    _worker_extractor.hot_reload = False
+
+
+def _empty_stats() -> Dict[str, Any]:
+    return {"pages": 0, "changed": 0, "unchanged": 0, "skipped": 0, "ignored": 0, "failed": 0, "errors": []}
+
+
+def _reextract_chunk(jobs: List[Tuple[str, Optional[str]]], force: bool, dry_run: bool) -> Dict[str, Any]:
+    """استخراج مجدد یک دسته صفحه در پردازه کارگر"""
+    stats = _empty_stats()
+    for path, output_path in jobs:
+        stats["pages"] += 1
+        try:
+            status = reextract_page(_worker_extractor, Path(path), Path(output_path) if output_path else None,
+                                    force, dry_run)
+        except Exception as e:
+            stats["failed"] += 1
+            if len(stats["errors"]) < MAX_REPORTED_ERRORS:
+                stats["errors"].append((path, str(e)))
+            continue
+        stats[status] += 1
+    return stats
+
+
+class ReExtractor:
+    """استخراج مجدد موازی فیلدهای گمرکی از JSONهای صفحات
+
+    فایل‌ها به صورت جریانی پیمایش و در دسته‌های chunk_size تایی بین
+    کارگرها پخش می‌شوند؛ حداکثر دو دسته برای هر کارگر در صف است، پس
+    حافظه مصرفی به تعداد کل صفحات بستگی ندارد. هر کارگر یک بار بسته الگو
+    را کامپایل می‌کند. صفحاتی که با همین نسخه بسته الگو استخراج شده‌اند
+    (hash در document_info.pattern_pack) جز با force دوباره پردازش نمی‌شوند.
+    """
+
+    def __init__(self, config=None, workers: int = None, chunk_size: int = None):
+        self.config = ConfigSnapshot.from_config(config)
+        self.workers = max(1, int(workers or self.config.get('processing.reextract.workers', 0)
+                                  or os.cpu_count() or 1))
+        self.chunk_size = max(1, int(chunk_size or self.config.get('processing.reextract.chunk_size', CHUNK_SIZE)))
+
+    def run(self, inputs: Iterable[str], output_dir: str = None, force: bool = False, dry_run: bool = False,
+            progress=None) -> Dict[str, Any]:
+        """استخراج مجدد همه صفحات ورودی
+
+        Args:
+            inputs: فایل‌ها یا پوشه‌های JSON صفحات
+            output_dir: پوشه خروجی؛ None یعنی بازنویسی همان فایل‌ها
+            force: استخراج مجدد صفحات استخراج شده با نسخه فعلی الگوها
+            dry_run: فقط گزارش تغییرات بدون نوشتن فایل
+            progress: تابع اختیاری با آرگومان آمار تجمعی (پس از هر دسته)
+
+        Returns:
+            آمار کل شامل pages، changed، unchanged، skipped، ignored، failed،
+            errors (حداکثر MAX_REPORTED_ERRORS)، elapsed و pages_per_second
+        """
+        inputs = [str(item) for item in inputs]
+        totals = _empty_stats()
+        start_time = time.perf_counter()
+        last_report = start_time
+
+        def merge(stats):
+            nonlocal last_report
+            for key, value in stats.items():
+                if key != "errors":
+                    totals[key] += value
+            for path, error in stats["errors"]:
+                logger.error(f"❌ خطا در {path}: {error}")
+            totals["errors"].extend(stats["errors"][:MAX_REPORTED_ERRORS - len(totals["errors"])])
+            totals["elapsed"] = time.perf_counter() - start_time
+            totals["pages_per_second"] = totals["pages"] / totals["elapsed"] if totals["elapsed"] else 0
+            if progress is not None:
+                progress(totals)
+            if time.perf_counter() - last_report >= PROGRESS_INTERVAL:
+                last_report = time.perf_counter()
+                logger.info(f"📊 {totals['pages']} صفحه ({totals['pages_per_second']:.0f} صفحه/ثانیه)، "
+                            f"تغییر: {totals['changed']}، رد شده: {totals['skipped']}، خطا: {totals['failed']}")
+
+        chunks = self._iter_chunks(inputs, output_dir)
+        logger.info(f"🔁 استخراج مجدد با {self.workers} کارگر (دسته‌های {self.chunk_size} صفحه‌ای)"
+                    + (" - بدون نوشتن" if dry_run else ""))
+
+        if self.workers == 1:
+            _init_worker(self.config)
+            for jobs in chunks:
+                merge(_reextract_chunk(jobs, force, dry_run))
+        else:
+            # spawn: هم‌خوان با BatchProcessor
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context("spawn"),
+                                     initializer=_init_worker, initargs=(self.config,)) as executor:
+                pending = {}
+                for jobs in chunks:
+                    pending[executor.submit(_reextract_chunk, jobs, force, dry_run)] = jobs
+                    if len(pending) >= self.workers * 2:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            merge(self._chunk_result(future, pending.pop(future)))
+                for future in list(pending):
+                    merge(self._chunk_result(future, pending.pop(future)))
+
+        totals["elapsed"] = time.perf_counter() - start_time
+        totals["pages_per_second"] = totals["pages"] / totals["elapsed"] if totals["elapsed"] else 0
+        logger.info(f"✅ استخراج مجدد: {totals['pages']} صفحه در {totals['elapsed']:.1f} ثانیه "
+                    f"({totals['pages_per_second']:.0f} صفحه/ثانیه)، تغییر: {totals['changed']}، "
+                    f"بدون تغییر: {totals['unchanged']}، رد شده: {totals['skipped']}، خطا: {totals['failed']}")
+        return totals
+
+    @staticmethod
+    def _chunk_result(future, jobs: List[Tuple[str, Optional[str]]]) -> Dict[str, Any]:
+        """نتیجه یک دسته؛ خطای کارگر (مثل توقف پردازه) همه صفحات دسته را ناموفق می‌کند"""
+        try:
+            return future.result()
+        except Exception as e:
+            stats = _empty_stats()
+            stats["pages"] = stats["failed"] = len(jobs)
+            stats["errors"].append((jobs[0][0], f"{e} ({len(jobs)} صفحه)"))
+            return stats
+
+    def _iter_chunks(self, inputs: List[str], output_dir: Optional[str]) -> Iterator[List[Tuple[str, Optional[str]]]]:
+        """دسته‌های (مسیر ورودی، مسیر خروجی) به صورت جریانی"""
+        chunk = []
+        for item in inputs:
+            root = Path(item)
+            for path in iter_page_files([item]):
+                output_path = None
+                if output_dir:
+                    relative = path.relative_to(root) if root.is_dir() else Path(path.name)
+                    output_path = str(Path(output_dir) / relative)
+                chunk.append((str(path), output_path))
+                if len(chunk) >= self.chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
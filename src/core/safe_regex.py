@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+اجرای امن الگوهای regex - موتور خطی RE2، regex با مهلت و بررسی الگوها
+"""
+
+import re
+import math
+import time
+import logging
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
+
+try:
+    import re2
+except ImportError:  # وابستگی اختیاری؛ در نبود آن regex یا re استفاده می‌شود
+    re2 = None
+
+try:
+    import regex
+except ImportError:
+    regex = None
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # پایتون 3.10 و قدیمی‌تر
+    import sre_parse
+
+logger = logging.getLogger(__name__)
+
+# موتورها (patterns.engine): auto = الگوهای پرخطر (pattern_issues) با re2 در صورت
+# سازگاری و سپس regex با مهلت، بقیه با re؛ re2 / regex = همه الگوها با آن موتور
+ENGINES = ("auto", "re2", "regex", "re")
+
+# مهلت پیش‌فرض هر اجرای الگو در موتور regex (ثانیه)
+PATTERN_TIMEOUT = 0.1
+
+# معادل RE2 کلاس‌های یونیکد پایتون؛ \d و \w و \s در RE2 فقط ASCII هستند
+# (None = داخل [] قابل بیان نیست)
+_RE2_CLASSES = {
+    'd': (r'\p{Nd}', r'\p{Nd}'),
+    'D': (r'\P{Nd}', r'\P{Nd}'),
+    'w': (r'[\p{L}\p{N}_]', r'\p{L}\p{N}_'),
+    'W': (r'[^\p{L}\p{N}_]', None),
+    's': (r'[\s\x{0b}\x{1c}-\x{1f}\x{85}\p{Z}]', r'\s\x{0b}\x{1c}-\x{1f}\x{85}\p{Z}'),
+    'S': (r'[^\s\x{0b}\x{1c}-\x{1f}\x{85}\p{Z}]', None),
+}
+
+
+def to_re2(pattern: str, flags: int = 0) -> Optional[str]:
+    """ترجمه الگوی re به نحو RE2 با همان معنای یونیکد
+
+    Returns:
+        الگوی RE2 یا None اگر الگو سازگار نباشد (ارجاع به گروه، \\b،
+        لنگرهای ^ و $ که معنای آن‌ها با pos/endpos متفاوت است و ...)
+    """
+    if flags & ~(re.IGNORECASE | re.UNICODE | re.DOTALL):
+        return None
+
+    output = []
+    in_class = False
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\' and index + 1 < len(pattern):
+            escaped = pattern[index + 1]
+            index += 2
+            if escaped in _RE2_CLASSES:
+                translated = _RE2_CLASSES[escaped][1 if in_class else 0]
+                if translated is None:
+                    return None
+                output.append(translated)
+            elif escaped.isalnum() and escaped not in 'tnrfvx':
+                return None  # \b \A \Z \1 و ...
+            else:
+                output.append('\\' + escaped)
+            continue
+
+        if in_class:
+            if char == ']':
+                in_class = False
+            output.append(char)
+        elif char == '[':
+            in_class = True
+            output.append(char)
+            # ] یا ^] ابتدای کلاس حرف عادی است
+            if pattern[index + 1:index + 2] == '^':
+                output.append('^')
+                index += 1
+            if pattern[index + 1:index + 2] == ']':
+                output.append(r'\]')
+                index += 1
+        elif char in '^$':
+            return None
+        else:
+            output.append(char)
+        index += 1
+
+    prefix = ''
+    if flags & re.IGNORECASE:
+        prefix += 'i'
+    if flags & re.DOTALL:
+        prefix += 's'
+    return (f'(?{prefix})' if prefix else '') + ''.join(output)
+
+
+class SafePattern:
+    """الگوی کامپایل شده با موتور انتخاب شده
+
+    search و finditer مانند re.Pattern با pos و endpos کار می‌کنند. در موتور
+    regex اجرای طولانی‌تر از timeout متوقف و مانند «بدون تطابق» رفتار می‌شود.
+    RE2 هر بار کل متن را به UTF-8 تبدیل می‌کند، پس برش text[pos:endpos] به
+    آن داده می‌شود (الگوهای سازگار لنگر وابسته به موقعیت ندارند) و موقعیت
+    تطابق‌های آن نسبت به pos است.
+    """
+
+    def __init__(self, pattern: str, flags: int = 0, engine: str = "auto", timeout: float = PATTERN_TIMEOUT):
+        self.pattern = pattern
+        self.timeout = timeout
+        self.engine, self._compiled = self._compile(pattern, flags, engine)
+        self.groups = self._compiled.groups
+        # موقعیت تطابق‌ها نسبت به pos است (برش متن برای RE2)
+        self.relative_positions = self.engine == "re2"
+
+    def _compile(self, pattern: str, flags: int, engine: str):
+        # هزینه هر فراخوانی RE2 حدود ده برابر re است؛ الگوهای بدون عقبگرد
+        # پرهزینه در حالت auto با همان re اجرا می‌شوند
+        if engine == "auto" and not pattern_issues(pattern, flags):
+            return "re", re.compile(pattern, flags)
+
+        if engine in ("auto", "re2") and re2 is not None:
+            translated = to_re2(pattern, flags)
+            if translated is not None:
+                try:
+                    return "re2", re2.compile(translated)
+                except Exception as e:
+                    logger.debug(f"الگو با RE2 سازگار نیست ({e}): {pattern}")
+
+        if engine in ("auto", "re2", "regex") and regex is not None:
+            return "regex", regex.compile(pattern, flags | regex.VERSION0)
+
+        return "re", re.compile(pattern, flags)
+
+    def search(self, text: str, pos: int = 0, endpos: int = None):
+        endpos = len(text) if endpos is None else endpos
+        if self.engine == "re2":
+            return self._compiled.search(text[pos:endpos])
+        if self.engine == "re":
+            return self._compiled.search(text, pos, endpos)
+        try:
+            return self._compiled.search(text, pos, endpos, timeout=self.timeout)
+        except TimeoutError:
+            logger.warning(f"⏱️ اجرای الگو از {self.timeout} ثانیه بیشتر شد و متوقف شد: {self.pattern}")
+            return None
+
+    def finditer(self, text: str, pos: int = 0, endpos: int = None):
+        endpos = len(text) if endpos is None else endpos
+        if self.engine == "re2":
+            yield from self._compiled.finditer(text[pos:endpos])
+            return
+        if self.engine == "re":
+            yield from self._compiled.finditer(text, pos, endpos)
+            return
+        try:
+            yield from self._compiled.finditer(text, pos, endpos, timeout=self.timeout)
+        except TimeoutError:
+            logger.warning(f"⏱️ اجرای الگو از {self.timeout} ثانیه بیشتر شد و متوقف شد: {self.pattern}")
+
+
+@lru_cache(maxsize=1024)
+def compile_pattern(pattern: str, flags: int = 0, engine: str = "auto",
+                    timeout: float = PATTERN_TIMEOUT) -> SafePattern:
+    """SafePattern با کش (الگوهای تکراری یک بار کامپایل می‌شوند)"""
+    return SafePattern(pattern, flags, engine, timeout)
+
+
+def resolve_engine(engine: Optional[str]) -> str:
+    """اعتبارسنجی patterns.engine؛ هشدار در صورت نبود موتور امن"""
+    if engine not in ENGINES:
+        if engine:
+            logger.warning(f"⚠️ موتور الگو نامعتبر: {engine}، از auto استفاده می‌شود")
+        engine = "auto"
+    if engine != "re" and re2 is None and regex is None:
+        logger.warning("⚠️ re2 و regex نصب نیستند، الگوها بدون محدودیت زمانی با re اجرا می‌شوند")
+    return engine
+
+
+def _lint_items(items, issues: List[str]) -> int:
+    """بررسی بازگشتی درخت الگو؛ تعداد کمیت‌سنج‌های نامحدود تنبل را برمی‌گرداند"""
+    lazy = 0
+    for op, value in items:
+        if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            low, high, body = value
+            if high == sre_parse.MAXREPEAT and op == sre_parse.MIN_REPEAT:
+                lazy += 1
+            # (a+)+ : تکرار نامحدودی که بدون جداکننده درون تکرار دیگر آمده است
+            if (high == sre_parse.MAXREPEAT or high > 1) and _starts_unbounded(body):
+                issues.append("کمیت‌سنج تو در تو (تکرار نامحدود داخل تکرار)")
+            lazy += _lint_items(body, issues)
+        elif op == sre_parse.SUBPATTERN:
+            lazy += _lint_items(value[-1], issues)
+        elif op == sre_parse.BRANCH:
+            lazy += max((_lint_items(branch, issues) for branch in value[1]), default=0)
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            lazy += _lint_items(value[1], issues)
+    return lazy
+
+
+def _starts_unbounded(items) -> bool:
+    """آیا اولین جزء الگو تکرار نامحدود است"""
+    if not len(items):
+        return False
+    op, value = items[0]
+    if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+        return value[1] == sre_parse.MAXREPEAT or _starts_unbounded(value[2])
+    if op == sre_parse.SUBPATTERN:
+        return _starts_unbounded(value[-1])
+    if op == sre_parse.BRANCH:
+        return any(_starts_unbounded(branch) for branch in value[1])
+    return False
+
+
+def adversarial_text(pattern: str, flags: int, repeats: int) -> str:
+    """ورودی مصنوعی بدترین حالت: رشته‌های ثابت الگو (به قالب "توکن", "توکن")
+    بارها تکرار می‌شوند (اگر الگو با آن‌ها تطبیق یابد بدون آخرین رشته ثابت)
+    تا الگو شکست بخورد و همه مسیرهای عقبگرد پیموده شوند"""
+    from .anchor_index import required_literals
+
+    literals = required_literals(pattern, flags) or ["الف"]
+    tokens = literals
+    if re.search(pattern, '"' + '", "'.join(literals * 2) + '"', flags):
+        tokens = literals[:-1] or ["الف"]
+    return '"' + '", "'.join(tokens * repeats) + '"'
+
+
+def _measure(compiled, text: str, budget: float) -> Optional[float]:
+    """زمان یک جستجوی ناموفق؛ None اگر از budget بیشتر شود"""
+    start = time.perf_counter()
+    if compiled.engine == "regex":
+        try:
+            compiled._compiled.search(text, timeout=budget)
+        except TimeoutError:
+            return None
+    else:
+        compiled.search(text)
+    return time.perf_counter() - start
+
+
+def pattern_issues(pattern: str, flags: int = 0) -> List[str]:
+    """کمیت‌سنج‌های تو در تو و کمیت‌سنج‌های تنبل نامحدود (مانند .*?) الگو؛
+    k کمیت‌سنج تنبل پشت سر هم در شکست تا O(n^(k+1)) عقبگرد دارند"""
+    issues = []
+    lazy = _lint_items(sre_parse.parse(pattern, flags), issues)
+    if lazy:
+        issues.append(f"{lazy} کمیت‌سنج تنبل نامحدود (بدترین حالت O(n^{lazy + 1}))")
+    return list(dict.fromkeys(issues))
+
+
+def lint_pattern(pattern: str, flags: int = re.IGNORECASE, engine: str = "auto", measure: bool = False,
+                 sizes=(8, 16, 32, 64), budget: float = 1.0) -> Dict[str, Any]:
+    """بررسی یک الگو (pattern_issues و موتور انتخاب شده)
+
+    با measure=True زمان جستجو روی adversarial_text با اندازه‌های
+    sizes برای موتور عقبگرد (regex یا re) و موتور انتخاب شده اندازه‌گیری و
+    نمای رشد (exponent) تخمین زده می‌شود. در موتور re اندازه‌گیری بعد از
+    عبور از budget متوقف می‌شود.
+    """
+    selected = compile_pattern(pattern, flags, engine)
+    report = {"pattern": pattern, "engine": selected.engine, "issues": pattern_issues(pattern, flags)}
+    if not measure:
+        return report
+
+    backtracking = SafePattern(pattern, flags, "regex" if regex is not None else "re")
+    engines = [("backtracking", backtracking)]
+    if selected.engine != backtracking.engine:
+        engines.append((selected.engine, selected))
+
+    timings = {}
+    for name, compiled in engines:
+        timings[name] = {}
+        compiled.search(adversarial_text(pattern, flags, 1))  # گرم شدن
+        for repeats in sizes:
+            text = adversarial_text(pattern, flags, repeats)
+            elapsed = _measure(compiled, text, budget)
+            timings[name][len(text)] = elapsed
+            # re قابل توقف نیست؛ اندازه دو برابر ممکن است ده‌ها برابر کندتر باشد
+            if elapsed is None or elapsed > (budget / 16 if compiled.engine == "re" else budget):
+                break
+
+    report["timings"] = timings
+    report["exponent"] = _growth_exponent(timings["backtracking"])
+    return report
+
+
+def _growth_exponent(timings: Dict[int, Optional[float]]) -> Optional[float]:
+    """شیب log(زمان)/log(طول) بین دو اندازه آخر اندازه‌گیری شده"""
+    points = [(length, elapsed) for length, elapsed in timings.items() if elapsed]
+    if len(points) < 2:
+        return None
+    (length_a, time_a), (length_b, time_b) = points[-2], points[-1]
+    return math.log(time_b / time_a) / math.log(length_b / length_a)
+
+
+def lint_patterns(patterns: Dict[str, Dict[str, Any]], engine: str = "auto",
+                  measure: bool = False, **kwargs) -> List[Dict[str, Any]]:
+    """بررسی الگوهای همه فیلدها (قالب CustomsPatternExtractor.patterns)"""
+    reports = []
+    for field_name, field_config in patterns.items():
+        for pattern in field_config.get("patterns", []):
+            try:
+                report = lint_pattern(pattern, engine=engine, measure=measure, **kwargs)
+            except (re.error, ValueError) as e:
+                report = {"pattern": pattern, "engine": None, "issues": [f"الگوی نامعتبر: {e}"]}
+            report["field"] = field_name
+            reports.append(report)
+    return reports
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+هندسه کلمات OCR و استخراج مکانی فیلدها - یافتن مقدار بر اساس موقعیت برچسب
+"""
+
+import logging
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Tuple
+
+import numpy as np
+
+from .safe_regex import compile_pattern, PATTERN_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# پیمایش حلقه‌ای سلول‌ها حداکثر تا این فاصله (بر حسب سلول) ادامه می‌یابد
+MAX_SEARCH_RINGS = 6
+
+
+def words_from_readtext(results: List) -> Dict[str, np.ndarray]:
+    """تبدیل خروجی readtext به آرایه‌های فشرده NumPy
+
+    Returns:
+        {"boxes": float32 (N, 4) به صورت [x0, y0, x1, y1],
+         "texts": رشته‌ها (N,), "confidences": float32 (N,)}
+    """
+    boxes = np.zeros((len(results), 4), dtype=np.float32)
+    texts = []
+    confidences = np.zeros(len(results), dtype=np.float32)
+
+    for index, (bbox, text, confidence) in enumerate(results):
+        points = np.asarray(bbox, dtype=np.float32).reshape(-1, 2)
+        boxes[index] = (points[:, 0].min(), points[:, 1].min(), points[:, 0].max(), points[:, 1].max())
+        texts.append(text)
+        confidences[index] = confidence
+
+    return {
+        "boxes": boxes,
+        "texts": np.array(texts, dtype=np.str_) if texts else np.zeros(0, dtype='<U1'),
+        "confidences": confidences
+    }
+
+
+def save_words(path: str, words: Dict[str, np.ndarray]) -> str:
+    """ذخیره هندسه کلمات در فایل .npz"""
+    path = Path(path).with_suffix('.npz')
+    np.savez_compressed(path, boxes=words["boxes"], texts=words["texts"], confidences=words["confidences"])
+    return str(path)
+
+
+def load_words(path: str) -> Dict[str, np.ndarray]:
+    """بارگذاری هندسه کلمات از فایل .npz"""
+    with np.load(path, allow_pickle=False) as data:
+        return {"boxes": data["boxes"], "texts": data["texts"], "confidences": data["confidences"]}
+
+
+class SpatialIndex:
+    """نمایه شبکه‌ای یکنواخت روی مرکز کادرها
+
+    اندازه سلول بر اساس میانه ارتفاع کادرها تعیین می‌شود؛ جستجوی همسایه‌ها
+    تنها سلول‌های اطراف نقطه را بررسی می‌کند. نمایه توکن‌ها هم یافتن کادر
+    برچسب را به یک جستجوی دیکشنری تبدیل می‌کند.
+    """
+
+    def __init__(self, words: Dict[str, np.ndarray], cell_scale: float = 4.0):
+        self.boxes = words["boxes"]
+        self.texts = words["texts"]
+        self.confidences = words["confidences"]
+        self.centers = np.column_stack([
+            (self.boxes[:, 0] + self.boxes[:, 2]) / 2,
+            (self.boxes[:, 1] + self.boxes[:, 3]) / 2
+        ]) if len(self.boxes) else np.zeros((0, 2), dtype=np.float32)
+
+        heights = self.boxes[:, 3] - self.boxes[:, 1]
+        self.cell_size = float(max(1.0, np.median(heights) * cell_scale)) if len(heights) else 1.0
+
+        self.cells = defaultdict(list)
+        for index, (cx, cy) in enumerate(self.centers):
+            self.cells[self._cell(cx, cy)].append(index)
+
+        self.tokens = defaultdict(list)
+        for index, text in enumerate(self.texts):
+            for token in str(text).split():
+                self.tokens[token].append(index)
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def find_token(self, token: str) -> List[int]:
+        """کادرهای شامل توکن (تطابق کامل توکن)"""
+        return self.tokens.get(token, [])
+
+    def neighbours(self, index: int) -> List[Tuple[float, int]]:
+        """کادرهای اطراف کادر index، مرتب بر اساس فاصله مرکز
+
+        سلول‌ها به صورت حلقه‌ای پیمایش می‌شوند و با یافتن اولین حلقه دارای
+        کادر، یک حلقه دیگر هم برای اطمینان از نزدیک‌ترین بودن بررسی می‌شود.
+        """
+        cx, cy = self.centers[index]
+        col, row = self._cell(cx, cy)
+        found = []
+        last_ring = MAX_SEARCH_RINGS
+
+        ring = 0
+        while ring <= last_ring:
+            for c in range(col - ring, col + ring + 1):
+                for r in range(row - ring, row + ring + 1):
+                    if max(abs(c - col), abs(r - row)) != ring:
+                        continue
+                    for other in self.cells.get((c, r), ()):
+                        if other != index:
+                            found.append(other)
+            if found and last_ring == MAX_SEARCH_RINGS:
+                last_ring = min(MAX_SEARCH_RINGS, ring + 1)
+            ring += 1
+
+        distances = [(float(np.hypot(*(self.centers[other] - self.centers[index]))), other)
+                     for other in found]
+        return sorted(distances)
+
+    def relation(self, anchor: int, other: int) -> Optional[str]:
+        """رابطه مکانی کادر other نسبت به anchor: same_row، below یا None"""
+        ax0, ay0, ax1, ay1 = self.boxes[anchor]
+        ox0, oy0, ox1, oy1 = self.boxes[other]
+
+        vertical_overlap = min(ay1, oy1) - max(ay0, oy0)
+        if vertical_overlap > 0.5 * min(ay1 - ay0, oy1 - oy0):
+            return "same_row"
+
+        horizontal_overlap = min(ax1, ox1) - max(ax0, ox0)
+        if oy0 >= ay0 and horizontal_overlap > 0:
+            return "below"
+        return None
+
+
+class SpatialFieldExtractor:
+    """استخراج فیلدها به صورت «نزدیک‌ترین کادر مقدار کنار کادر برچسب»
+
+    هر فیلد در تعریف الگوها می‌تواند کلیدهای زیر را داشته باشد:
+        "anchors": توکن‌های برچسب (به ترتیب اولویت)
+        "value_pattern": الگوی مقدار با یک گروه؛ روی متن کادر کاندید اجرا می‌شود
+    """
+
+    # جریمه فاصله برای کادرهای زیر برچسب نسبت به کادرهای هم‌ردیف
+    BELOW_PENALTY = 1.5
+
+    def __init__(self, patterns: Dict[str, Dict[str, Any]], engine: str = "auto",
+                 timeout: float = PATTERN_TIMEOUT):
+        self.fields = {}
+        for field_name, field_config in patterns.items():
+            anchors = field_config.get("anchors")
+            value_pattern = field_config.get("value_pattern")
+            if anchors and value_pattern:
+                self.fields[field_name] = (anchors, compile_pattern(value_pattern, 0, engine, timeout))
+
+    def extract(self, words: Dict[str, np.ndarray], normalize=None) -> Dict[str, Dict[str, Any]]:
+        """استخراج فیلدهای دارای anchor از هندسه کلمات
+
+        Args:
+            words: خروجی words_from_readtext
+            normalize: تابع اختیاری نرمال‌سازی متن کادرها پیش از تطبیق برچسب و مقدار
+
+        Returns:
+            نام فیلد -> {"value_text", "confidence", "anchor", "box"}؛ فیلدهای
+            یافت نشده در خروجی نیستند
+        """
+        if normalize is not None:
+            words = dict(words, texts=np.array([normalize(str(text)) for text in words["texts"]], dtype=np.str_)
+                         if len(words["texts"]) else words["texts"])
+        index = SpatialIndex(words)
+        results = {}
+
+        for field_name, (anchors, value_regex) in self.fields.items():
+            match = self._resolve_field(index, anchors, value_regex)
+            if match is not None:
+                results[field_name] = match
+
+        return results
+
+    def _resolve_field(self, index: SpatialIndex, anchors: List[str],
+                       value_regex) -> Optional[Dict[str, Any]]:
+        """یافتن بهترین کادر مقدار برای اولین برچسب موجود"""
+        for anchor in anchors:
+            best = None
+            for anchor_index in index.find_token(anchor):
+                # مقدار در همان کادر برچسب (مثل «سفارشس 12345678»)
+                candidates = [(0.0, anchor_index)] + index.neighbours(anchor_index)
+                for distance, other in candidates:
+                    if best is not None and distance >= best[0]:
+                        break
+
+                    if other != anchor_index:
+                        relation = index.relation(anchor_index, other)
+                        if relation is None:
+                            continue
+                        if relation == "below":
+                            distance *= self.BELOW_PENALTY
+                            if best is not None and distance >= best[0]:
+                                continue
+
+                    text = str(index.texts[other])
+                    if other == anchor_index:
+                        # فقط بخش پس از حذف خود برچسب
+                        text = ' '.join(token for token in text.split() if token != anchor)
+                    value_match = value_regex.search(text)
+                    if value_match:
+                        best = (distance, other, anchor_index, value_match)
+
+            if best is not None:
+                distance, other, anchor_index, value_match = best
+                return {
+                    "value_text": value_match.group(1) if value_match.groups() else value_match.group(0),
+                    "confidence": float(index.confidences[other]),
+                    "anchor": anchor,
+                    "box": [float(v) for v in index.boxes[other]]
+                }
+        return None
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+نرمال‌سازی متن OCR - یکسان‌سازی حروف عربی/فارسی و ارقام در یک گذر
+"""
+
+import re
+from bisect import bisect_right
+from typing import List, Tuple
+
+# حروف عربی -> شکل فارسی
+LETTER_MAP = {
+    'ك': 'ک',  # U+0643 -> U+06A9
+    'ي': 'ی',  # U+064A -> U+06CC
+    'ى': 'ی',  # U+0649 -> U+06CC
+}
+
+# ارقام فارسی (۰-۹) و عربی (٠-٩) و جداکننده‌های عددی -> لاتین
+DIGIT_MAP = {
+    **{chr(0x06F0 + digit): str(digit) for digit in range(10)},
+    **{chr(0x0660 + digit): str(digit) for digit in range(10)},
+    '٫': '.',  # جداکننده اعشار
+    '٬': ',',  # جداکننده هزارگان
+}
+
+# کشیده و اعراب (فتحه، کسره، تشدید، ...) حذف می‌شوند
+REMOVED_CHARS = frozenset(['ـ', 'ٰ'] + [chr(code) for code in range(0x064B, 0x0660)])
+
+REMOVED_PATTERN = re.compile('[' + ''.join(sorted(REMOVED_CHARS)) + ']')
+
+DIGIT_TABLE = str.maketrans(DIGIT_MAP)
+TRANSLATION_TABLE = str.maketrans({**LETTER_MAP, **DIGIT_MAP, **dict.fromkeys(REMOVED_CHARS)})
+
+# str.translate برای حروف غیر لاتین هر حرف را در dict جستجو می‌کند (حدود
+# 0.4ms برای یک صفحه)؛ برای متن‌های بلندتر از این طول زنجیره replace روی
+# حروف موجود سریع‌تر است (حدود ده برابر برای یک صفحه)
+TRANSLATE_MAX_LENGTH = 32
+REPLACEMENTS = tuple({**LETTER_MAP, **DIGIT_MAP, **dict.fromkeys(sorted(REMOVED_CHARS), '')}.items())
+
+# جداکننده‌هایی که به حروف دارای معنای خاص در regex نگاشت می‌شوند (٫ -> .)؛
+# در منبع الگوها پیش از نرمال‌سازی escape می‌شوند تا لفظی باقی بمانند
+_PATTERN_SEPARATORS = re.compile(r'(?<!\\)([٫٬])')
+
+# توکن‌های صفحه: همان مرز کلمات استخراج اولیه (حروف و ارقام فارسی/عربی)؛
+# ارقام لاتین و . و , جزو توکن نیستند تا مقادیر الگوها تغییر نکنند
+TOKEN_PATTERN = re.compile(r'[\u0600-\u06FF\u200C\u200D\u06F0-\u06F9\u0660-\u0669]+')
+
+
+def normalize_text(text: str) -> str:
+    """شکل استاندارد متن (بدون نگاشت موقعیت)"""
+    if len(text) <= TRANSLATE_MAX_LENGTH:
+        return text.translate(TRANSLATION_TABLE)
+    for variant, canonical in REPLACEMENTS:
+        if variant in text:
+            text = text.replace(variant, canonical)
+    return text
+
+
+def normalize_pattern(pattern: str) -> str:
+    """شکل استاندارد منبع یک الگوی regex (جداکننده‌های عددی به صورت لفظی)"""
+    return normalize_text(_PATTERN_SEPARATORS.sub(r'\\\1', pattern))
+
+
+def to_latin_digits(text: str) -> str:
+    """فقط تبدیل ارقام فارسی و عربی به لاتین"""
+    return text.translate(DIGIT_TABLE)
+
+
+def tokenize(text: str) -> List[str]:
+    """توکن‌های متن (به همان شکل متن ورودی)"""
+    return TOKEN_PATTERN.findall(text)
+
+
+def normalize_tokens(tokens: List[str]) -> List[str]:
+    """شکل استاندارد توکن‌ها با یک نرمال‌سازی برای همه آن‌ها"""
+    return normalize_text('\n'.join(tokens)).split('\n') if tokens else []
+
+
+class NormalizedText:
+    """متن استاندارد به همراه نگاشت موقعیت‌ها به متن اصلی
+
+    نگاشت حروف یک به یک است و فقط حذف کشیده و اعراب طول متن را تغییر
+    می‌دهد. removed موقعیت (در متن استاندارد) هر حرف حذف شده است، پس
+    موقعیت p متن استاندارد در متن اصلی p + تعداد حذف‌های تا p است. این
+    فهرست هنگام اولین استفاده ساخته می‌شود.
+    """
+
+    __slots__ = ("original", "text", "_removed")
+
+    def __init__(self, original: str):
+        self.original = original
+        self.text = normalize_text(original)
+        self._removed = None
+
+    @property
+    def removed(self) -> List[int]:
+        if self._removed is None:
+            self._removed = [match.start() - index for index, match in
+                             enumerate(REMOVED_PATTERN.finditer(self.original))] \
+                if len(self.text) != len(self.original) else []
+        return self._removed
+
+    def to_original(self, position: int) -> int:
+        """موقعیت متناظر در متن اصلی"""
+        removed = self.removed
+        return position + bisect_right(removed, position) if removed else position
+
+    def original_span(self, start: int, end: int) -> Tuple[int, int]:
+        """بازه متناظر در متن اصلی (حروف حذف شده انتهای بازه جزو آن نیستند)"""
+        if end <= start:
+            position = self.to_original(start)
+            return position, position
+        return self.to_original(start), self.to_original(end - 1) + 1
+
+    def original_slice(self, start: int, end: int) -> str:
+        """متن اصلی متناظر با بازه start تا end متن استاندارد"""
+        start, end = self.original_span(start, end)
+        return self.original[start:end]
@@ -9,6 +9,7 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import threading
 import queue
+import time
 import logging
 import datetime
 import json
@@ -16,8 +17,10 @@ import csv
 from pathlib import Path
 from typing import List, Dict, Any
 
-from core.ocr_engine import OCREngine
 from core.pdf_processor import PDFProcessor
+from core.batch import BatchProcessor
+from core.cancellation import CancellationToken
+from core.ocr_profiles import profile_names
 from utils.logger import get_logger
 from utils.config import ConfigManager
 
@@ -49,8 +52,10 @@ class LogHandler(logging.Handler):
 class CustomsOCRApp:
     """کلاس اصلی رابط گرافیکی - ساده شده"""
 
-    def __init__(self, config: ConfigManager):
+    def __init__(self, config: ConfigManager, start_time: float = None):
         self.config = config
+        self.start_time = start_time or time.perf_counter()
+        self.first_page_logged = False
         self.root = tk.Tk()
 
         # تنظیمات اولیه
@@ -76,6 +81,9 @@ class CustomsOCRApp:
         self.current_results = []
         self.processing_active = False
         self.processing_thread = None
+        self.cancel_token = None
+        # پروفایل OCR قابل انتخاب برای هر اجرا
+        self.ocr_profile = tk.StringVar(value=self.config.get('ocr.profile', 'balanced'))
 
         # تنظیمات ثابت
         self.dpi_var = tk.IntVar(value=600)  # ثابت
@@ -84,8 +92,10 @@ class CustomsOCRApp:
     def setup_components(self):
         """راه‌اندازی کامپوننت‌های ساده"""
         try:
-            self.ocr_engine = OCREngine(self.config)
-            self.pdf_processor = PDFProcessor(self.config)
+            # مدل EasyOCR در پس‌زمینه (یا پردازه کارگر OCR) بارگذاری می‌شود تا پنجره منتظر نماند
+            self.pdf_processor = PDFProcessor(self.config, profile=self.ocr_profile.get())
+            self.pdf_processor.warm_up()
+            self.ocr_engine = self.pdf_processor.ocr_engine
             logger.info("🔍 کامپوننت‌های اصلی آماده")
         except Exception as e:
             logger.error(f"❌ خطا در راه‌اندازی: {e}")
@@ -169,6 +179,10 @@ class CustomsOCRApp:
                                           font=('Tahoma', 11))
         self.files_count_label.pack(side='left')
 
+        tk.Label(stats_frame, text="🎛️ پروفایل OCR:", font=('Tahoma', 11)).pack(side='left', padx=(20, 5))
+        ttk.Combobox(stats_frame, textvariable=self.ocr_profile, values=profile_names(self.config),
+                     state='readonly', width=12).pack(side='left')
+
         self.start_processing_btn = tk.Button(stats_frame,
                                               text="🚀 شروع پردازش",
                                               command=self.start_processing,
@@ -177,6 +191,14 @@ class CustomsOCRApp:
                                               padx=25, pady=10, state='disabled')
         self.start_processing_btn.pack(side='right', padx=10)
 
+        self.stop_processing_btn = tk.Button(stats_frame,
+                                             text="⏹️ توقف",
+                                             command=self.stop_processing,
+                                             font=('Tahoma', 12, 'bold'),
+                                             bg='#c0392b', fg='white',
+                                             padx=25, pady=10, state='disabled')
+        self.stop_processing_btn.pack(side='right', padx=10)
+
     def create_processing_tab(self):
         """تب پردازش - ساده"""
         tab = ttk.Frame(self.notebook)
@@ -277,8 +299,18 @@ class CustomsOCRApp:
             messagebox.showinfo("اطلاع", "پردازش در حال انجام است!")
             return
 
+        # ساخت مجدد پردازشگر در صورت تغییر پروفایل OCR
+        profile = self.ocr_profile.get()
+        if self.pdf_processor.ocr_profile != profile:
+            logger.info(f"🎛️ تغییر پروفایل OCR به {profile}")
+            self.pdf_processor.close()
+            self.pdf_processor = PDFProcessor(self.config, profile=profile)
+            self.ocr_engine = self.pdf_processor.ocr_engine
+
         self.processing_active = True
+        self.cancel_token = CancellationToken.for_processes()
         self.start_processing_btn.config(state='disabled')
+        self.stop_processing_btn.config(state='normal')
         self.current_results.clear()
 
         # شروع thread
@@ -287,11 +319,26 @@ class CustomsOCRApp:
 
         logger.info(f"🚀 شروع پردازش {len(self.selected_files)} فایل")
 
+    def stop_processing(self):
+        """توقف پردازش؛ صفحه در حال OCR متوقف و نتایج تکمیل شده حفظ می‌شوند"""
+        if not self.processing_active:
+            return
+
+        self.processing_active = False
+        if self.cancel_token is not None:
+            self.cancel_token.cancel()
+        self.stop_processing_btn.config(state='disabled')
+        logger.info("⏹️ درخواست توقف پردازش...")
+
     def _process_files_worker(self):
         """پردازش فایل‌ها - ساده"""
         try:
             total_files = len(self.selected_files)
 
+            if self.config.get('processing.parallel_processing', False) and total_files > 1:
+                self._process_files_parallel()
+                return
+
             for i, file_path in enumerate(self.selected_files):
                 if not self.processing_active:
                     break
@@ -306,9 +353,11 @@ class CustomsOCRApp:
                     logger.info(f"📄 پردازش: {Path(file_path).name}")
 
                     # پردازش اصلی
-                    results = self.pdf_processor.process_pdf_pages_individually(file_path)
+                    results = self.pdf_processor.process_pdf_pages_individually(file_path,
+                                                                                cancel_token=self.cancel_token)
 
                     if results:
+                        self._log_first_page()
                         self.current_results.extend(results)
                         logger.info(f"✅ موفق: {len(results)} صفحه")
                     else:
@@ -324,10 +373,52 @@ class CustomsOCRApp:
             logger.error(f"❌ خطای کلی: {e}")
             self.root.after(0, self._finish_processing)
 
+    def _process_files_parallel(self):
+        """پردازش موازی فایل‌ها با BatchProcessor (نتایج به ترتیب اتمام)"""
+        try:
+            total_files = len(self.selected_files)
+            batch = BatchProcessor(self.config, profile=self.ocr_profile.get())
+
+            results_iter = batch.iter_results(self.selected_files,
+                                              should_stop=lambda: not self.processing_active,
+                                              cancel_token=self.cancel_token)
+            for i, batch_result in enumerate(results_iter):
+                file_name = Path(batch_result['pdf_path']).name
+
+                progress = ((i + 1) / total_files) * 100
+                self.root.after(0, lambda p=progress: self.progress_var.set(p))
+                self.root.after(0, lambda n=i + 1, f=file_name: self.progress_label.config(
+                    text=f"پردازش {n}/{total_files}: {f}"))
+
+                results = batch_result['results']
+                if results:
+                    self._log_first_page()
+                    self.current_results.extend(results)
+                    logger.info(f"✅ موفق: {file_name} - {len(results)} صفحه "
+                                f"({batch_result['processing_time']:.1f} ثانیه)")
+                else:
+                    logger.warning(f"❌ ناموفق: {file_name}")
+
+        except Exception as e:
+            logger.error(f"❌ خطای پردازش موازی: {e}")
+
+        self.root.after(0, self._finish_processing)
+
+    def _log_first_page(self):
+        """لاگ زمان رسیدن به اولین صفحه پردازش شده (یک بار)"""
+        if not self.first_page_logged:
+            self.first_page_logged = True
+            logger.info(f"⏱️ زمان تا اولین صفحه: {time.perf_counter() - self.start_time:.1f} ثانیه")
+
+    def _log_first_window(self):
+        """لاگ زمان نمایش اولین پنجره"""
+        logger.info(f"⏱️ زمان تا نمایش پنجره: {time.perf_counter() - self.start_time:.1f} ثانیه")
+
     def _finish_processing(self):
         """اتمام پردازش"""
         self.processing_active = False
         self.start_processing_btn.config(state='normal')
+        self.stop_processing_btn.config(state='disabled')
         self.progress_var.set(100)
         self.progress_label.config(text="✅ پردازش کامل شد!")
 
@@ -465,7 +556,10 @@ class CustomsOCRApp:
     def run(self):
         """اجرای برنامه"""
         logger.info("🎯 شروع برنامه ساده")
+        self.root.after_idle(self._log_first_window)
         self.root.mainloop()
+        if hasattr(self, 'pdf_processor'):
+            self.pdf_processor.close()
         logger.info("👋 برنامه بسته شد")
 
 
@@ -4,19 +4,27 @@
 """
 🚀 سیستم ساده استخراج داده‌های گمرکی
 نسخه ساده شده - حذف پیچیدگی‌ها
+
+اجرا:
+    python src/main.py                                     # رابط گرافیکی
+    python src/main.py re-extract data/pdfs --workers 8    # استخراج مجدد بدون OCR
 """
 
 import sys
+import argparse
 import os
+import time
 import logging
 from pathlib import Path
 
+# زمان شروع برای لاگ زمان نمایش پنجره و اولین صفحه
+START_TIME = time.perf_counter()
+
 # اضافه کردن مسیر src
 current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
 try:
-    from gui.main_window import CustomsOCRApp
     from utils.logger import setup_logger
     from utils.config import ConfigManager
 except ImportError as e:
@@ -42,17 +50,59 @@ def setup_environment():
     logging.info("🚀 سیستم ساده راه‌اندازی شد")
 
 
+def parse_args(argv=None):
+    """آرگومان‌های خط فرمان؛ بدون دستور رابط گرافیکی اجرا می‌شود"""
+    parser = argparse.ArgumentParser(description="سیستم استخراج داده‌های گمرکی")
+    subparsers = parser.add_subparsers(dest="command")
+
+    reextract = subparsers.add_parser(
+        "re-extract", help="استخراج مجدد فیلدها از JSONهای ذخیره شده صفحات (بدون OCR)")
+    reextract.add_argument("inputs", nargs="+", help="فایل‌ها یا پوشه‌های JSON صفحات (*_page_*.json)")
+    reextract.add_argument("--output", help="پوشه خروجی (پیش‌فرض: بازنویسی همان فایل‌ها)")
+    reextract.add_argument("--workers", type=int, help="تعداد پردازه‌ها (پیش‌فرض: processing.reextract.workers)")
+    reextract.add_argument("--chunk-size", type=int, help="صفحات هر کار ارسالی به کارگر")
+    reextract.add_argument("--force", action="store_true",
+                           help="استخراج مجدد صفحاتی که با نسخه فعلی الگوها استخراج شده‌اند")
+    reextract.add_argument("--dry-run", action="store_true", help="فقط گزارش تغییرات بدون نوشتن فایل")
+
+    return parser.parse_args(argv)
+
+
+def run_gui(config):
+    """اجرای رابط گرافیکی"""
+    try:
+        from gui.main_window import CustomsOCRApp
+    except ImportError as e:
+        print(f"خطا در import: {e}")
+        sys.exit(1)
+
+    app = CustomsOCRApp(config, start_time=START_TIME)
+    app.run()
+
+
+def run_reextract(args, config) -> int:
+    """استخراج مجدد فیلدهای گمرکی از JSONهای صفحات با الگوهای فعلی"""
+    from core.reextract import ReExtractor
+
+    extractor = ReExtractor(config, workers=args.workers, chunk_size=args.chunk_size)
+    totals = extractor.run(args.inputs, output_dir=args.output, force=args.force, dry_run=args.dry_run)
+    return 1 if totals["failed"] else 0
+
+
 def main():
     """تابع اصلی ساده"""
+    args = parse_args()
     try:
         setup_environment()
 
         # کانفیگ ساده
         config = ConfigManager()
 
+        if args.command == "re-extract":
+            sys.exit(run_reextract(args, config))
+
         # رابط گرافیکی ساده
-        app = CustomsOCRApp(config)
-        app.run()
+        run_gui(config)
 
     except Exception as e:
         logging.error(f"❌ خطا: {e}")
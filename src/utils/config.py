@@ -34,6 +34,15 @@ class ConfigManager:
                 "language": "fa"
             },
             "ocr": {
+                "backend": "easyocr",  # easyocr / tesseract / stub
+                "cascade": [],  # مثلاً ["tesseract", "easyocr"]: موتور سریع، سپس دقیق
+                "cascade_min_confidence": 0.7,
+                "profile": "balanced",  # fast / balanced / accurate
+                "profiles": {},  # بازنویسی یا تعریف پروفایل: {"fast": {"canvas_size": 1280}}
+                "stub": {
+                    "recordings": "",  # فایل JSON ضبط‌ها برای موتور stub
+                    "record_to": ""  # ضبط خروجی موتور اصلی برای بازپخش
+                },
                 "easyocr": {
                     "languages": ["fa", "en", "ar"],
                     "gpu": True,
@@ -43,7 +52,30 @@ class ConfigManager:
                     "detector": True,
                     "recognizer": True,
                     "allowlist": None,
-                    "blocklist": None
+                    "blocklist": None,
+                    # اجرا روی CPU: fp32 / int8 (کوانتیزه پویا) / onnx (ONNX Runtime)
+                    "cpu": {
+                        "mode": "int8",
+                        "onnx_dir": "",  # خالی = ~/.EasyOCR/onnx
+                        "onnx_quantize": True,  # recognizer با وزن‌های int8
+                        "threads": 0  # 0 = تعداد threadهای torch
+                    }
+                },
+                "cache": {
+                    "enabled": True,
+                    "path": "",  # خالی = paths.temp_dir/ocr_cache.sqlite
+                    "max_size_mb": 500
+                },
+                "batch": {
+                    "pages": 4,  # تعداد صفحات در هر دسته OCR
+                    "recognizer_batch_size": 32  # تعداد خطوط متن در هر دسته recognizer
+                },
+                "layout_cache": {
+                    "enabled": False,  # فقط recognize برای صفحات با چیدمان شناخته شده
+                    "grid": 32,
+                    "max_distance": 0.08,
+                    "max_entries": 8,
+                    "min_confidence": 0.5
                 },
                 "tesseract": {
                     "path": "",  # پر شدن خودکار
@@ -54,14 +86,59 @@ class ConfigManager:
             },
             "processing": {
                 "default_dpi": 350,
+                "min_dpi": 200,
+                "max_dpi": 600,
+                "adaptive_dpi": {
+                    "enabled": False,
+                    "min_confidence": 0.6,
+                    "required_fields": ["کد_کالا", "کد_ثبت_سفارش"]
+                },
+                "prefetch_pages": 2,
+                "pipeline": {
+                    "enabled": True,
+                    "queue_size": 2
+                },
+                "embedded_image_fast_path": True,
+                "min_image_coverage": 0.9,
+                "form_template": "",  # نام یا مسیر قالب کالیبره شده در paths.templates_dir
+                "text_layer": {
+                    "enabled": True,
+                    "min_persian_chars": 200,
+                    "min_anchor_words": 3
+                },
+                "render_colorspace": "rgb",  # rgb / gray / binary
+                "binary_threshold": 160,
+                "extraction_mode": "regex",  # regex / spatial
+                "save_word_geometry": False,  # ذخیره کادر کلمات در .npz کنار JSON صفحه
+                "parallel_processing": False,
                 "max_workers": 2,
-                "timeout": 600,
+                # استخراج مجدد از JSONهای ذخیره شده (main.py re-extract)
+                "reextract": {
+                    "workers": 0,  # 0 = تعداد هسته‌های CPU
+                    "chunk_size": 64  # صفحات هر کار ارسالی به کارگر
+                },
+                # بازشناسی کادرهای کم‌اعتماد از کلیپ PDF با DPI بالاتر
+                "refinement": {
+                    "enabled": False,
+                    "min_confidence": 0.5,
+                    "dpi_scale": 2,
+                    "padding": 2,  # حاشیه کلیپ (point)
+                    "max_regions": 50
+                },
+                "timeout": 600,  # مهلت OCR هر صفحه (ثانیه، 0 = بدون مهلت)
+                "isolate_ocr": False,  # OCR در پردازه جداگانه تا فراخوانی در حال اجرای مدل هم kill شود (کپی تصویر صفحه)
                 "save_temp_files": False,
                 "temp_dir": str(self.project_root / "data" / "temp"),
                 "supported_formats": [".pdf", ".png", ".jpg", ".jpeg", ".tiff", ".bmp"],
                 "image_preprocessing": {
+                    "enabled": False,
+                    "downscale_max_side": 0,  # 0 = بدون کوچک‌سازی
+                    "crop_borders": True,
+                    "crop_margin": 10,
                     "denoise": True,
                     "enhance_contrast": True,
+                    "clahe_clip_limit": 3.0,
+                    "clahe_tile_grid": [8, 8],
                     "sharpen": False,
                     "threshold": True
                 }
@@ -80,7 +157,9 @@ class ConfigManager:
             },
             "patterns": {
                 "import_patterns_file": "patterns/import_patterns.json",
-                "export_patterns_file": "patterns/export_patterns.json",
+                "engine": "auto",  # auto / re2 / regex / re
+                "timeout": 0.1,  # مهلت هر اجرای الگو در موتور regex (ثانیه)
+                "hot_reload": True,  # بارگذاری مجدد فایل الگوها پس از تغییر آن در حین اجرا
                 "confidence_threshold": 0.3,
                 "voting_enabled": True,
                 "pattern_weights": {
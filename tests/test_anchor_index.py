@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+تست‌های نمایه لنگرها: رشته‌های ثابت الگو، Aho-Corasick و برابری جستجوی
+بازه‌ای با جستجوی کل متن
+"""
+
+import json
+import logging
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from core.anchor_index import AhoCorasick, AnchorIndexedExtractor, choose_anchor, literal_bounds
+from core.pattern_extractor import CustomsPatternExtractor
+
+DATA_DIR = ROOT / "data"
+PAGES = sorted(json.loads((Path(__file__).parent / "fixtures" / "baseline_fields.json")
+                          .read_text(encoding="utf-8"))["pages"])
+
+
+def full_text_extractor(patterns) -> AnchorIndexedExtractor:
+    """همان الگوها بدون لنگر، یعنی جستجوی کل متن برای هر الگو"""
+    extractor = AnchorIndexedExtractor(patterns)
+    extractor.fields = {field_name: [(pattern, regex, None, None, None)
+                                     for pattern, regex, _, _, _ in compiled]
+                        for field_name, compiled in extractor.fields.items()}
+    return extractor
+
+
+def page_text(path: Path) -> str:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    for section in (data, data.get("text_extraction"), data.get("structured_data")):
+        if isinstance(section, dict) and isinstance(section.get("raw_text"), str) and section["raw_text"]:
+            return section["raw_text"]
+    return ""
+
+
+@pytest.fixture(scope="module")
+def patterns():
+    logging.disable(logging.CRITICAL)
+    yield CustomsPatternExtractor().patterns
+    logging.disable(logging.NOTSET)
+
+
+def test_literal_bounds_measure_match_width():
+    """رشته ثابت، حداکثر طول پیش و پس از آن (None برای .*?)؛ " جداکننده است"""
+    assert literal_bounds(r'ك٧٧.*?"(\d{8})"', re.IGNORECASE) == [("ك٧٧", 0, None)]
+    assert literal_bounds(r'"(\d+)"\s*"٣٨"', re.IGNORECASE) == [("٣٨", None, 1)]
+    assert literal_bounds(r'"(\d{8})" "٠٣٢"', re.IGNORECASE) == [("٠٣٢", 12, 1)]
+    # حروف داخل تکرار یا انشعاب الزامی نیستند
+    assert literal_bounds(r'(?:الف|ب)\d+') == []
+    assert literal_bounds(r'(کد)+\d') == []
+
+
+def test_choose_anchor_prefers_bounded_literal():
+    """رشته با دو طرف محدود، سپس یک طرف محدود، سپس طولانی‌ترین"""
+    assert choose_anchor([("واحد", 0, None), ("کالا", None, None)]) == ("واحد", 0, None)
+    assert choose_anchor([("ارزش", 0, None), ("قلم", 5, 3)]) == ("قلم", 5, 3)
+    assert choose_anchor([("کد", None, None), ("کالا", None, None)]) == ("کالا", None, None)
+    assert choose_anchor([]) == (None, None, None)
+
+
+def test_automaton_finds_overlapping_anchors():
+    """همه لنگرهای هم‌پوشان یک توکن در یک گذر یافت می‌شوند"""
+    automaton = AhoCorasick(["کالا", "کا", "الا"])
+
+    assert automaton.find_in_tokens(["کالاها", "x", "کا"]) == {"کا": [0, 2], "کالا": [0], "الا": [0]}
+
+
+def test_regions_match_full_search_on_synthetic_page():
+    """تطابق‌هایی که پیش از لنگر شروع می‌شوند و لنگرهای تکراری
+
+    الگوها به شکل نرمال (مانند بسته الگو) و متن با ارقام عربی است.
+    """
+    patterns = {
+        "وزن": {"patterns": [r'"(\d+)"\s*"38"']},
+        "کد": {"patterns": [r'ک77.*?"(\d{8})"']},
+        "بدون_لنگر": {"patterns": [r'"(\d{4})"']},
+    }
+    text = "سطر ١٢٣٤٥ ٣٨ " + "پر " * 50 + "ك٧٧ الف ٨٤٧١٣٠١٠ ٣٨ ك٧٧ ٩٩٩٩٩٩٩٩"
+    indexed = AnchorIndexedExtractor(patterns)
+    full = full_text_extractor(patterns)
+
+    page = indexed.index_text(text)
+    for field_name in patterns:
+        assert indexed.extract(page, field_name) == full.extract(page, field_name)
+
+    value, _, _, span = indexed.extract(page, "کد")
+    assert value == "84713010"
+    # مقدار خام با ارقام اصلی متن
+    assert page.original(*span) == "٨٤٧١٣٠١٠"
+
+
+@pytest.mark.parametrize("page_name", PAGES)
+def test_regions_match_full_search_on_data_pages(patterns, page_name):
+    """روی صفحات data/ هر فیلد با جستجوی بازه‌ای و کل متن یکسان است"""
+    indexed = AnchorIndexedExtractor(patterns)
+    full = full_text_extractor(patterns)
+    page = indexed.index_text(page_text(DATA_DIR / page_name))
+
+    found = 0
+    for field_name in patterns:
+        result = indexed.extract(page, field_name)
+        assert result == full.extract(page, field_name), field_name
+        found += result[0] is not None
+    assert found
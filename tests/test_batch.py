@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+تست‌های پردازش دسته‌ای چندپردازه‌ای با موتور stub
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import fitz
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from core.batch import BatchProcessor, ConfigSnapshot, THREAD_ENV_VARS, thread_env
+
+
+def make_pdf(path: Path, pages: int) -> Path:
+    doc = fitz.open()
+    for page_num in range(pages):
+        doc.new_page(width=200, height=200).draw_rect(fitz.Rect(20, 20, 60 + page_num * 10, 60))
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def make_config(tmp_path: Path) -> ConfigSnapshot:
+    recordings = tmp_path / "stub.json"
+    box = [[10, 10], [50, 10], [50, 30], [10, 30]]
+    recordings.write_text(json.dumps({"version": 1, "by_key": {"page": [[box, "اظهارنامه", 0.9]]},
+                                      "sequence": ["page"]}, ensure_ascii=False), encoding="utf-8")
+    return ConfigSnapshot({
+        "ocr": {"backend": "stub", "stub": {"recordings": str(recordings)}, "cache": {"enabled": False}},
+        "processing": {"default_dpi": 72, "min_dpi": 72, "max_dpi": 72, "isolate_ocr": False,
+                       "text_layer": {"enabled": False}}
+    })
+
+
+def test_config_snapshot_get():
+    """مسیرهای نقطه‌دار مانند ConfigManager خوانده می‌شوند"""
+    snapshot = ConfigSnapshot({"processing": {"pipeline": {"enabled": False}}})
+
+    assert snapshot.get("processing.pipeline.enabled") is False
+    assert snapshot.get("processing.missing", 5) == 5
+    assert snapshot.get("processing.pipeline.enabled.x", "d") == "d"
+    assert ConfigSnapshot.from_config(snapshot) is snapshot
+
+
+def test_thread_env_restores_environment(monkeypatch):
+    """متغیرهای thread فقط داخل بلوک تنظیم و سپس بازگردانده می‌شوند"""
+    monkeypatch.setenv("OMP_NUM_THREADS", "7")
+    monkeypatch.delenv("MKL_NUM_THREADS", raising=False)
+
+    with thread_env(2):
+        assert all(os.environ[var] == "2" for var in THREAD_ENV_VARS)
+
+    assert os.environ["OMP_NUM_THREADS"] == "7"
+    assert "MKL_NUM_THREADS" not in os.environ
+
+
+def read_process_environ(pid: int) -> dict:
+    """محیط اولیه پردازه (همان محیطی که numpy هنگام import می‌بیند)"""
+    raw = Path(f"/proc/{pid}/environ").read_bytes()
+    return dict(item.split("=", 1) for item in raw.decode(errors="replace").split("\0") if "=" in item)
+
+
+def test_batch_workers_process_files(tmp_path):
+    """هر فایل در یک کارگر spawn شده با snapshot تنظیمات پردازش می‌شود"""
+    pdfs = [make_pdf(tmp_path / f"doc{index}.pdf", index + 1) for index in range(3)]
+    processor = BatchProcessor(make_config(tmp_path), max_workers=2, torch_threads=3)
+
+    parent_env = {var: os.environ.get(var) for var in THREAD_ENV_VARS}
+    worker_env = {}
+    results = []
+    for result in processor.iter_results(pdfs, tmp_path / "out"):
+        results.append(result)
+        if Path("/proc").is_dir():
+            worker_env[result["worker_pid"]] = read_process_environ(result["worker_pid"])
+
+    assert sorted(Path(result["pdf_path"]).name for result in results) == ["doc0.pdf", "doc1.pdf", "doc2.pdf"]
+    assert all(result["error"] is None for result in results)
+    assert {Path(result["pdf_path"]).name: len(result["results"]) for result in results} == {
+        "doc0.pdf": 1, "doc1.pdf": 2, "doc2.pdf": 3}
+    assert len(list((tmp_path / "out").glob("*_page_*.json"))) == 6
+    # BLAS/OpenMP پیش از import numpy در کارگر محدود شده است
+    for env in worker_env.values():
+        assert all(env.get(var) == "3" for var in THREAD_ENV_VARS)
+    assert {var: os.environ.get(var) for var in THREAD_ENV_VARS} == parent_env
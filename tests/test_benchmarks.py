@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+اجرای کوتاه بنچمارک‌ها روی ورودی کوچک تا مسیرهای آن‌ها از کار نیفتند
+"""
+
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import bench_batch_scaling
+import bench_cpu_inference
+import bench_render_memory
+
+
+@pytest.fixture(scope="module")
+def synthetic_pdf(tmp_path_factory):
+    path = tmp_path_factory.mktemp("bench") / "synthetic.pdf"
+    bench_render_memory.make_synthetic_pdf(path, 2)
+    return str(path)
+
+
+@pytest.mark.parametrize("mode", bench_render_memory.MODES)
+def test_render_memory_modes(synthetic_pdf, mode):
+    """هر حالت بنچمارک حافظه رندر بدون خطا اجرا می‌شود"""
+    result = bench_render_memory.run_mode(synthetic_pdf, mode, 72)
+
+    assert result["mode"] == mode
+    assert result["checksum"] > 0
+
+
+def test_render_memory_rgb_matches_old_path(synthetic_pdf):
+    """مسیر جدید rgb همان پیکسل‌های مسیر قدیم PIL را تولید می‌کند"""
+    old = bench_render_memory.run_mode(synthetic_pdf, "old", 72)
+    new = bench_render_memory.run_mode(synthetic_pdf, "rgb", 72)
+
+    assert new["checksum"] == old["checksum"]
+
+
+def test_batch_scaling_run(tmp_path, synthetic_pdf):
+    """بنچمارک مقیاس‌پذیری با موتور stub همه صفحات را پردازش می‌کند"""
+    from core.batch import ConfigSnapshot
+
+    recordings = tmp_path / "stub.json"
+    bench_batch_scaling.write_stub_recordings(recordings)
+    config = ConfigSnapshot({
+        "ocr": {"backend": "stub", "stub": {"recordings": str(recordings)}, "cache": {"enabled": False}},
+        "processing": {"default_dpi": 72, "min_dpi": 72, "max_dpi": 72, "text_layer": {"enabled": False}}
+    })
+
+    result = bench_batch_scaling.run([synthetic_pdf], config, 1, tmp_path / "out")
+
+    assert result["pages"] == 2
+    assert result["errors"] == 0
+
+
+def test_cpu_inference_reference_is_stock_reader(monkeypatch, capsys):
+    """مرجع بنچمارک CPU، Reader پیش‌فرض EasyOCR با quantize=True است"""
+    import core.ocr_backends as ocr_backends
+
+    readers = []
+
+    class FakeReader:
+        def __init__(self, languages, gpu=True, quantize=True, recog_network="standard"):
+            readers.append(quantize)
+
+        def readtext(self, image, **params):
+            return [([[0, 0], [1, 0], [1, 1], [0, 1]], "اظهارنامه", 0.9)]
+
+    monkeypatch.setitem(sys.modules, "easyocr", types.SimpleNamespace(Reader=FakeReader))
+    monkeypatch.setattr(ocr_backends, "_shared_readers", {})
+    monkeypatch.setattr(bench_cpu_inference, "find_pdfs", lambda paths: [])
+    monkeypatch.setattr(sys, "argv", ["bench_cpu_inference.py", "--dpi", "36", "--max-pages", "1",
+                                      "--modes", "fp32", "int8"])
+
+    bench_cpu_inference.main()
+
+    rows = [line.split()[0] for line in capsys.readouterr().out.splitlines()[-3:]]
+    assert rows == ["stock", "fp32", "int8"]
+    assert readers == [True, False, True]
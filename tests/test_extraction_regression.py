@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+تست رگرسیون استخراج فیلدها روی صفحات data/ نسبت به خروجی پیش از نرمال‌سازی
+
+fixtures/baseline_fields.json با استخراج قبلی (توکن‌های فارسی، جستجوی کامل
+متن، بدون نرمال‌سازی) ساخته شده است. مقادیر فعلی باید با شکل استاندارد همان
+مقادیر (ارقام لاتین، ک و ی فارسی) برابر باشند.
+"""
+
+import json
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from core.pattern_extractor import CustomsPatternExtractor
+from core.text_normalizer import normalize_text
+
+DATA_DIR = ROOT / "data"
+BASELINE = json.loads((Path(__file__).parent / "fixtures" / "baseline_fields.json").read_text(encoding="utf-8"))
+
+# تغییرات عمدی: الگوی قبلی واژه را با حرف دیگری از ک نوشته بود و با متن صفحه
+# مطابقت نمی‌کرد؛ پس از یکسان‌سازی حروف مقدار درست صفحه پیدا می‌شود
+EXPECTED_CHANGES = {
+    # "نوع", "بسته", "نكله" - قبلاً نكله (ك عربی) رد و "سایر" از ادامه صفحه برداشته می‌شد
+    ("1403.05.11_page_01.json", "نوع_بسته"): "نکله",
+    ("pdfs/import/extracted_pages/1403.05.11_page_01.json", "نوع_بسته"): "نکله",
+    # الگوی "قلم", "كالا" با ك عربی روی متن با ک فارسی پیدا نمی‌شد
+    ("1403.7.24_page_01.json", "ارزش_گمرکی_قلم_کالا"): 6127279470.0,
+    ("pdfs/import/extracted_pages/1403.7.24_page_01.json", "ارزش_گمرکی_قلم_کالا"): 6127279470.0,
+}
+
+
+def page_text(path: Path):
+    """متن خام ذخیره شده در JSON صفحه"""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    for section in (data, data.get("text_extraction"), data.get("structured_data")):
+        if isinstance(section, dict) and isinstance(section.get("raw_text"), str) and section["raw_text"]:
+            return section["raw_text"]
+    return None
+
+
+def canonical(value):
+    return normalize_text(value) if isinstance(value, str) else value
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    logging.disable(logging.CRITICAL)
+    yield CustomsPatternExtractor()
+    logging.disable(logging.NOTSET)
+
+
+@pytest.mark.parametrize("page", sorted(BASELINE["pages"]))
+def test_fields_match_baseline(extractor, page):
+    """مقادیر فیلدها جز یکسان‌سازی ارقام و حروف تغییر نمی‌کنند"""
+    text = page_text(DATA_DIR / page)
+    assert text, f"متن صفحه {page} یافت نشد"
+
+    fields = extractor.create_structured_json(text, 1)["customs_fields"]
+    expected = {field: EXPECTED_CHANGES.get((page, field), canonical(value))
+                for field, value in BASELINE["pages"][page].items()}
+    assert {field: result["value"] for field, result in fields.items()} == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("١٢٬٥٠٠", 12500.0),
+    ("١٢٫٥", 12.5),
+    ("12,5", 12.5),
+    ("۶۱۲۷۲۷۹۴۷۰", 6127279470.0),
+])
+def test_float_thousands_separator(extractor, value, expected):
+    """جداکننده هزارگان عربی (٬) حذف می‌شود و ممیز عربی (٫) و ویرگول لاتین
+    مانند کد اصلی ممیز اعشار خوانده می‌شوند"""
+    assert extractor._convert_value(value, {"type": "float"}) == expected
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+تست‌های قالب فرم و استخراج مقادیر از متن کادرهای فیلد
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from core.batch import ConfigSnapshot
+from core.form_template import FormTemplate
+from core.pattern_extractor import CustomsPatternExtractor
+
+TEMPLATES_DIR = ROOT / "templates"
+
+
+def test_uncalibrated_template_is_not_used():
+    """قالب ارسالی کادرهای تقریبی دارد و تا کالیبره شدن بارگذاری نمی‌شود"""
+    assert FormTemplate.resolve("import_declaration", str(TEMPLATES_DIR)) is None
+
+
+def test_calibrated_template_resolves(tmp_path):
+    """قالب کالیبره شده با نام از templates_dir بارگذاری می‌شود"""
+    data = json.loads((TEMPLATES_DIR / "import_declaration.json").read_text(encoding="utf-8"))
+    data["calibrated"] = True
+    (tmp_path / "calibrated.json").write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+    template = FormTemplate.resolve("calibrated", str(tmp_path))
+
+    assert template is not None
+    assert template.field_names() == list(data["fields"])
+
+
+def test_field_rects_apply_scale_and_shift():
+    """کادرها ابتدا مقیاس و سپس با جابجایی لنگر منتقل می‌شوند"""
+    template = FormTemplate({"anchor": {"text": "اظهارنامه", "rect": [100, 10, 150, 20], "max_shift": 5},
+                             "fields": {"کد_کالا": {"rect": [10, 20, 30, 40]}}})
+
+    assert template.calibrate((103, 8, 153, 18)) == (3, -2)
+    assert template.calibrate((120, 10, 170, 20)) == (0.0, 0.0)
+    assert template.field_rects(3, -2, (2.0, 1.0)) == {"کد_کالا": (23.0, 18.0, 63.0, 38.0)}
+
+
+def test_field_value_patterns_use_safe_engine():
+    """الگوی مقدار قالب با موتور امن و مهلت اجرا می‌شود و متن‌های ارقام فارسی را می‌خواند"""
+    extractor = CustomsPatternExtractor(ConfigSnapshot({"patterns": {"engine": "auto", "timeout": 0.05}}))
+    field_texts = {
+        "کد_کالا": {"text": "کد ۸۴۷۱۳۰۱۰", "confidence": 0.9, "value_pattern": r"(\d{8})"},
+        "شرح_کالا": {"text": "a" * 40 + "!", "confidence": 0.9, "value_pattern": r"((a+)+)$"},
+    }
+
+    start = time.perf_counter()
+    fields = extractor.create_structured_json_from_fields(field_texts, 1)["customs_fields"]
+
+    assert time.perf_counter() - start < 2
+    assert fields["کد_کالا"]["raw_value"] == "84713010"
+    assert fields["کد_کالا"]["matched_pattern"] == r"form_template:(\d{8})"
+    assert fields["شرح_کالا"]["value"] is None
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+تست‌های کش چیدمان صفحه (اثر انگشت و کادرهای نسبی)
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from core.layout_cache import LayoutCache
+
+
+def make_form(height: int, width: int, layout: int, noise_seed: int = None) -> np.ndarray:
+    """فرم خاکستری با کادرهای تیره و روشن (شبکه 16×16) بر اساس شماره چیدمان"""
+    blocks = np.random.default_rng(layout).random((16, 16)) < 0.5
+    rows = np.arange(height) * 16 // height
+    cols = np.arange(width) * 16 // width
+    page = np.where(blocks[rows][:, cols], 30, 240).astype(np.uint8)
+    if noise_seed is not None:
+        rng = np.random.default_rng(noise_seed)
+        page = np.clip(page.astype(np.int16) + rng.integers(-20, 20, page.shape), 0, 255).astype(np.uint8)
+    return page
+
+
+LAYOUT = 1
+OTHER = 2
+
+
+def test_fingerprint_hit_with_noise_and_other_dpi():
+    """همان چیدمان با نویز اسکن یا DPI دیگر پیدا و کادرها به مقیاس تصویر برگردانده می‌شوند"""
+    cache = LayoutCache()
+    cache.store(make_form(400, 300, LAYOUT), [[30, 270, 40, 50]], [[[10, 20], [30, 20], [30, 30], [10, 30]]])
+
+    match = cache.lookup(make_form(400, 300, LAYOUT, noise_seed=1))
+    assert match is not None and match[1] == [[30, 270, 40, 50]]
+
+    _, horizontal, free = cache.lookup(make_form(800, 600, LAYOUT))
+    assert horizontal == [[60, 540, 80, 100]]
+    assert free == [[[20, 40], [60, 40], [60, 60], [20, 60]]]
+    assert cache.stats()["hits"] == 2
+
+
+def test_fingerprint_miss_for_other_layout_or_aspect():
+    """چیدمان یا نسبت ابعاد متفاوت منطبق نمی‌شود"""
+    cache = LayoutCache()
+    cache.store(make_form(400, 300, LAYOUT), [[30, 270, 40, 50]], [])
+
+    assert cache.lookup(make_form(400, 300, OTHER)) is None
+    assert cache.lookup(make_form(400, 400, LAYOUT)) is None
+    assert cache.stats()["misses"] == 2
+
+
+def test_invalidate_and_eviction():
+    """چیدمان نامعتبر حذف می‌شود و با پر شدن کش کم‌استفاده‌ترین چیدمان کنار می‌رود"""
+    cache = LayoutCache(max_entries=2)
+    cache.store(make_form(400, 300, LAYOUT), [[1, 2, 3, 4]], [])
+    cache.store(make_form(400, 300, OTHER), [[5, 6, 7, 8]], [])
+    entry, _, _ = cache.lookup(make_form(400, 300, LAYOUT))
+
+    cache.store(make_form(400, 300, 3), [[9, 10, 11, 12]], [])
+    assert cache.lookup(make_form(400, 300, OTHER)) is None
+    assert cache.lookup(make_form(400, 300, LAYOUT)) is not None
+
+    cache.invalidate(entry)
+    assert cache.lookup(make_form(400, 300, LAYOUT)) is None
+    assert cache.stats()["fallbacks"] == 1
+
+
+def test_acceptable_results():
+    """نتیجه خالی یا با میانگین اعتماد کمتر از آستانه قابل قبول نیست"""
+    cache = LayoutCache(min_confidence=0.5)
+    assert not cache.is_acceptable([])
+    assert not cache.is_acceptable([(None, "a", 0.2), (None, "b", 0.6)])
+    assert cache.is_acceptable([(None, "a", 0.4), (None, "b", 0.7)])
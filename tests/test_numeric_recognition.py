@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+تست‌های بازشناسی عددی ناحیه فیلدها (allowlist ارقام و decoder حریصانه)
+"""
+
+import sys
+import types
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import core.ocr_backends as ocr_backends
+from core.batch import ConfigSnapshot
+from core.ocr_backends import EasyOCRBackend, OCRBackend, TesseractBackend
+from core.ocr_engine import OCREngine
+from core.ocr_profiles import NUMERIC_ALLOWLIST, RECOGNITION_MODES
+from core.pattern_extractor import CustomsPatternExtractor
+
+
+class OverrideBackend(OCRBackend):
+    """موتور جعلی که بازنویسی‌های readtext را نگه می‌دارد"""
+
+    name = "overrides"
+
+    def __init__(self):
+        self.calls = []
+
+    def readtext(self, image, **overrides):
+        self.calls.append(overrides)
+        text = "۸۴۷۱۳۰۱۰" if overrides.get("allowlist") else "B4713O10"
+        return [([[0, 0], [10, 0], [10, 10], [0, 10]], text, 0.9)]
+
+
+def make_engine() -> tuple:
+    engine = OCREngine(ConfigSnapshot({"ocr": {"backend": "stub", "cache": {"enabled": False}}}))
+    backend = OverrideBackend()
+    engine.backends = [backend]
+    engine.backend = backend
+    return engine, backend
+
+
+def test_numeric_field_uses_digit_allowlist():
+    """ناحیه عددی با allowlist ارقام و decoder حریصانه بازشناسی می‌شود"""
+    engine, backend = make_engine()
+    field = np.full((10, 40, 3), 255, dtype=np.uint8)
+
+    result = engine.extract_field(field, "numeric")
+
+    assert backend.calls == [RECOGNITION_MODES["numeric"]]
+    assert backend.calls[0]["decoder"] == "greedy"
+    assert result["text"] == "۸۴۷۱۳۰۱۰"
+    assert result["recognition"] == "numeric"
+
+
+def test_text_field_uses_profile_params():
+    """حالت text (یا ناشناخته) همان extract_text بدون بازنویسی است"""
+    engine, backend = make_engine()
+    field = np.full((10, 40, 3), 255, dtype=np.uint8)
+
+    assert engine.extract_field(field, "text")["text"] == "B4713O10"
+    assert engine.extract_field(field, "handwriting")["text"] == "B4713O10"
+    assert backend.calls == [{}, {}]
+
+
+def test_allowlist_covers_all_digit_forms():
+    """allowlist ارقام لاتین، فارسی و عربی-هندی و جداکننده‌ها را دارد"""
+    for char in "09۰۹٠٩.,/٫٬":
+        assert char in NUMERIC_ALLOWLIST
+    assert "O" not in NUMERIC_ALLOWLIST and "ا" not in NUMERIC_ALLOWLIST
+
+
+def test_pattern_fields_declare_recognition():
+    """فیلدهای کد و مبلغ numeric و فیلدهای متنی text هستند"""
+    extractor = CustomsPatternExtractor()
+
+    assert extractor.recognition_mode("کد_کالا") == "numeric"
+    assert extractor.recognition_mode("مبلغ_کل_فاکتور") == "numeric"
+    assert extractor.recognition_mode("شرح_کالا") == "text"
+    assert extractor.recognition_mode("فیلد_ناموجود") == "text"
+
+
+def test_easyocr_receives_overrides(monkeypatch):
+    """بازنویسی‌ها روی پارامترهای پروفایل اعمال و مقادیر None حذف می‌شوند"""
+    calls = []
+
+    class Reader:
+        def __init__(self, languages, gpu=False, quantize=True, recog_network="standard"):
+            pass
+
+        def readtext(self, image, **params):
+            calls.append(params)
+            return []
+
+    monkeypatch.setitem(sys.modules, "easyocr", types.SimpleNamespace(Reader=Reader))
+    monkeypatch.setattr(ocr_backends, "_shared_readers", {})
+    backend = EasyOCRBackend(["fa", "en"], gpu=False, params={"decoder": "beamsearch", "beamWidth": 10})
+
+    backend.readtext(np.zeros((4, 4, 3), dtype=np.uint8), **RECOGNITION_MODES["numeric"])
+
+    assert calls == [{"decoder": "greedy", "beamWidth": 10, "allowlist": NUMERIC_ALLOWLIST}]
+
+
+def test_tesseract_maps_allowlist_to_whitelist(monkeypatch):
+    """در Tesseract allowlist به tessedit_char_whitelist تبدیل می‌شود"""
+    monkeypatch.setitem(sys.modules, "pytesseract", None)
+    configs = []
+    backend = TesseractBackend(command="tesseract", config="--psm 7")
+    monkeypatch.setattr(backend, "_run_tesseract", lambda image, config: configs.append(config) or "")
+
+    backend.readtext(np.zeros((4, 4), dtype=np.uint8))
+    backend.readtext(np.zeros((4, 4), dtype=np.uint8), allowlist="0123456789")
+
+    assert configs == ["--psm 7", "--psm 7 -c tessedit_char_whitelist=0123456789"]
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+تست‌های موتورهای OCR بدون مدل واقعی (easyocr جعلی، TSV نمونه و stub)
+"""
+
+import sys
+import threading
+import types
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import core.ocr_backends as ocr_backends
+from core.batch import ConfigSnapshot
+from core.ocr_backends import EasyOCRBackend
+
+
+class FakeReader:
+    """Reader جعلی EasyOCR که ساخته شدن‌ها را می‌شمارد"""
+
+    instances = []
+    release = None
+
+    def __init__(self, languages, gpu=False, quantize=True, recog_network="standard"):
+        if FakeReader.release is not None:
+            FakeReader.release.wait(5)
+        self.languages = languages
+        self.quantize = quantize
+        FakeReader.instances.append(self)
+
+    def readtext(self, image, **params):
+        return [([[0, 0], [1, 0], [1, 1], [0, 1]], "متن", 0.9)]
+
+
+@pytest.fixture
+def fake_easyocr(monkeypatch):
+    FakeReader.instances = []
+    FakeReader.release = None
+    monkeypatch.setitem(sys.modules, "easyocr", types.SimpleNamespace(Reader=FakeReader))
+    monkeypatch.setattr(ocr_backends, "_shared_readers", {})
+    return FakeReader
+
+
+def test_backends_share_one_reader(fake_easyocr):
+    """موتورهای با زبان و تنظیمات یکسان یک Reader مشترک دارند"""
+    first = EasyOCRBackend(["fa", "en"], gpu=False)
+    second = EasyOCRBackend(["fa", "en"], gpu=False, params={"decoder": "greedy"})
+    other = EasyOCRBackend(["en"], gpu=False)
+
+    assert first.reader is second.reader
+    assert other.reader is not first.reader
+    assert len(fake_easyocr.instances) == 2
+    assert first.reader.quantize is True  # CPU پیش‌فرض int8
+
+
+def test_warm_up_loads_in_background(fake_easyocr):
+    """warm_up بدون انتظار برمی‌گردد و reader تا پایان بارگذاری منتظر می‌ماند"""
+    fake_easyocr.release = threading.Event()
+    backend = EasyOCRBackend(["fa"], gpu=False)
+
+    backend.warm_up()
+    assert not fake_easyocr.instances
+
+    fake_easyocr.release.set()
+    assert backend.readtext(np.zeros((4, 4), dtype=np.uint8))[0][1] == "متن"
+    assert len(fake_easyocr.instances) == 1
+
+
+def test_failed_load_is_retried(fake_easyocr, monkeypatch):
+    """خطای بارگذاری ذخیره نمی‌شود و فراخوانی بعدی دوباره تلاش می‌کند"""
+    def broken_reader(*args, **kwargs):
+        raise OSError("مدل دانلود نشد")
+
+    monkeypatch.setitem(sys.modules, "easyocr", types.SimpleNamespace(Reader=broken_reader))
+    backend = EasyOCRBackend(["fa"], gpu=False)
+    with pytest.raises(RuntimeError):
+        backend.reader
+
+    monkeypatch.setitem(sys.modules, "easyocr", types.SimpleNamespace(Reader=FakeReader))
+    assert isinstance(backend.reader, FakeReader)
+
+
+TSV = "\n".join([
+    "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext",
+    "1\t1\t0\t0\t0\t0\t0\t0\t600\t800\t-1\t",
+    "5\t1\t1\t1\t1\t1\t10\t20\t50\t12\t91.5\tاظهارنامه",
+    "5\t1\t1\t1\t1\t2\t70\t20\t30\t12\t-1\t ",
+    "5\t1\t1\t1\t1\t3\t110\t22\t40\t10\t40\t34384317",
+])
+
+
+def test_tesseract_tsv_parsing():
+    """کلمات TSV سطح 5 با کادر چهار نقطه‌ای و اعتماد 0 تا 1 خوانده می‌شوند"""
+    results = ocr_backends.TesseractBackend._parse_tsv(TSV)
+
+    assert results == [
+        ([[10, 20], [60, 20], [60, 32], [10, 32]], "اظهارنامه", 0.915),
+        ([[110, 22], [150, 22], [150, 32], [110, 32]], "34384317", 0.4),
+    ]
+
+
+def test_stub_replays_by_key_then_sequence(tmp_path):
+    """ضبط تصویر شناخته شده بر اساس محتوا و بقیه به ترتیب ضبط بازپخش می‌شوند"""
+    first = np.zeros((4, 4), dtype=np.uint8)
+    second = np.ones((4, 4), dtype=np.uint8)
+    recorder = ocr_backends.StubBackend()
+    recorder.record(first, [([[0, 0], [1, 0], [1, 1], [0, 1]], "اول", np.float64(0.9))])
+    recorder.record(second, [([[0, 0], [1, 0], [1, 1], [0, 1]], "دوم", 0.8)])
+    recorder.save(str(tmp_path / "stub.json"))
+
+    backend = ocr_backends.create_backend(
+        "stub", ConfigSnapshot({"ocr": {"stub": {"recordings": str(tmp_path / "stub.json")}}}))
+
+    assert backend.readtext(second.copy())[0][1] == "دوم"
+    unknown = np.full((5, 5), 7, dtype=np.uint8)
+    assert [backend.readtext(unknown)[0][1] for _ in range(3)] == ["اول", "دوم", "اول"]
+    assert ocr_backends.StubBackend().readtext(unknown) == []
+    assert ocr_backends.create_backend("unknown") is None
+
+
+def test_cpu_mode_selects_quantization(fake_easyocr):
+    """int8 (پیش‌فرض و مقدار نامعتبر) با quantize و fp32/onnx بدون آن ساخته می‌شوند"""
+    from core.cpu_inference import resolve_cpu_mode
+
+    assert resolve_cpu_mode(None) == "int8"
+    assert resolve_cpu_mode("fp16") == "int8"
+    assert resolve_cpu_mode("onnx") == "onnx"
+
+    quantized = [EasyOCRBackend(["fa"], gpu=False, cpu_options={"mode": mode}).reader.quantize
+                 for mode in ("int8", "fp32", "onnx", "bogus")]
+    assert quantized == [True, False, False, True]
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+تست‌های کش پایدار OCR (sqlite)
+"""
+
+import itertools
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import core.ocr_cache as ocr_cache
+from core.batch import ConfigSnapshot
+from core.ocr_cache import OCRCache
+from core.ocr_engine import OCREngine
+
+BOX = [[0, 0], [10, 0], [10, 5], [0, 5]]
+
+
+def test_key_covers_content_shape_and_engine():
+    """کلید با تغییر پیکسل، ابعاد یا امضای موتور تغییر می‌کند"""
+    image = np.zeros((4, 6), dtype=np.uint8)
+    changed = image.copy()
+    changed[0, 0] = 1
+
+    key = OCRCache.make_key(image, "easyocr=1")
+    assert key == OCRCache.make_key(image.copy(), "easyocr=1")
+    assert key != OCRCache.make_key(changed, "easyocr=1")
+    assert key != OCRCache.make_key(image.reshape(6, 4), "easyocr=1")
+    assert key != OCRCache.make_key(image, "easyocr=2")
+
+
+def test_hits_misses_and_persistence(tmp_path):
+    """نتایج (با انواع NumPy) ذخیره و پس از باز کردن مجدد خوانده می‌شوند"""
+    cache = OCRCache(str(tmp_path / "cache.sqlite"))
+    assert cache.get("a") is None
+    cache.put("a", [(np.array(BOX), "متن", np.float32(0.5))])
+    cache.close()
+
+    cache = OCRCache(str(tmp_path / "cache.sqlite"))
+    assert cache.get("a") == [[BOX, "متن", 0.5]]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 0, 1)
+
+
+def test_lru_eviction(tmp_path, monkeypatch):
+    """با عبور از حداکثر حجم، ورودی‌هایی که دیرتر از همه خوانده شده‌اند حذف می‌شوند"""
+    clock = itertools.count(1000)
+    monkeypatch.setattr(ocr_cache.time, "time", lambda: float(next(clock)))
+    results = [[BOX, "x" * 400, 0.9]]
+    entry_size = len(json.dumps(results).encode('utf-8'))
+    cache = OCRCache(str(tmp_path / "cache.sqlite"), max_size_mb=3.5 * entry_size / (1024 * 1024))
+
+    for key in "abc":
+        cache.put(key, results)
+    assert cache.get("a") is not None  # a تازه‌ترین دسترسی می‌شود
+    cache.put("d", results)
+
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in "acd")
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["entries"] == 3
+
+
+def test_engine_uses_cache(tmp_path):
+    """OCR تصویر تکراری از کش خوانده می‌شود و موتور دوباره اجرا نمی‌شود"""
+    recordings = tmp_path / "stub.json"
+    recordings.write_text(json.dumps({"version": 1, "by_key": {"p": [[BOX, "اظهارنامه", 0.9]]}, "sequence": ["p"]},
+                                     ensure_ascii=False), encoding="utf-8")
+    engine = OCREngine(ConfigSnapshot({
+        "ocr": {"backend": "stub", "stub": {"recordings": str(recordings)},
+                "cache": {"enabled": True, "path": str(tmp_path / "cache.sqlite")}}
+    }))
+    calls = []
+    readtext = engine.backend.readtext
+    engine.backend.readtext = lambda image, **overrides: calls.append(1) or readtext(image, **overrides)
+    image = np.full((20, 40), 255, dtype=np.uint8)
+
+    first = engine.extract_text(image)
+    second = engine.extract_text(image.copy())
+
+    assert len(calls) == 1
+    assert first["text"] == second["text"] == "اظهارنامه"
+    assert engine.cache_stats()["hits"] == 1
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+تست‌های OCREngine با موتور جعلی دارای detect/recognize جداگانه
+"""
+
+import sys
+import types
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from core.batch import ConfigSnapshot
+from core.ocr_backends import OCRBackend
+from core.ocr_engine import OCREngine
+
+
+def reformat_input(image):
+    """معادل easyocr.utils.reformat_input برای تصاویر NumPy"""
+    if image.ndim == 2:
+        return np.stack([image] * 3, axis=-1), image
+    return image, image[..., 0]
+
+
+class BoxBackend(OCRBackend):
+    """موتور جعلی: هر ناحیه تیره یک کادر است و متن آن مقدار پیکسل کادر روی بوم
+
+    اگر کادری به صفحه اشتباه نسبت داده شود یا جابجایی عمودی اشتباه باشد
+    متن یا مختصات آن تغییر می‌کند.
+    """
+
+    name = "boxes"
+    supports_boxes = True
+
+    def __init__(self):
+        self.detect_calls = 0
+        self.recognize_calls = []
+
+    def signature(self) -> str:
+        return "boxes=1"
+
+    def detect(self, img):
+        self.detect_calls += 1
+        grey = img[..., 0]
+        boxes = []
+        for value in sorted(set(np.unique(grey)) - {255}):
+            ys, xs = np.nonzero(grey == value)
+            boxes.append([int(xs.min()), int(xs.max()) + 1, int(ys.min()), int(ys.max()) + 1])
+        return boxes, []
+
+    def recognize(self, img_cv_grey, horizontal_list, free_list, batch_size=None):
+        self.recognize_calls.append(len(horizontal_list))
+        results = []
+        for x_min, x_max, y_min, y_max in horizontal_list:
+            value = int(img_cv_grey[y_min, x_min])
+            bbox = [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]]
+            # کادر خالی (کادر کش شده‌ای که با صفحه نمی‌خواند) اعتماد پایین دارد
+            results.append((bbox, f"v{value}", 0.9 if value < 255 else 0.1))
+        return results
+
+    def readtext(self, image, **overrides):
+        img, grey = reformat_input(image)
+        horizontal_list, free_list = self.detect(img)
+        return self.recognize(grey, horizontal_list, free_list)
+
+
+@pytest.fixture
+def fake_easyocr_utils(monkeypatch):
+    utils = types.SimpleNamespace(reformat_input=reformat_input)
+    monkeypatch.setitem(sys.modules, "easyocr", types.SimpleNamespace(utils=utils))
+    monkeypatch.setitem(sys.modules, "easyocr.utils", utils)
+
+
+def make_engine(**ocr) -> tuple:
+    """OCREngine با موتور BoxBackend به جای موتور تنظیم شده"""
+    settings = {"backend": "stub", "cache": {"enabled": False}}
+    settings.update(ocr)
+    engine = OCREngine(ConfigSnapshot({"ocr": settings}))
+    backend = BoxBackend()
+    engine.backends = [backend]
+    engine.backend = backend
+    return engine, backend
+
+
+def make_page(height: int, width: int, boxes) -> np.ndarray:
+    """صفحه سفید با کادرهای تیره (y, x, h, w, مقدار)"""
+    page = np.full((height, width), 255, dtype=np.uint8)
+    for y, x, box_h, box_w, value in boxes:
+        page[y:y + box_h, x:x + box_w] = value
+    return page
+
+
+def test_batch_results_are_split_by_page_offset(fake_easyocr_utils):
+    """خطوط همه صفحات یکجا بازشناسی و با مختصات همان صفحه به آن برگردانده می‌شوند"""
+    engine, backend = make_engine()
+    pages = [
+        make_page(50, 100, [(5, 10, 8, 30, 10), (30, 10, 8, 30, 20)]),
+        make_page(80, 120, [(0, 0, 6, 20, 30)]),
+        make_page(60, 90, []),
+        make_page(40, 90, [(32, 50, 8, 20, 40)]),
+    ]
+
+    batched = engine.extract_text_batch(pages)
+    single = [engine.extract_text(page) for page in pages]
+
+    assert backend.recognize_calls[0] == 4  # یک recognize برای کل بوم
+    assert [result["text"] for result in batched] == ["v10 v20", "v30", "", "v40"]
+    for batch_result, single_result in zip(batched, single):
+        assert batch_result["text"] == single_result["text"]
+        assert np.array_equal(batch_result["words"]["boxes"], single_result["words"]["boxes"])
+
+
+def test_batch_falls_back_to_pages_on_error(fake_easyocr_utils, monkeypatch):
+    """خطای OCR دسته‌ای به پردازش صفحه به صفحه برمی‌گردد"""
+    engine, backend = make_engine()
+    pages = [make_page(30, 40, [(2, 2, 4, 4, 50)]), make_page(30, 40, [(2, 2, 4, 4, 60)])]
+    monkeypatch.setattr(engine, "_readtext_batched", lambda images, batch_size: 1 / 0)
+
+    assert [result["text"] for result in engine.extract_text_batch(pages)] == ["v50", "v60"]
+
+
+def test_layout_cache_skips_detect_for_known_layout(fake_easyocr_utils):
+    """صفحه با چیدمان شناخته شده (حتی در DPI دیگر) بدون detect بازشناسی می‌شود"""
+    engine, backend = make_engine(layout_cache={"enabled": True})
+    first = make_page(100, 100, [(10, 10, 10, 40, 10), (60, 20, 10, 50, 20)])
+    second = make_page(100, 100, [(10, 10, 10, 40, 11), (60, 20, 10, 50, 21)])
+    scaled = make_page(200, 200, [(20, 20, 20, 80, 12), (120, 40, 20, 100, 22)])
+
+    assert engine.extract_text(first)["text"] == "v10 v20"
+    assert engine.extract_text(second)["text"] == "v11 v21"
+    assert engine.extract_text(scaled)["text"] == "v12 v22"
+
+    assert backend.detect_calls == 1
+    assert engine.layout_stats()["hits"] == 2
+    assert "layout_reuse" in engine.engine_signature()
+
+
+def test_layout_cache_redetects_when_boxes_do_not_fit(fake_easyocr_utils):
+    """اگر کادرهای کش شده نتیجه کم‌اعتماد بدهند، چیدمان حذف و detect کامل اجرا می‌شود"""
+    engine, backend = make_engine(layout_cache={"enabled": True, "max_distance": 0.5})
+    engine.extract_text(make_page(100, 100, [(10, 10, 10, 40, 10)]))
+
+    result = engine.extract_text(make_page(100, 100, [(14, 30, 10, 40, 30)]))
+
+    assert result["text"] == "v30"
+    assert backend.detect_calls == 2
+    assert engine.layout_stats()["fallbacks"] == 1
+
+
+class FixedBackend(OCRBackend):
+    """موتور با خروجی ثابت برای تست cascade"""
+
+    def __init__(self, name: str, text: str, confidence: float):
+        self.name = name
+        self.results = [([[0, 0], [10, 0], [10, 5], [0, 5]], text, confidence)]
+        self.calls = 0
+
+    def readtext(self, image, **overrides):
+        self.calls += 1
+        return self.results
+
+
+def test_cascade_escalates_low_confidence():
+    """نتیجه کم‌اعتماد موتور سریع با موتور بعدی تکرار و بهترین نتیجه برگردانده می‌شود"""
+    engine, _ = make_engine(cascade_min_confidence=0.7)
+    fast, accurate = FixedBackend("fast", "اظهارنامه؟", 0.6), FixedBackend("accurate", "اظهارنامه", 0.95)
+    engine.backends, engine.backend = [fast, accurate], fast
+    image = np.zeros((5, 10), dtype=np.uint8)
+
+    result = engine.extract_text(image)
+    assert (result["text"], result["method"]) == ("اظهارنامه", "accurate")
+    assert result["backend_attempts"] == [{"backend": "fast", "confidence": 0.6},
+                                          {"backend": "accurate", "confidence": 0.95}]
+
+    fast.results = [(fast.results[0][0], "اظهارنامه", 0.9)]
+    assert engine.extract_text(image)["method"] == "fast"
+    assert accurate.calls == 1
+
+
+def test_field_cache_key_uses_engine_signature(tmp_path):
+    """کلید کش OCR فیلد مانند بقیه مسیرهای کش از engine_signature ساخته می‌شود"""
+    from core.ocr_cache import OCRCache
+
+    engine, backend = make_engine(cache={"enabled": True, "path": str(tmp_path / "cache.sqlite")},
+                                  layout_cache={"enabled": True})
+    field = make_page(20, 60, [(5, 5, 8, 40, 70)])
+
+    engine.extract_field(field, "numeric")
+
+    key = OCRCache.make_key(field, f"{engine.engine_signature(backend)};recognition=numeric")
+    assert "layout_reuse" in engine.engine_signature(backend)
+    assert engine.cache.get(key) is not None
+
+
+def test_timeout_checked_between_detect_and_recognize(fake_easyocr_utils, monkeypatch):
+    """پس از detect طولانی، recognize همان صفحه اجرا نمی‌شود"""
+    import time
+    from core.cancellation import PageTimeout
+
+    engine, backend = make_engine()
+    engine.timeout = 0.05
+    detect = backend.detect
+    monkeypatch.setattr(backend, "detect", lambda img: time.sleep(0.1) or detect(img))
+
+    with pytest.raises(PageTimeout):
+        engine.extract_text(make_page(30, 40, [(2, 2, 4, 4, 50)]))
+    assert backend.recognize_calls == []
+
+    engine.timeout = 5
+    assert engine.extract_text(make_page(30, 40, [(2, 2, 4, 4, 50)]))["text"] == "v50"
+
+
+def test_cancel_checked_between_batch_pages(fake_easyocr_utils):
+    """لغو پس از detect صفحه اول، بقیه صفحات دسته را detect نمی‌کند"""
+    from core.cancellation import ProcessingCancelled
+
+    engine, backend = make_engine()
+    engine.should_stop = lambda: backend.detect_calls > 0
+
+    with pytest.raises(ProcessingCancelled):
+        engine.extract_text_batch([make_page(30, 40, [(2, 2, 4, 4, 50)]) for _ in range(3)])
+    assert backend.detect_calls == 1
+    assert backend.recognize_calls == []
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+تست‌های پروفایل‌های موتور OCR (fast / balanced / accurate و پروفایل‌های تنظیمات)
+"""
+
+import sys
+import types
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import core.ocr_backends as ocr_backends
+from core.batch import ConfigSnapshot
+from core.ocr_engine import OCREngine
+from core.ocr_profiles import DEFAULT_PROFILES, load_profile, profile_names
+
+
+class RecordingReader:
+    """Reader جعلی EasyOCR که پارامترهای readtext را نگه می‌دارد"""
+
+    def __init__(self, languages, gpu=False, quantize=True, recog_network="standard"):
+        self.languages = languages
+        self.calls = []
+
+    def readtext(self, image, **params):
+        self.calls.append(params)
+        return [([[0, 0], [10, 0], [10, 10], [0, 10]], "کوتاژ", 0.45)]
+
+
+@pytest.fixture
+def fake_easyocr(monkeypatch):
+    monkeypatch.setitem(sys.modules, "easyocr", types.SimpleNamespace(Reader=RecordingReader))
+    monkeypatch.setattr(ocr_backends, "_shared_readers", {})
+
+
+def make_engine(profile: str = None, **ocr) -> OCREngine:
+    settings = {"backend": "easyocr", "cache": {"enabled": False}, "easyocr": {"gpu": False}}
+    settings.update(ocr)
+    return OCREngine(ConfigSnapshot({"ocr": settings}), profile=profile)
+
+
+def test_default_profile_is_balanced():
+    """بدون تنظیمات پروفایل balanced با پارامترهای پیش‌فرض EasyOCR انتخاب می‌شود"""
+    profile = load_profile()
+
+    assert profile["name"] == "balanced"
+    assert profile["canvas_size"] == 2560
+    assert profile["min_confidence"] == 0.5
+
+
+def test_unknown_profile_falls_back_to_default():
+    """نام ناشناخته به پروفایل پیش‌فرض برمی‌گردد"""
+    assert load_profile(name="turbo")["name"] == "balanced"
+
+
+def test_config_overrides_and_custom_profiles():
+    """ocr.profiles پروفایل داخلی را بازنویسی و پروفایل جدید تعریف می‌کند"""
+    config = ConfigSnapshot({"ocr": {
+        "profile": "fast",
+        "easyocr": {"allowlist": "0123456789"},
+        "profiles": {
+            "fast": {"batch_size": 4},
+            "digits": {"languages": ["en"], "min_confidence": 0.8}
+        }
+    }})
+
+    fast = load_profile(config)
+    assert fast["name"] == "fast"
+    assert fast["batch_size"] == 4
+    assert fast["decoder"] == DEFAULT_PROFILES["fast"]["decoder"]
+    # allowlist عمومی وقتی پروفایل آن را تعیین نکرده است
+    assert fast["allowlist"] == "0123456789"
+
+    digits = load_profile(config, "digits")
+    assert digits["name"] == "digits"
+    assert digits["languages"] == ["en"]
+    assert digits["min_confidence"] == 0.8
+    # بقیه پارامترها از پروفایل پیش‌فرض
+    assert digits["canvas_size"] == DEFAULT_PROFILES["balanced"]["canvas_size"]
+
+    assert profile_names(config) == ["fast", "balanced", "accurate", "digits"]
+
+
+def test_engine_passes_profile_to_easyocr(fake_easyocr):
+    """پارامترهای پروفایل به readtext می‌رسند و در امضای کش اثر دارند"""
+    fast = make_engine("fast")
+    accurate = make_engine("accurate")
+
+    fast.backend.readtext(np.zeros((10, 10, 3), dtype=np.uint8))
+    params = fast.backend.reader.calls[-1]
+    assert params["decoder"] == "greedy"
+    assert params["batch_size"] == 16
+    assert params["canvas_size"] == 1600
+    assert "allowlist" not in params
+
+    assert fast.engine_signature() != accurate.engine_signature()
+    assert fast.engine_signature() == make_engine("fast").engine_signature()
+
+
+def test_engine_uses_profile_min_confidence(fake_easyocr):
+    """آستانه اعتماد از پروفایل خوانده می‌شود (accurate: 0.4)"""
+    image = np.full((20, 20, 3), 255, dtype=np.uint8)
+
+    assert make_engine("balanced").extract_text(image)["text"] == ""
+    assert make_engine("accurate").extract_text(image)["text"] == "کوتاژ"
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+تست‌های بسته‌های الگو: بارگذاری مجدد پس از تغییر فایل، استفاده مجدد با
+hash یکسان و نگه داشتن نسخه سالم
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import core.pattern_extractor as pattern_extractor
+from core.batch import ConfigSnapshot
+from core.pattern_extractor import CustomsPatternExtractor
+from core.pattern_registry import PatternRegistry, resolve_pack_path
+
+# متن صفحه با ارقام فارسی (ارقام لاتین جزو توکن‌ها نیستند)
+PAGE_TEXT = "کد کالا ۸۴۷۱۳۰۱۰ وزن ۱۲۰"
+
+
+def write_pack(path: Path, version: str, pattern: str, mtime_ns: int):
+    """نوشتن بسته الگو با زمان تغییر مشخص (تغییر فایل در یک ثانیه هم دیده شود)"""
+    data = {"name": "test", "version": version,
+            "fields": {"کد_کالا": {"patterns": [pattern], "type": "string"}}}
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def pack_file(tmp_path):
+    path = tmp_path / "pack.json"
+    write_pack(path, "1", r'کالا", "(\d{8})"', 1_000_000_000)
+    return path
+
+
+def test_unchanged_file_returns_same_pack(pack_file):
+    registry = PatternRegistry()
+
+    assert registry.get(pack_file) is registry.get(pack_file)
+
+
+def test_modified_file_is_reloaded(pack_file):
+    """تغییر mtime و محتوا نسخه جدید کامپایل شده برمی‌گرداند"""
+    registry = PatternRegistry()
+    first = registry.get(pack_file)
+
+    write_pack(pack_file, "2", r'وزن", "(\d+)"', 2_000_000_000)
+    second = registry.get(pack_file)
+
+    assert second is not first
+    assert second.version == "2"
+    assert second.hash != first.hash
+    assert second.patterns["کد_کالا"]["patterns"] == [r'وزن", "(\d+)"']
+
+
+def test_same_content_reuses_compiled_pack(pack_file):
+    """فقط تغییر mtime (محتوای یکسان) بسته کامپایل شده قبلی را برمی‌گرداند"""
+    registry = PatternRegistry()
+    first = registry.get(pack_file)
+
+    os.utime(pack_file, ns=(3_000_000_000, 3_000_000_000))
+    assert registry.get(pack_file) is first
+
+    # بازگشت به محتوای قبلی پس از ویرایش هم کامپایل مجدد ندارد
+    content = pack_file.read_bytes()
+    write_pack(pack_file, "2", r'(\d+)', 4_000_000_000)
+    registry.get(pack_file)
+    pack_file.write_bytes(content)
+    os.utime(pack_file, ns=(5_000_000_000, 5_000_000_000))
+    assert registry.get(pack_file) is first
+
+
+def test_invalid_edit_keeps_previous_pack(pack_file):
+    """JSON نامعتبر یا بسته بدون fields نسخه سالم قبلی را نگه می‌دارد"""
+    registry = PatternRegistry()
+    first = registry.get(pack_file)
+
+    pack_file.write_text("{", encoding="utf-8")
+    os.utime(pack_file, ns=(2_000_000_000, 2_000_000_000))
+    assert registry.get(pack_file) is first
+
+    pack_file.write_text(json.dumps({"fields": {}}), encoding="utf-8")
+    os.utime(pack_file, ns=(3_000_000_000, 3_000_000_000))
+    assert registry.get(pack_file) is first
+
+    pack_file.unlink()
+    assert registry.get(pack_file) is first
+
+
+def test_missing_file_without_previous_pack(tmp_path):
+    assert PatternRegistry().get(tmp_path / "missing.json") is None
+
+
+def test_pack_path_falls_back_to_default(tmp_path):
+    """مسیر ناموجود به بسته پیش‌فرض پروژه برمی‌گردد"""
+    default = resolve_pack_path()
+    config = ConfigSnapshot({"patterns": {"import_patterns_file": str(tmp_path / "missing.json")}})
+
+    assert default.name == "import_patterns.json" and default.is_file()
+    assert resolve_pack_path(config) == default
+
+
+def test_extractor_picks_up_edits_between_pages(pack_file, monkeypatch):
+    """استخراج‌کننده بین صفحات نسخه جدید را بدون ساخت دوباره استفاده می‌کند"""
+    monkeypatch.setattr(pattern_extractor, "registry", PatternRegistry())
+    extractor = CustomsPatternExtractor(ConfigSnapshot({"patterns": {"import_patterns_file": str(pack_file)}}))
+
+    first = extractor.create_structured_json(PAGE_TEXT, 1)
+    write_pack(pack_file, "2", r'وزن", "(\d+)"', 2_000_000_000)
+    second = extractor.create_structured_json(PAGE_TEXT, 2)
+
+    assert first["customs_fields"]["کد_کالا"]["value"] == "84713010"
+    assert second["customs_fields"]["کد_کالا"]["value"] == "120"
+    assert second["document_info"]["pattern_pack"]["version"] == "2"
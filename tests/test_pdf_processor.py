@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+تست‌های PDFProcessor با موتور stub (بدون مدل OCR)
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import fitz
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from core.batch import ConfigSnapshot
+from core.pdf_processor import PDFProcessor
+
+
+def make_pdf(path: Path, pages: int) -> Path:
+    """PDF چند صفحه‌ای بدون لایه متنی قابل استفاده"""
+    doc = fitz.open()
+    for page_num in range(pages):
+        doc.new_page(width=200, height=200).draw_rect(fitz.Rect(20, 20, 60 + page_num * 10, 60))
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def make_recordings(path: Path) -> Path:
+    """ضبط stub با یک کلمه که برای هر تصویری بازپخش می‌شود"""
+    box = [[10, 10], [50, 10], [50, 30], [10, 30]]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"version": 1, "by_key": {"page": [[box, "اظهارنامه", 0.9]]}, "sequence": ["page"]}, f)
+    return path
+
+
+def make_processor(recordings: Path, pipeline: bool, batch_pages: int) -> PDFProcessor:
+    return PDFProcessor(ConfigSnapshot({
+        "ocr": {"backend": "stub", "stub": {"recordings": str(recordings)}, "cache": {"enabled": False},
+                "batch": {"pages": batch_pages}},
+        "processing": {"default_dpi": 72, "min_dpi": 72, "max_dpi": 72, "isolate_ocr": False,
+                       "text_layer": {"enabled": False}, "embedded_image_fast_path": False,
+                       "pipeline": {"enabled": pipeline}, "refinement": {"enabled": True}}
+    }))
+
+
+@pytest.mark.parametrize("pipeline", [False, True])
+@pytest.mark.parametrize("batch_pages", [1, 3])
+def test_refinement_runs_once_per_page(tmp_path, monkeypatch, pipeline, batch_pages):
+    """نتیجه OCR اولیه (دسته‌ای یا تک‌صفحه‌ای) هر صفحه دقیقاً یک بار بازشناسی می‌شود"""
+    processor = make_processor(make_recordings(tmp_path / "stub.json"), pipeline, batch_pages)
+    batch_calls = []
+    refined = []
+
+    extract_text_batch = processor.ocr_engine.extract_text_batch
+    monkeypatch.setattr(processor.ocr_engine, "extract_text_batch",
+                        lambda images: batch_calls.append(len(images)) or extract_text_batch(images))
+    monkeypatch.setattr(processor, "_refine_low_confidence",
+                        lambda pdf_path, page_num, ocr_result, dpi, escalation:
+                        refined.append(page_num) or ocr_result)
+
+    results = processor.process_pdf_pages_individually(str(make_pdf(tmp_path / "doc.pdf", 3)),
+                                                       str(tmp_path / "out"))
+
+    assert len(results) == 3
+    assert sorted(refined) == [0, 1, 2]
+    if batch_pages > 1:
+        assert batch_calls, "صفحات باید با OCR دسته‌ای پردازش شوند"
+
+
+def make_render_processor(**processing) -> PDFProcessor:
+    """PDFProcessor با موتور stub بدون ضبط برای تست‌های رندر"""
+    settings = {"default_dpi": 72, "isolate_ocr": False, "text_layer": {"enabled": False},
+                "embedded_image_fast_path": False}
+    settings.update(processing)
+    return PDFProcessor(ConfigSnapshot({"ocr": {"backend": "stub", "cache": {"enabled": False}},
+                                        "processing": settings}))
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_iter_page_images_opens_document_once(tmp_path, monkeypatch, prefetch):
+    """سند یک بار باز می‌شود و صفحات با ترتیب درخواستی برگردانده می‌شوند"""
+    import core.pdf_processor as pdf_processor
+
+    pdf_path = make_pdf(tmp_path / "doc.pdf", 4)
+    opened = []
+    fitz_open = fitz.open
+    monkeypatch.setattr(pdf_processor.fitz, "open", lambda *args: opened.append(args) or fitz_open(*args))
+
+    processor = make_render_processor()
+    pages = list(processor.iter_page_images(str(pdf_path), pages=[2, 0, 7, 3], prefetch=prefetch))
+
+    assert len(opened) == 1
+    assert [page["page_num"] for page in pages] == [2, 0, 3]
+    assert all(page["total_pages"] == 4 and page["image"] is not None for page in pages)
+
+
+def test_iter_page_images_close_stops_prefetch(tmp_path):
+    """بستن generator پیش از پایان، thread پیش‌واکشی را متوقف و سند را می‌بندد"""
+    import threading
+
+    processor = make_render_processor()
+    threads_before = threading.active_count()
+    pages = processor.iter_page_images(str(make_pdf(tmp_path / "doc.pdf", 6)), prefetch=1)
+
+    assert next(pages)["page_num"] == 0
+    pages.close()
+
+    assert threading.active_count() == threads_before
+
+
+@pytest.mark.parametrize("colorspace, channels", [("rgb", 3), ("gray", None), ("binary", None)])
+def test_iter_page_images_colorspace(tmp_path, colorspace, channels):
+    """تصاویر uint8 با ابعاد صفحه؛ gray و binary تک‌کاناله و binary فقط 0 و 255"""
+    processor = make_render_processor(render_colorspace=colorspace)
+    page = next(processor.iter_page_images(str(make_pdf(tmp_path / "doc.pdf", 1)), dpi=144, prefetch=0))
+    image = page["image"]
+
+    assert image.dtype == np.uint8
+    assert image.shape == ((400, 400) if channels is None else (400, 400, channels))
+    if colorspace == "binary":
+        assert set(np.unique(image)) <= {0, 255}
+    assert image.min() < 128 < image.max()
+
+
+def test_adaptive_dpi_escalates_low_confidence_pages(tmp_path, monkeypatch):
+    """صفحه کم‌اعتماد در DPI پایین با DPI بالاتر دوباره رندر و OCR می‌شود"""
+    processor = PDFProcessor(ConfigSnapshot({
+        "ocr": {"backend": "stub", "cache": {"enabled": False}, "batch": {"pages": 1}},
+        "processing": {"default_dpi": 72, "min_dpi": 72, "max_dpi": 144, "isolate_ocr": False,
+                       "text_layer": {"enabled": False}, "embedded_image_fast_path": False,
+                       "adaptive_dpi": {"enabled": True, "min_confidence": 0.6, "required_fields": []}}
+    }))
+    heights = []
+
+    def extract_text(image):
+        heights.append(image.shape[0])
+        return {"text": "اظهارنامه", "confidence": 0.9 if image.shape[0] > 200 else 0.3, "method": "stub"}
+
+    monkeypatch.setattr(processor.ocr_engine, "extract_text", extract_text)
+    results = processor.process_pdf_pages_individually(str(make_pdf(tmp_path / "doc.pdf", 1)),
+                                                       str(tmp_path / "out"))
+
+    ocr_info = json.loads(Path(results[0]["json_file"]).read_text(encoding="utf-8"))["ocr_info"]
+    assert heights == [200, 400]
+    assert ocr_info["dpi"] == 144
+    assert [attempt["dpi"] for attempt in ocr_info["dpi_attempts"]] == [72, 144]
+    assert results[0]["confidence"] == 0.9
+
+
+def make_scanned_pdf(path: Path, pixels: int) -> Path:
+    """PDF تک‌صفحه‌ای با یک تصویر خاکستری تمام‌صفحه (مانند اسکن)"""
+    pix = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, pixels, pixels), False)
+    pix.clear_with(255)
+    pix.clear_with(0, fitz.IRect(10, 10, pixels // 2, pixels // 2))
+    doc = fitz.open()
+    doc.new_page(width=200, height=200).insert_image(fitz.Rect(0, 0, 200, 200), pixmap=pix)
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def test_embedded_image_fast_path(tmp_path):
+    """تصویر صفحه اسکن‌شده با رزولوشن اصلی دیکد و صفحه برداری رندر می‌شود"""
+    processor = make_render_processor(embedded_image_fast_path=True, max_dpi=300)
+
+    scanned = next(processor.iter_page_images(str(make_scanned_pdf(tmp_path / "scan.pdf", 400)), prefetch=0))
+    vector = next(processor.iter_page_images(str(make_pdf(tmp_path / "doc.pdf", 1)), prefetch=0))
+
+    assert scanned["source"] == "embedded_image"
+    assert scanned["dpi"] == 144
+    assert scanned["image"].shape == (400, 400, 3)
+    assert vector["source"] == "render"
+    assert vector["dpi"] == 72
+
+
+def test_embedded_image_above_max_dpi_is_rendered(tmp_path):
+    """اسکن با رزولوشن بیشتر از max_dpi با DPI درخواستی رندر می‌شود"""
+    processor = make_render_processor(embedded_image_fast_path=True, max_dpi=100)
+
+    page = next(processor.iter_page_images(str(make_scanned_pdf(tmp_path / "scan.pdf", 400)), prefetch=0))
+
+    assert page["source"] == "render"
+    assert page["image"].shape == (200, 200, 3)
+
+
+def make_text_layer_pdf(path: Path, repeat: int) -> Path:
+    """PDF با لایه متنی فارسی (خروجی مستقیم سامانه)"""
+    words = "اظهارنامه کوتاژ کالا سفارش ارز معامله بیمه وزن بسته گمرکی"
+    doc = fitz.open()
+    doc.new_page(width=595, height=842).insert_htmlbox(
+        fitz.Rect(20, 20, 575, 822), f'<p dir="rtl">{" ".join([words] * repeat)}</p>')
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def test_text_layer_pages_skip_ocr(tmp_path, monkeypatch):
+    """صفحه با لایه متنی معتبر بدون رندر و OCR پردازش می‌شود"""
+    processor = make_render_processor(text_layer={"enabled": True})
+    ocr_calls = []
+    monkeypatch.setattr(processor.ocr_engine, "extract_text", lambda image: ocr_calls.append(image) or {})
+
+    results = processor.process_pdf_pages_individually(str(make_text_layer_pdf(tmp_path / "doc.pdf", 5)),
+                                                       str(tmp_path / "out"))
+
+    final = json.loads(Path(results[0]["json_file"]).read_text(encoding="utf-8"))
+    assert not ocr_calls
+    assert results[0]["render_path"] == "text_layer"
+    assert final["ocr_info"]["method"] == "text_layer"
+    assert "اظهارنامه" in final["raw_text"]
+
+
+def test_short_text_layer_is_ignored(tmp_path):
+    """لایه متنی با حروف فارسی کمتر از آستانه پذیرفته نمی‌شود"""
+    processor = make_render_processor(text_layer={"enabled": True})
+    page = next(processor.iter_page_images(str(make_text_layer_pdf(tmp_path / "doc.pdf", 1)),
+                                           prefetch=0, detect_text_layer=True))
+
+    assert page["source"] == "render"
+    assert page["image"] is not None
+
+
+def page_outputs(results) -> list:
+    """محتوای JSON صفحات بدون زمان‌ها و مسیرها"""
+    outputs = []
+    for result in results:
+        data = json.loads(Path(result["json_file"]).read_text(encoding="utf-8"))
+        outputs.append((result["page_number"], data["raw_text"],
+                        {name: field["value"] for name, field in data["customs_extraction"]["customs_fields"].items()}))
+    return outputs
+
+
+def test_pipeline_matches_sequential(tmp_path):
+    """pipeline همان صفحات و خروجی اجرای پشت سر هم را به ترتیب صفحات تولید می‌کند"""
+    recordings = make_recordings(tmp_path / "stub.json")
+    pdf_path = str(make_pdf(tmp_path / "doc.pdf", 5))
+
+    sequential = make_processor(recordings, pipeline=False, batch_pages=2)
+    pipelined = make_processor(recordings, pipeline=True, batch_pages=2)
+    expected = page_outputs(sequential.process_pdf_pages_individually(pdf_path, str(tmp_path / "seq")))
+    actual = page_outputs(pipelined.process_pdf_pages_individually(pdf_path, str(tmp_path / "pipe")))
+
+    assert [output[0] for output in actual] == [1, 2, 3, 4, 5]
+    assert actual == expected
+
+    stats = pipelined.last_stage_stats
+    assert set(stats["stages"]) == {"render", "ocr", "extract", "write"}
+    assert all(stats["stages"][name]["items"] == 5 for name in stats["stages"])
+    assert stats["wall_time"] > 0
+
+
+def make_sleeping_processor(tmp_path, monkeypatch, seconds: float, **processing) -> tuple:
+    """PDFProcessor با موتور stub که هر readtext آن seconds ثانیه طول می‌کشد"""
+    processor = make_processor(make_recordings(tmp_path / "stub.json"), pipeline=False, batch_pages=4)
+    settings = dict(processor.config.get("processing"), **processing)
+    processor = PDFProcessor(ConfigSnapshot(dict(processor.config.get_all(), processing=settings)))
+    calls = []
+    readtext = processor.ocr_engine.backend.readtext
+
+    def slow_readtext(image, **overrides):
+        calls.append(image.shape)
+        time.sleep(seconds)
+        return readtext(image, **overrides)
+
+    monkeypatch.setattr(processor.ocr_engine.backend, "readtext", slow_readtext)
+    return processor, calls
+
+
+def test_cancel_stops_inside_ocr_batch(tmp_path, monkeypatch):
+    """لغو در حین OCR یک دسته، صفحات بعدی همان دسته را OCR نمی‌کند"""
+    from core.cancellation import CancellationToken
+
+    processor, calls = make_sleeping_processor(tmp_path, monkeypatch, 0.05)
+    token = CancellationToken()
+    readtext = processor.ocr_engine.backend.readtext
+    monkeypatch.setattr(processor.ocr_engine.backend, "readtext",
+                        lambda image, **overrides: token.cancel() or readtext(image, **overrides))
+
+    results = processor.process_pdf_pages_individually(str(make_pdf(tmp_path / "doc.pdf", 4)),
+                                                       str(tmp_path / "out"), cancel_token=token)
+
+    assert len(calls) == 1
+    assert results == []
+
+
+def test_page_timeout_without_isolation(tmp_path, monkeypatch):
+    """مهلت صفحه بدون پردازه کارگر اعمال و صفحه با DPI پایین‌تر تکرار می‌شود"""
+    processor, calls = make_sleeping_processor(tmp_path, monkeypatch, 0.1, timeout=0.05,
+                                               default_dpi=144, max_dpi=144)
+
+    assert not processor.isolate_ocr
+    results = processor.process_pdf_pages_individually(str(make_pdf(tmp_path / "doc.pdf", 1)),
+                                                       str(tmp_path / "out"))
+
+    assert results == []
+    assert [page["page_number"] for page in processor.last_timed_out_pages] == [1]
+    assert calls == [(400, 400, 3), (200, 200, 3)]
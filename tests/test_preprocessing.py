@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+تست‌های پیش‌پردازش تصویر (مسیر NumPy بدون OpenCV)
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import core.preprocessing as preprocessing
+from core.preprocessing import ImagePreprocessor, apply_to_result
+
+
+@pytest.fixture(autouse=True)
+def numpy_only(monkeypatch):
+    monkeypatch.setattr(preprocessing, "cv2", None)
+
+
+def make_scan() -> np.ndarray:
+    """صفحه RGB با حاشیه تیره اسکنر، یک کادر متن و نویز نمکی"""
+    page = np.full((400, 300, 3), 235, dtype=np.uint8)
+    page[:, :8] = 0
+    page[100:120, 60:200] = 20
+    page[300, 250] = 0
+    return page
+
+
+def test_disabled_returns_same_image():
+    """در حالت غیرفعال تصویر بدون تغییر و بدون زمان‌سنجی برمی‌گردد"""
+    image = make_scan()
+    processed, info = ImagePreprocessor().process(image)
+
+    assert processed is image
+    assert info == {"steps": {}, "scale": 1.0, "offset": (0, 0)}
+
+
+def test_steps_produce_binary_grayscale_and_timings():
+    """مراحل فعال به ترتیب اجرا و زمان هر کدام ثبت می‌شود"""
+    preprocessor = ImagePreprocessor({"enabled": True, "crop_borders": False})
+    processed, info = preprocessor.process(make_scan())
+
+    assert processed.ndim == 2 and processed.dtype == np.uint8
+    assert set(np.unique(processed)) == {0, 255}
+    assert processed[300, 250] == 255  # نویز تک‌پیکسلی با median حذف شده است
+    assert processed[110, 100] == 0
+    assert list(info["steps"]) == ["grayscale", "denoise", "enhance_contrast", "threshold"]
+    assert set(preprocessor.stats()) == set(info["steps"])
+
+
+def test_crop_and_downscale_map_boxes_back():
+    """کادرهای تصویر کوچک و برش خورده به مختصات صفحه اصلی برمی‌گردند"""
+    preprocessor = ImagePreprocessor({"enabled": True, "downscale_max_side": 200, "crop_margin": 0,
+                                      "denoise": False, "enhance_contrast": False, "threshold": False})
+    processed, info = preprocessor.process(make_scan())
+
+    assert info["scale"] == 0.5
+    ys, xs = np.nonzero(processed < 100)
+    box = np.array([[xs.min(), ys.min(), xs.max() + 1, ys.max() + 1]], dtype=np.float32)
+    assert ImagePreprocessor.to_original(box, info).tolist() == [[60, 100, 200, 120]]
+
+    result = apply_to_result({"words": {"boxes": box}}, info)
+    assert result["words"]["boxes"].tolist() == [[60, 100, 200, 120]]
+    assert result["preprocessing"]["scale"] == 0.5
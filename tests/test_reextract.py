@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+تست‌های استخراج مجدد از JSONهای ذخیره شده صفحات (دستور re-extract)
+"""
+
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+import main
+from core.batch import ConfigSnapshot
+from core.pattern_extractor import CustomsPatternExtractor
+from core.reextract import reextract_page
+
+DATA_DIR = ROOT / "data"
+PAGE_FILES = sorted(DATA_DIR.glob("*_page_*.json"))
+
+
+def read_json(path: Path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+@pytest.fixture
+def pages_dir(tmp_path):
+    """کپی صفحات data/ تا فایل‌های مخزن تغییر نکنند"""
+    pages = tmp_path / "pages"
+    pages.mkdir()
+    for path in PAGE_FILES:
+        shutil.copy(path, pages / path.name)
+    return pages
+
+
+def run_cli(*argv) -> int:
+    return main.run_reextract(main.parse_args(["re-extract", *argv]), ConfigSnapshot({}))
+
+
+def test_subcommand_writes_output_and_skips_current_pages(pages_dir, tmp_path):
+    """re-extract خروجی را با نسخه الگوها می‌نویسد و اجرای دوباره آن را رد می‌کند"""
+    output = tmp_path / "output"
+    assert run_cli(str(pages_dir), "--output", str(output), "--workers", "2", "--chunk-size", "1") == 0
+
+    written = sorted(path.name for path in output.glob("*.json"))
+    assert written == [path.name for path in PAGE_FILES]
+    pack = CustomsPatternExtractor().pack.info()
+    for path in output.glob("*.json"):
+        data = read_json(path)
+        assert data["customs_extraction"]["document_info"]["pattern_pack"]["hash"] == pack["hash"]
+        # بقیه بخش‌های صفحه دست نمی‌خورند
+        assert data["raw_text"] == read_json(pages_dir / path.name)["raw_text"]
+
+    before = {path.name: path.read_bytes() for path in output.glob("*.json")}
+    assert run_cli(str(output), "--workers", "1") == 0
+    assert {path.name: path.read_bytes() for path in output.glob("*.json")} == before
+
+
+def test_dry_run_does_not_write(pages_dir):
+    before = {path.name: path.read_bytes() for path in pages_dir.glob("*.json")}
+
+    assert run_cli(str(pages_dir), "--workers", "1", "--dry-run", "--force") == 0
+    assert {path.name: path.read_bytes() for path in pages_dir.glob("*.json")} == before
+
+
+def test_geometry_fields_are_kept(tmp_path):
+    """مقادیر قالب فرم و حالت مکانی از متن ذخیره شده بازنویسی نمی‌شوند"""
+    path = tmp_path / "sample_page_01.json"
+    data = read_json(PAGE_FILES[0])
+    template_field = {"value": "11111111", "confidence": 0.93,
+                      "matched_pattern": r"form_template:(\d{8})", "raw_value": "11111111"}
+    spatial_field = {"value": 42.0, "confidence": 0.81, "matched_pattern": "spatial:وزن", "raw_value": "42"}
+    data["customs_extraction"] = {
+        "document_info": {"page_number": 1, "extraction_method": "spatial"},
+        "customs_fields": {
+            "کد_کالا": template_field,
+            "وزن_ناخالص": spatial_field,
+            "نوع_بسته": {"value": "قدیمی", "confidence": 0.6, "matched_pattern": "قدیمی", "raw_value": "قدیمی"},
+        }
+    }
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+    assert reextract_page(CustomsPatternExtractor(), path) == "changed"
+
+    extraction = read_json(path)["customs_extraction"]
+    assert extraction["customs_fields"]["کد_کالا"] == template_field
+    assert extraction["customs_fields"]["وزن_ناخالص"] == spatial_field
+    # فیلدهای الگوی متنی با الگوهای فعلی دوباره استخراج می‌شوند
+    assert extraction["customs_fields"]["نوع_بسته"]["value"] != "قدیمی"
+    assert extraction["document_info"]["extraction_method"] == "spatial"
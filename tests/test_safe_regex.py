@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+تست‌های اجرای امن الگوها: ترجمه RE2، مهلت موتور regex و بررسی الگوها
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import core.safe_regex as safe_regex
+from core.safe_regex import SafePattern, compile_pattern, pattern_issues, to_re2
+
+CATASTROPHIC = r'((a+)+)$'
+
+
+def test_to_re2_keeps_unicode_classes():
+    """\\d و \\w در RE2 فقط ASCII هستند و به کلاس‌های یونیکد ترجمه می‌شوند"""
+    assert to_re2(r'(\d{8})') == r'(\p{Nd}{8})'
+    assert to_re2(r'[\d,]+') == r'[\p{Nd},]+'
+    assert to_re2(r'\w+\s') == r'[\p{L}\p{N}_]+[\s\x{0b}\x{1c}-\x{1f}\x{85}\p{Z}]'
+    assert to_re2(r'کد.*?"(\d+)"', re.IGNORECASE | re.DOTALL) == r'(?is)کد.*?"(\p{Nd}+)"'
+
+
+@pytest.mark.parametrize("pattern", [r'^(\d+)', r'(\d+)$', r'\bکد\b', r'(a)\1', r'[^\W]'])
+def test_to_re2_rejects_position_dependent_patterns(pattern):
+    """لنگرها، \\b، ارجاع به گروه و \\W داخل [] ترجمه نمی‌شوند"""
+    assert to_re2(pattern) is None
+
+
+def test_to_re2_rejects_unsupported_flags():
+    assert to_re2(r'\d', re.MULTILINE) is None
+
+
+@pytest.mark.skipif(safe_regex.re2 is None, reason="re2 نصب نیست")
+def test_re2_matches_persian_digits_relative_to_pos():
+    """RE2 ارقام فارسی را با \\d می‌یابد و موقعیت‌ها نسبت به pos هستند"""
+    pattern = SafePattern(r'"(\d+)"', 0, "re2")
+    text = 'x "۱۲۳" "45"'
+
+    assert pattern.engine == "re2"
+    assert pattern.relative_positions
+    assert [match.group(1) for match in pattern.finditer(text)] == ["۱۲۳", "45"]
+    assert pattern.search(text, 7).span(1) == (2, 4)
+
+
+@pytest.mark.skipif(safe_regex.regex is None, reason="regex نصب نیست")
+def test_regex_engine_stops_at_timeout():
+    """الگوی فاجعه‌بار در موتور regex پس از مهلت متوقف و «بدون تطابق» می‌شود"""
+    pattern = SafePattern(CATASTROPHIC, 0, "regex", timeout=0.05)
+    text = "a" * 40 + "!"
+
+    start = time.perf_counter()
+    assert pattern.search(text) is None
+    assert list(pattern.finditer(text)) == []
+    assert time.perf_counter() - start < 2
+
+
+@pytest.mark.skipif(safe_regex.regex is None, reason="regex نصب نیست")
+def test_auto_engine_selects_by_pattern_issues():
+    """در حالت auto الگوهای امن با re و الگوهای پرخطر ناسازگار با RE2 با regex اجرا می‌شوند"""
+    assert compile_pattern(r'کد\s*"(\d{8})"').engine == "re"
+    assert compile_pattern(CATASTROPHIC).engine == "regex"
+
+
+def test_pattern_issues():
+    """کمیت‌سنج تو در تو و کمیت‌سنج‌های تنبل نامحدود گزارش می‌شوند"""
+    assert pattern_issues(r'"(\d{8})"') == []
+    assert pattern_issues(CATASTROPHIC) == ["کمیت‌سنج تو در تو (تکرار نامحدود داخل تکرار)"]
+    assert pattern_issues(r'واحد.*?کالا.*?"(\d+)"') == ["2 کمیت‌سنج تنبل نامحدود (بدترین حالت O(n^3))"]
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+تست‌های استخراج مکانی فیلدها
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from core.spatial_extractor import SpatialFieldExtractor, words_from_readtext
+
+
+def box(x0, y0, x1, y1):
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+
+
+WORDS = words_from_readtext([
+    (box(200, 10, 260, 30), "سفارش", 0.9),
+    (box(100, 10, 180, 30), "12345678", 0.8),
+    (box(100, 60, 180, 80), "a" * 30 + "!", 0.8),
+    (box(200, 60, 260, 80), "کالا", 0.9),
+])
+
+
+def test_value_pattern_extracts_neighbour_box():
+    extractor = SpatialFieldExtractor({"کد": {"anchors": ["سفارش"], "value_pattern": r'(\d{8})'}})
+    result = extractor.extract(WORDS)["کد"]
+    assert result["value_text"] == "12345678"
+    assert result["anchor"] == "سفارش"
+
+
+def test_value_pattern_runs_with_timeout():
+    """الگوی مقدار با موتور امن اجرا می‌شود و عقبگرد فاجعه‌بار متوقف می‌شود"""
+    extractor = SpatialFieldExtractor({"شرح": {"anchors": ["کالا"], "value_pattern": r'((a+)+b)'}},
+                                      engine="regex", timeout=0.05)
+    value_regex = extractor.fields["شرح"][1]
+    assert value_regex.engine == "regex"
+    assert extractor.extract(WORDS) == {}
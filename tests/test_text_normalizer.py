@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+تست‌های نرمال‌سازی متن و منبع الگوها
+"""
+
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from core.pattern_registry import canonical_fields
+from core.text_normalizer import normalize_pattern, normalize_text
+
+
+def test_pattern_separators_stay_literal():
+    """٫ و ٬ در منبع الگو به . و , لفظی تبدیل می‌شوند، نه حروف خاص regex"""
+    pattern = normalize_pattern(r'(\d+)٫(\d+)')
+    assert pattern == r'(\d+)\.(\d+)'
+    assert re.fullmatch(pattern, normalize_text('۱۲٫۵'))
+    assert not re.fullmatch(pattern, '12x5')
+
+    assert normalize_pattern(r'\٫') == r'\.'
+    assert normalize_pattern('ك٧٧') == 'ک77'
+
+
+def test_canonical_fields_escape_only_regex_sources():
+    fields = canonical_fields({"ارزش": {"patterns": [r'(\d+)٫(\d+)'], "value_pattern": r'(\d+٫\d+)',
+                                         "anchors": ['ارزش٫كل'], "valid_values": ['۱٫۵']}})["ارزش"]
+    assert fields["patterns"] == [r'(\d+)\.(\d+)']
+    assert fields["value_pattern"] == r'(\d+\.\d+)'
+    assert fields["anchors"] == ['ارزش.کل']
+    assert fields["valid_values"] == ['1.5']